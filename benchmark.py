@@ -0,0 +1,187 @@
+"""
+Benchmark the headless solver on a fixed corpus of instances.
+
+    python benchmark.py --output results.json
+    python benchmark.py --save-baseline benchmarks/baseline.json
+    python benchmark.py --baseline benchmarks/baseline.json --modes backtrack,tabu
+
+The corpus is a fixed set of generated instances (see generate_instance.py)
+plus every directory under --instances holding the five input CSVs, e.g.
+anonymized exports of real colleges. Each case runs in a fresh process and
+records solve time, nodes explored, peak memory, placements and the final
+soft score. With --baseline the results are compared against a stored run
+and the exit code is 1 if any case regressed past the thresholds.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from generate_instance import generate_instance, write_instance
+from last_running_v3 import INPUT_FILES, load_scheduler
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+CORPUS = [
+    {'name': 'gen-10', 'courses': 10, 'seed': 1},
+    {'name': 'gen-20', 'courses': 20, 'seed': 2},
+    {'name': 'gen-20-tight-rooms', 'courses': 20, 'seed': 3, 'room_slack': 1.1},
+    {'name': 'gen-20-sparse-teachers', 'courses': 20, 'seed': 4, 'availability': 0.6},
+    {'name': 'gen-20-lab-heavy', 'courses': 20, 'seed': 5, 'lab_ratio': 0.8},
+    {'name': 'gen-40', 'courses': 40, 'seed': 6}
+]
+
+def run_case(job):
+    """Solve one instance in this (fresh) process and measure it"""
+    scheduler = load_scheduler(job['directory'])
+    scheduler.solver_mode = job['mode']
+    scheduler.node_limit = job['node_limit']
+
+    start = time.perf_counter()
+    success, assignments = scheduler.solve_schedule()
+    seconds = time.perf_counter() - start
+
+    requirements = scheduler.build_lecture_requirements()
+    matched = scheduler.match_entries_to_requirements(assignments, requirements)
+    score = scheduler.calculate_schedule_score(
+        [(requirements[r], entry) for r, entry in matched.items()], assignments)
+
+    peak_memory_kb = None
+    if resource is not None:
+        peak_memory_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            peak_memory_kb //= 1024
+
+    return {
+        'success': success,
+        'seconds': seconds,
+        'nodes': scheduler.nodes_visited,
+        'peak_memory_kb': peak_memory_kb,
+        'placements': len(matched),
+        'requirements': len(requirements),
+        'score': score
+    }
+
+
+def collect_cases(corpus_dir, instances_dir):
+    cases = []
+    for spec in CORPUS:
+        options = {k: v for k, v in spec.items() if k != 'name'}
+        directory = os.path.join(corpus_dir, spec['name'])
+        write_instance(generate_instance(**options), directory)
+        cases.append((spec['name'], directory))
+
+    if instances_dir:
+        for name in sorted(os.listdir(instances_dir)):
+            directory = os.path.join(instances_dir, name)
+            if all(os.path.exists(os.path.join(directory, f)) for f in INPUT_FILES.values()):
+                cases.append((name, directory))
+    return cases
+
+
+def run_benchmarks(cases, modes, node_limit, repeat):
+    context = multiprocessing.get_context('spawn')
+    results = []
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for name, directory in cases:
+            for mode in modes:
+                job = {'directory': directory, 'mode': mode, 'node_limit': node_limit}
+                runs = [pool.apply(run_case, (job,)) for _ in range(repeat)]
+                result = dict(runs[0])
+                result['seconds'] = statistics.median(run['seconds'] for run in runs)
+                if result['peak_memory_kb'] is not None:
+                    result['peak_memory_kb'] = max(run['peak_memory_kb'] for run in runs)
+                result['case'] = name
+                result['mode'] = mode
+                results.append(result)
+                print(f"{name:28} {mode:10} {'ok' if result['success'] else 'FAIL':5} "
+                      f"{result['seconds']:8.2f} s {result['nodes']:8} nodes "
+                      f"{result['placements']:5}/{result['requirements']:<5} score {result['score']}")
+    return results
+
+
+def compare(results, baseline, time_threshold, memory_threshold, score_threshold):
+    """Regressions of results against a baseline run, as readable messages"""
+    previous = {(r['case'], r['mode']): r for r in baseline['results']}
+    regressions = []
+
+    for result in results:
+        key = (result['case'], result['mode'])
+        if key not in previous:
+            continue
+        base = previous[key]
+        label = f"{result['case']} [{result['mode']}]"
+
+        # Ignore differences below 50 ms, which are timer noise on the small cases
+        if result['seconds'] > base['seconds'] * (1 + time_threshold) and \
+                result['seconds'] - base['seconds'] > 0.05:
+            regressions.append(f"{label}: time {base['seconds']:.2f} s -> {result['seconds']:.2f} s")
+        if result['peak_memory_kb'] and base['peak_memory_kb'] and \
+                result['peak_memory_kb'] > base['peak_memory_kb'] * (1 + memory_threshold):
+            regressions.append(f"{label}: peak memory {base['peak_memory_kb']} KiB -> "
+                               f"{result['peak_memory_kb']} KiB")
+        if result['placements'] < base['placements']:
+            regressions.append(f"{label}: placements {base['placements']} -> {result['placements']}")
+        if result['score'] < base['score'] - abs(base['score']) * score_threshold:
+            regressions.append(f"{label}: score {base['score']} -> {result['score']}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the timetable solver")
+    parser.add_argument("--modes", default="backtrack", help="comma-separated solver modes")
+    parser.add_argument("--node-limit", type=int, default=20000, help="node budget for backtracking")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the median time is kept")
+    parser.add_argument("--instances", help="directory of real instances, one subdirectory each")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--save-baseline", help="write the results as the new baseline")
+    parser.add_argument("--baseline", help="compare against this baseline JSON file")
+    parser.add_argument("--time-threshold", type=float, default=0.15,
+                        help="allowed relative slowdown (default 0.15)")
+    parser.add_argument("--memory-threshold", type=float, default=0.15,
+                        help="allowed relative peak memory growth (default 0.15)")
+    parser.add_argument("--score-threshold", type=float, default=0.02,
+                        help="allowed relative soft score drop (default 0.02)")
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        cases = collect_cases(corpus_dir, args.instances)
+        results = run_benchmarks(cases, modes, args.node_limit, args.repeat)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'node_limit': args.node_limit,
+        'results': results
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.time_threshold, args.memory_threshold,
+                              args.score_threshold)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
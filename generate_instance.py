@@ -0,0 +1,247 @@
+"""
+Generate a synthetic college in the five CSV formats the scheduler loads.
+
+    python generate_instance.py --courses 100 --seed 7 --output-dir instances/c100
+    python generate_instance.py --courses 40 --room-slack 1.1 --availability 0.5 --lab-ratio 0.6
+
+The same arguments always produce the same files. Tightness is controlled by
+--room-slack (rooms provided per room actually needed), --availability (share
+of each teacher's week they can teach) and --lab-ratio (share of subjects
+with a two-hour lab). --second-teacher gives that share of subjects a second
+qualified teacher, which widens the search.
+"""
+import argparse
+import csv
+import math
+import os
+import random
+
+DEPARTMENTS = ["Computer", "BSH", "EXTC", "EXTC/MTRX", "AI", "MTRX", "Data Science", "IT", "Mech"]
+DEPARTMENT_CODES = {"Computer": "CS", "BSH": "BS", "EXTC": "EX", "EXTC/MTRX": "EM", "AI": "AI",
+                    "MTRX": "MX", "Data Science": "DS", "IT": "IT", "Mech": "ME"}
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+DAY_START = 8
+DAY_END = 18
+WEEK_HOURS = len(DAYS) * (DAY_END - DAY_START)
+YEARS = ["FE", "SE", "TE", "BE"]
+
+
+def generate_instance(courses=20, seed=1, room_slack=1.5, availability=0.8, lab_ratio=0.4,
+                      subjects_per_course=5, max_batches=3, teacher_load=12, second_teacher=0.0):
+    """Build the rows of the five input files for a college with the given size and tightness"""
+    rng = random.Random(seed)
+
+    course_rows = []
+    subject_rows = []
+    subject_hours = {}
+    subject_department = {}
+
+    for c in range(courses):
+        department = DEPARTMENTS[c % len(DEPARTMENTS)]
+        code = DEPARTMENT_CODES[department]
+        semester = rng.randint(1, 8)
+        batches = rng.randint(1, max_batches)
+        capacity = rng.choice([30, 45, 60, 60, 60, 75, 90, 120])
+
+        subjects = []
+        for k in range(subjects_per_course):
+            subject = f"{code}{semester}{c:03d}{k}"
+            lecture_hours = rng.choice([2, 3, 3, 4])
+            lab_hours = 2 if rng.random() < lab_ratio else 0
+            tutorial_hours = 1 if rng.random() < 0.25 else 0
+            subject_rows.append({
+                'subject': subject,
+                'department': department,
+                'lecture_hours': lecture_hours,
+                'lab_hours': lab_hours,
+                'tutorial_hours': tutorial_hours
+            })
+            subject_hours[subject] = lecture_hours + (lab_hours + tutorial_hours) * batches
+            subject_department[subject] = department
+            subjects.append(subject)
+
+        course_rows.append({
+            'name': f"{YEARS[(semester - 1) // 2]} {code} {c + 1}",
+            'semester': semester,
+            'no_of_batches': batches,
+            'capacity': capacity,
+            'courses': " | ".join(subjects)
+        })
+
+    teacher_rows, teacher_hours = generate_teachers(rng, subject_hours, subject_department,
+                                                    teacher_load, second_teacher)
+    availability_rows = generate_availability(rng, teacher_rows, teacher_hours, availability)
+    classroom_rows = generate_classrooms(rng, course_rows, subject_rows, room_slack)
+
+    return {
+        'courses': course_rows,
+        'subject_details': subject_rows,
+        'teachers': teacher_rows,
+        'availability': availability_rows,
+        'classrooms': classroom_rows
+    }
+
+
+def generate_teachers(rng, subject_hours, subject_department, teacher_load, second_teacher):
+    """Give every subject a main teacher within its department and some a second qualified teacher"""
+    teacher_rows = []
+    teacher_hours = []
+
+    for department in DEPARTMENTS:
+        subjects = [s for s in subject_hours if subject_department[s] == department]
+        if not subjects:
+            continue
+        total = sum(subject_hours[s] for s in subjects)
+        count = max(1, math.ceil(total / teacher_load))
+        qualified = [[] for _ in range(count)]
+        hours = [0] * count
+
+        # Largest subjects first onto the least loaded teacher keeps loads under the weekly limit
+        for subject in sorted(subjects, key=lambda s: -subject_hours[s]):
+            t = min(range(count), key=lambda i: hours[i])
+            qualified[t].append(subject)
+            hours[t] += subject_hours[subject]
+            if count > 1 and rng.random() < second_teacher:
+                other = rng.choice([i for i in range(count) if i != t])
+                qualified[other].append(subject)
+
+        code = DEPARTMENT_CODES[department]
+        for t in range(count):
+            teacher_rows.append({
+                'teacher_name': f"Prof. {code}{len(teacher_rows) + 1:04d}",
+                'subjects': ",".join(qualified[t])
+            })
+            teacher_hours.append(hours[t])
+
+    return teacher_rows, teacher_hours
+
+
+def generate_availability(rng, teacher_rows, teacher_hours, density):
+    """Morning and afternoon blocks, each open with probability density, never fewer hours than the load"""
+    middle = (DAY_START + DAY_END) // 2
+    blocks = [(DAY_START, middle), (middle, DAY_END)]
+    rows = []
+
+    for teacher, hours in zip(teacher_rows, teacher_hours):
+        for attempt in range(20):
+            week = {day: [block for block in blocks if rng.random() < density] for day in DAYS}
+            available = sum(end - start for day in DAYS for start, end in week[day])
+            if available >= hours * 1.5:
+                break
+        else:
+            week = {day: list(blocks) for day in DAYS}
+
+        row = {
+            'teacher_name': teacher['teacher_name'],
+            'type of faculty': 'visiting' if rng.random() < 0.2 else 'permanent'
+        }
+        for day in DAYS:
+            row[day] = ";".join(f"{start:02d}:00-{end:02d}:00" for start, end in week[day]) or "NA"
+        rows.append(row)
+
+    return rows
+
+
+def generate_classrooms(rng, course_rows, subject_rows, room_slack):
+    """Rooms per department and type sized to the weekly demand times room_slack"""
+    subjects = {row['subject']: row for row in subject_rows}
+    lecture_demand = {}
+    lab_demand = {}
+    tutorial_demand = {}
+    lecture_sizes = {}
+    lab_sizes = {}
+
+    for course in course_rows:
+        batches = course['no_of_batches']
+        batch_capacity = course['capacity'] // batches
+        for subject in course['courses'].split(" | "):
+            details = subjects[subject]
+            department = details['department']
+            lecture_demand[department] = lecture_demand.get(department, 0) + details['lecture_hours']
+            lab_demand[department] = lab_demand.get(department, 0) + details['lab_hours'] * batches
+            tutorial_demand[department] = tutorial_demand.get(department, 0) + details['tutorial_hours'] * batches
+            lecture_sizes.setdefault(department, []).append(course['capacity'])
+            if details['lab_hours']:
+                lab_sizes.setdefault(department, []).append(batch_capacity)
+
+    rows = []
+
+    def add_rooms(class_type, prefix, department, demand, sizes):
+        count = math.ceil(demand * room_slack / WEEK_HOURS) if demand else 0
+        # Hand out capacities from the largest need down so the biggest group always fits somewhere
+        sizes = sorted(sizes, reverse=True)
+        code = DEPARTMENT_CODES[department]
+        for i in range(count):
+            size = sizes[min(len(sizes) - 1, i * len(sizes) // count)]
+            rows.append({
+                'class_type': class_type,
+                'room': f"{prefix} {code}-{i + 1}",
+                'department': department,
+                'capacity': int(math.ceil(size / 10.0) * 10) + rng.choice([0, 0, 10])
+            })
+
+    for department in DEPARTMENTS:
+        if department in lecture_demand:
+            add_rooms('CR', 'Room', department, lecture_demand[department], lecture_sizes[department])
+        if lab_demand.get(department):
+            add_rooms('CL', 'Lab', department, lab_demand[department], lab_sizes[department])
+        if tutorial_demand.get(department):
+            # Tutorials may fall back to classrooms, so tutorial rooms only cover part of the demand
+            add_rooms('TR', 'Tutorial Room', department, tutorial_demand[department] / 2,
+                      [min(lecture_sizes[department])])
+
+    return rows
+
+
+def write_instance(instance, directory):
+    os.makedirs(directory, exist_ok=True)
+    files = [
+        ('courses.csv', 'courses', ['name', 'semester', 'no_of_batches', 'capacity', 'courses']),
+        ('subject_details.csv', 'subject_details',
+         ['subject', 'department', 'lecture_hours', 'lab_hours', 'tutorial_hours']),
+        ('teachers.csv', 'teachers', ['teacher_name', 'subjects']),
+        ('availability.csv', 'availability', ['teacher_name', 'type of faculty'] + DAYS),
+        ('classrooms.csv', 'classrooms', ['class_type', 'room', 'department', 'capacity'])
+    ]
+    for filename, key, fieldnames in files:
+        with open(os.path.join(directory, filename), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(instance[key])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic timetabling instance")
+    parser.add_argument("--courses", type=int, default=20, help="number of courses (10 to 500)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--room-slack", type=float, default=1.5,
+                        help="rooms provided per room needed at full use; lower is tighter (default 1.5)")
+    parser.add_argument("--availability", type=float, default=0.8,
+                        help="chance each half-day is open for a teacher (default 0.8)")
+    parser.add_argument("--lab-ratio", type=float, default=0.4,
+                        help="share of subjects with a two-hour lab (default 0.4)")
+    parser.add_argument("--subjects-per-course", type=int, default=5)
+    parser.add_argument("--max-batches", type=int, default=3)
+    parser.add_argument("--teacher-load", type=int, default=12,
+                        help="target weekly hours per teacher (the solver allows at most 20)")
+    parser.add_argument("--second-teacher", type=float, default=0.0,
+                        help="share of subjects a second teacher is also qualified for (default 0)")
+    parser.add_argument("--output-dir", default="instance", help="directory for the five CSV files")
+    args = parser.parse_args()
+
+    if not 10 <= args.courses <= 500:
+        parser.error("--courses must be between 10 and 500")
+    if args.room_slack <= 0 or not 0 < args.availability <= 1 or not 0 <= args.lab_ratio <= 1:
+        parser.error("--room-slack must be positive, --availability in (0, 1] and --lab-ratio in [0, 1]")
+
+    instance = generate_instance(args.courses, args.seed, args.room_slack, args.availability,
+                                 args.lab_ratio, args.subjects_per_course, args.max_batches,
+                                 args.teacher_load, args.second_teacher)
+    write_instance(instance, args.output_dir)
+    print(f"Wrote {len(instance['courses'])} courses, {len(instance['subject_details'])} subjects, "
+          f"{len(instance['teachers'])} teachers and {len(instance['classrooms'])} classrooms "
+          f"to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
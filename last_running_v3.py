@@ -2,8 +2,22 @@ import tkinter as tk
 import pandas as pd
 import numpy as np
 from tkinter import ttk, filedialog, messagebox, Toplevel
+import argparse
 import csv
-from datetime import datetime, timedelta
+import cProfile
+import importlib.util
+import io
+import json
+import os
+import pstats
+import random
+import struct
+import sys
+import time
+import tracemalloc
+import zlib
+import multiprocessing
+from array import array
 from collections import defaultdict
 
 try:
@@ -17,12 +31,35 @@ try:
 except ImportError:
     PDF_AVAILABLE = False
 
+INPUT_FILES = {
+    'courses': 'courses.csv',
+    'subjects': 'subject_details.csv',
+    'teachers': 'teachers.csv',
+    'availability': 'availability.csv',
+    'classrooms': 'classrooms.csv'
+}
+
+class ScheduleGrid(dict):
+    """
+    The timetable grid, day -> time slot -> entries. It also keeps per-day bitmasks of the
+    slots each teacher, room and course batch is busy in, and session counts per course
+    batch (see make_assignment), so the hard rules read aggregates instead of scanning.
+    """
+    def __init__(self, days, time_slots):
+        super().__init__((day, {slot: [] for slot in time_slots}) for day in days)
+        self.teacher_busy = {}     # (teacher, day) -> mask
+        self.room_busy = {}        # (room, day) -> mask
+        self.course_busy = {}      # (course, day) -> {batch label (see entry_batch): mask}
+        self.course_sessions = {}  # (course, day) -> {batch label: sessions}
+
+
 class TimetableScheduler:
-    def __init__(self, root):
+    def __init__(self, root=None):
         self.root = root
-        self.root.title("College Timetable Scheduler")
-        self.root.geometry("1600x900")
-        self.root.configure(bg="#f5f7fa")
+        if self.root is not None:
+            self.root.title("College Timetable Scheduler")
+            self.root.geometry("1600x900")
+            self.root.configure(bg="#f5f7fa")
         
         # Data storage
         self.courses = []
@@ -31,15 +68,149 @@ class TimetableScheduler:
         self.classrooms = []
         self.subject_details = {}
         self.schedule = []
+        self.pins = []
         
         # Valid departments
         self.departments = ["Computer", "BSH", "EXTC", "EXTC/MTRX", "AI", "MTRX", 
                            "Data Science", "IT", "Mech"]
         
-        # Time slots (8 AM to 6 PM, 1-hour slots)
-        self.time_slots = self.generate_time_slots()
         self.days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
         
+        # Teaching calendar (see apply_calendar): day hours, slot length and session lengths in
+        # minutes. day_hours narrows single days, e.g. {"Saturday": "08:00-13:00"}
+        self.calendar = {
+            'start': '08:00',
+            'end': '18:00',
+            'slot_minutes': 60,
+            'lecture_minutes': 60,
+            'lab_minutes': 120,
+            'tutorial_minutes': 60,
+            'day_hours': {}
+        }
+        self.max_weekly_hours = 20
+        self.apply_calendar(self.calendar)
+        
+        # Solver settings
+        self.solver_modes = {
+            "backtrack": "Backtracking",
+            "tabu": "Tabu Search",
+            "lns": "Large Neighborhood Search",
+            "genetic": "Genetic (parallel)",
+            "beam": "Beam Search"
+        }
+        self.solver_mode = "backtrack"
+        self.random_seed = 42
+        self.tabu_tenure = 10
+        self.tabu_iterations = 400
+        self.unplaced_penalty = 1000
+        self.lns_iterations = 200
+        self.lns_max_neighborhood = 4
+        self.lns_repair_node_limit = 2000
+        self.ga_population = 24
+        self.ga_generations = 40
+        self.ga_mutation_rate = 0.05
+        self.ga_repair_choices = 3
+        self.ga_workers = None  # None = one worker per CPU core
+        self.ga_stats = {}
+        self.beam_width = 5
+        self.warm_start_node_limit = 5000
+        
+        # Soft-constraint weights, compiled into lookup tables at solve start (see
+        # compile_score_weights). Bands give points by value: 'max' (<=), 'below' (<), 'min' (>=)
+        # or none for the rest. "departments" maps a department to keys that override these.
+        self.score_weights = {
+            'course_day_hours': [{'max': 0, 'points': 20}, {'max': 1, 'points': 40}, {'points': 15}],
+            'extra_day': -30,  # first class of a day while the course already meets on others
+            'spread_day': {'below_days': 4, 'points': 25},  # a new day while the course meets on few
+            'daily_sessions': [{'below': 4, 'points': 20}, {'below': 6, 'points': 10}],
+            'teacher_week_hours': [{'below': 15, 'points': 25}, {'below': 18, 'points': 10},
+                                   {'points': -20}],
+            'teacher_day_hours': [{'max': 0, 'points': 5}, {'max': 1, 'points': 30},
+                                  {'below': 5, 'points': 20}, {'points': -15}],
+            'preferred_start': {'from': '10:00', 'to': '14:00', 'points': 10},
+            'availability': {'available': 40, 'other_slot': 10, 'unavailable_day': -30},
+            'faculty_type': {'permanent': 15, 'visiting': 5},
+            'isolation': {'both_sides': -40, 'one_side': -10},
+            'breaks': {'long_day_hours': 7, 'long_day_per_hour': -5, 'has_break': 10,
+                       'balance': [{'min': 0.6, 'points': 20}, {'min': 0.3, 'points': 10}],
+                       'max_continuous_hours': 3, 'continuous_per_hour': -10},
+            'departments': {}
+        }
+        self.score_tables = {}
+        
+        # Hard rules added on top of the built-in ones (see add_constraint), compiled at solve start
+        self.constraints = []
+        self.compiled_constraints = None
+        
+        # Score bonus per (course, subject, batch, teacher, day, time_idx) used to favour
+        # keeping previous placements during a warm-start re-solve
+        self.placement_bias = {}
+        
+        # Teachers fixed per (course, subject) before timetabling (see allocate_teachers)
+        self.teacher_allocation_enabled = True
+        self.teacher_allocation = {}
+        self.unallocated_subjects = []
+        
+        # Backtracking picks only (teacher, day, slot) and keeps a room matching per slot
+        # (see reserve_room); room_records is the live matching while such a search runs
+        self.defer_rooms = False
+        self.room_records = None
+        
+        # Backtracking places the batch labs of a course as rotations (see group_lab_rotations)
+        self.lab_rotation = False
+        
+        # Room order of get_suitable_classrooms, worked out once per solve (see weigh_rooms)
+        self.room_weights = {}
+        self.suitable_rooms_cache = {}
+        
+        # Counting checks run before the search (see analyze_feasibility)
+        self.feasibility_check = True
+        self.feasibility_report = []
+        
+        # Optional node budget for backtrack (None = unlimited)
+        self.node_limit = None
+        self.nodes_visited = 0
+        
+        # Checkpointing of long backtrack solves
+        self.checkpoint_path = None
+        self.checkpoint_interval = 60  # seconds
+        self.checkpoint_state = None
+        self.search_trail = []
+        self.requirement_failures = defaultdict(int)
+        
+        # Solver telemetry (off by default; helpers are only wrapped while it is collecting)
+        self.telemetry_enabled = False
+        self.telemetry = None
+        self.telemetry_interval = 1.0  # seconds between live updates
+        self.telemetry_listener = None
+        # The per-placement hot path. Scoring and break checks run through score_profile /
+        # score_placement and course_day_violation, which replaced calculate_assignment_score
+        # and check_break_constraint in the search (those are kept for other callers)
+        self.instrumented_helpers = ['get_suitable_classrooms', 'is_valid_assignment_relaxed',
+                                     'score_profile', 'score_placement', 'course_day_violation',
+                                     'allowed_slots']
+        self.solver_stats = {}
+        
+        # Optional JSONL trace of every backtrack decision (see replay_trace.py)
+        self.trace_path = None
+        self.trace_file = None
+        self.trace_steps = 0
+        
+        # Profiling of a whole solve (cProfile + tracemalloc)
+        self.profile_path = None
+        self.profile_top = 25
+        self.profiled_functions = ['backtrack', 'get_possible_assignments', 'get_available_teachers',
+                                   'get_suitable_classrooms', 'is_valid_assignment_relaxed',
+                                   'assignment_violation', 'check_break_constraint',
+                                   'break_gap_allowed', 'allowed_slots',
+                                   'calculate_assignment_score', 'score_profile', 'score_placement',
+                                   'break_pattern_score', 'can_use_classroom',
+                                   'make_assignment', 'undo_assignment']
+        
+        # Headless instances (solver worker processes) have no window to build
+        if self.root is None:
+            return
+        
         # Current view type
         self.current_view = tk.StringVar(value="master")
         self.selected_entity = tk.StringVar()
@@ -66,37 +237,123 @@ class TimetableScheduler:
                        font=('Comic Sans', 10, 'bold'))
     
     def generate_time_slots(self):
-        slots = []
-        start = datetime.strptime("08:00", "%H:%M")
-        end = datetime.strptime("18:00", "%H:%M")
-        current = start
-        
-        while current < end:
-            next_time = current + timedelta(hours=1)
-            slots.append(f"{current.strftime('%H:%M')}-{next_time.strftime('%H:%M')}")
-            current = next_time
-        
-        return slots
+        return [f"{self.format_minutes(start)}-{self.format_minutes(start + self.slot_minutes)}"
+                for start in self.slot_starts]
+    
+    def parse_minutes(self, text):
+        """Minutes after midnight of an 'HH:MM' time"""
+        hours, _, minutes = text.strip().partition(':')
+        if not (hours.isdigit() and minutes.isdigit() and len(minutes) == 2) or \
+                int(hours) > 23 or int(minutes) > 59:
+            raise ValueError(f"Invalid time '{text.strip()}', expected HH:MM")
+        return int(hours) * 60 + int(minutes)
+    
+    def format_minutes(self, minutes):
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+    
+    def time_range_mask(self, time_range):
+        """
+        Bitmask of the slots a time range like '08:00-10:00' covers, parsed once per distinct
+        text. Slots only partly inside the range are left out. Raises ValueError for a
+        malformed range.
+        """
+        mask = self.range_mask_cache.get(time_range)
+        if mask is None:
+            start_str, separator, end_str = time_range.partition('-')
+            if not separator:
+                raise ValueError(f"Invalid time range '{time_range.strip()}', expected HH:MM-HH:MM")
+            start = self.parse_minutes(start_str)
+            end = self.parse_minutes(end_str)
+            if end <= start:
+                raise ValueError(f"Time range '{time_range.strip()}' ends before it starts")
+            mask = 0
+            for i, slot_start in enumerate(self.slot_starts):
+                if start <= slot_start and slot_start + self.slot_minutes <= end:
+                    mask |= 1 << i
+            self.range_mask_cache[time_range] = mask
+        return mask
+    
+    def mask_slots(self, mask):
+        return [slot for i, slot in enumerate(self.time_slots) if (mask >> i) & 1]
     
     def expand_time_range(self, time_range):
-        """Convert a time range like '08:00-10:00' to individual slots ['08:00-09:00', '09:00-10:00']"""
-        try:
-            start_str, end_str = time_range.split('-')
-            start = datetime.strptime(start_str.strip(), "%H:%M")
-            end = datetime.strptime(end_str.strip(), "%H:%M")
-            
-            slots = []
-            current = start
-            while current < end:
-                next_time = current + timedelta(hours=1)
-                slot = f"{current.strftime('%H:%M')}-{next_time.strftime('%H:%M')}"
-                if slot in self.time_slots:
-                    slots.append(slot)
-                current = next_time
-            
-            return slots
-        except:
-            return []
+        """Convert a time range like '08:00-10:00' to the slots it covers ['08:00-09:00', '09:00-10:00']"""
+        return self.mask_slots(self.time_range_mask(time_range))
+    
+    def availability_mask(self, teacher_data, day):
+        """Bitmask of the slots a teacher is available in on day"""
+        masks = teacher_data.get('masks')
+        if masks is None:
+            # Availability built in code rather than by read_availability lists slot labels only
+            masks = teacher_data['masks'] = {
+                d: sum(1 << self.slot_index[slot] for slot in set(slots) if slot in self.slot_index)
+                for d, slots in teacher_data.get('availability', {}).items()}
+        return masks.get(day, 0)
+    
+    def apply_calendar(self, calendar):
+        """
+        Build the time grid from a calendar: the slot labels and start minutes, session lengths
+        in slots, the weekly teaching limit in slots and a bitmask of each day's open slots.
+        Raises ValueError when the lengths do not fit whole slots.
+        """
+        slot_minutes = int(calendar['slot_minutes'])
+        start = self.parse_minutes(calendar['start'])
+        end = self.parse_minutes(calendar['end'])
+        if slot_minutes <= 0 or end <= start or (end - start) % slot_minutes:
+            raise ValueError(f"{calendar['start']}-{calendar['end']} does not divide into "
+                             f"{slot_minutes}-minute slots")
+        session_slots = {}
+        for session_type in ('lecture', 'lab', 'tutorial'):
+            minutes = int(calendar[f'{session_type}_minutes'])
+            if minutes <= 0 or minutes % slot_minutes:
+                raise ValueError(f"A {minutes}-minute {session_type} is not a whole number of "
+                                 f"{slot_minutes}-minute slots")
+            session_slots[session_type] = minutes // slot_minutes
+        
+        self.calendar = calendar
+        self.days = list(calendar.get('days', self.days))
+        self.slot_minutes = slot_minutes
+        self.slot_starts = list(range(start, end, slot_minutes))
+        self.time_slots = self.generate_time_slots()
+        self.slot_index = {slot: i for i, slot in enumerate(self.time_slots)}
+        self.range_mask_cache = {}
+        self.session_slots = session_slots
+        self.max_weekly_slots = self.max_weekly_hours * 60 // slot_minutes
+        
+        self.open_slots = {}
+        for day in self.days:
+            day_hours = calendar.get('day_hours', {}).get(day)
+            if day_hours is None:
+                self.open_slots[day] = (1 << len(self.time_slots)) - 1
+                continue
+            mask = 0
+            for time_range in day_hours.split(';'):
+                if time_range.strip():
+                    mask |= self.time_range_mask(time_range)
+            self.open_slots[day] = mask
+        self.start_slot_cache = {}
+        self.break_gap_cache = {}
+        self.score_tables = {}
+    
+    def read_calendar(self, filename):
+        """Load a JSON calendar; keys missing from the file keep their current values"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            calendar = dict(self.calendar)
+            calendar.update(json.load(f))
+        self.apply_calendar(calendar)
+    
+    def start_slots(self, day, duration):
+        """Start slots on day for a session of duration slots that lies wholly in open time"""
+        key = (day, duration)
+        if key not in self.start_slot_cache:
+            window = (1 << duration) - 1
+            open_mask = self.open_slots.get(day, 0)
+            self.start_slot_cache[key] = [t for t in range(len(self.time_slots) - duration + 1)
+                                          if (open_mask >> t) & window == window]
+        return self.start_slot_cache[key]
+    
+    def session_hours(self, slots):
+        return slots * self.slot_minutes / 60
     
     def create_modern_button(self, parent, text, command, bg_color, **kwargs):
         """Create a modern flat button with hover effects"""
@@ -214,6 +471,20 @@ class TimetableScheduler:
                     "• Time format: HH:MM-HH:MM (24-hour)"
                 ]
             },
+            "Pinned Sessions": {
+                "description": "Optional: sessions fixed before the timetable is generated",
+                "columns": ["day", "time", "course", "subject", "teacher", "classroom", "type"],
+                "example": """day,time,course,subject,teacher,classroom,type
+    Monday,09:00-10:00,SE Computer,OS,Dr. Smith,Room 101,lecture
+    Tuesday,10:00-11:00,SE Computer,OS (Lab) - Batch 1,Dr. Smith,Lab A1,lab
+    Friday,14:00-15:00,Exam Cell,Exam,Prof. Jones,Lecture Hall 1,lecture""",
+                "notes": [
+                    "• Same columns as the exported schedule CSV",
+                    "• Labs start at the given time and take two slots",
+                    "• Pins matching a course requirement replace it in the search",
+                    "• Other pins just reserve the teacher and room"
+                ]
+            },
             "Classrooms": {
                 "description": "Define classroom types and capacities",
                 "columns": ["class_type", "room", "department", "capacity"],
@@ -336,11 +607,15 @@ class TimetableScheduler:
                               bg="white", fg="#2c3e50", anchor="w")
         input_title.pack(pady=20, padx=20, fill=tk.X)
         
+        self.create_file_input(left_panel, "Calendar JSON (optional)", self.load_calendar)
         self.create_file_input(left_panel, "Courses CSV", self.load_courses)
         self.create_file_input(left_panel, "Subject Details CSV", self.load_subject_details)
         self.create_file_input(left_panel, "Teachers CSV", self.load_teachers)
         self.create_file_input(left_panel, "Teacher Availability CSV", self.load_availability)
         self.create_file_input(left_panel, "Classrooms CSV", self.load_classrooms)
+        self.create_file_input(left_panel, "Pinned Sessions CSV (optional)", self.load_pins)
+        self.create_file_input(left_panel, "Score Weights JSON (optional)", self.load_score_weights)
+        self.create_file_input(left_panel, "Constraint Plugin (optional)", self.load_constraints)
         
         # Status display
         status_frame = tk.Frame(left_panel, bg="#f8f9fa", relief=tk.FLAT, bd=0)
@@ -359,10 +634,60 @@ class TimetableScheduler:
         generate_frame = tk.Frame(left_panel, bg="white")
         generate_frame.pack(pady=15, padx=20, fill=tk.X)
         
+        mode_row = tk.Frame(generate_frame, bg="white")
+        mode_row.pack(fill=tk.X, pady=(0, 8))
+        
+        tk.Label(mode_row, text="Mode:", bg="white", fg="#5d6d7e",
+                font=("Comic Sans", 9)).pack(side=tk.LEFT, padx=(0, 5))
+        self.mode_dropdown = ttk.Combobox(mode_row, values=list(self.solver_modes.values()),
+                                          state="readonly", font=("Comic Sans", 9),
+                                          style='Custom.TCombobox')
+        self.mode_dropdown.set(self.solver_modes[self.solver_mode])
+        self.mode_dropdown.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
         generate_btn = self.create_modern_button(generate_frame, "Generate Timetable",
                                                  self.generate_schedule, "#402525")
         generate_btn.pack(fill=tk.X)
         
+        resolve_btn = self.create_modern_button(generate_frame, "Re-solve Changes",
+                                                self.reschedule_changes, "#7f8c8d")
+        resolve_btn.pack(fill=tk.X, pady=(5, 0))
+        
+        checkpoint_row = tk.Frame(generate_frame, bg="white")
+        checkpoint_row.pack(fill=tk.X, pady=(5, 0))
+        
+        self.checkpoint_enabled = tk.BooleanVar(value=False)
+        tk.Checkbutton(checkpoint_row, text="Save checkpoints", variable=self.checkpoint_enabled,
+                      bg="white", fg="#2c3e50", font=("Comic Sans", 9), activebackground="white",
+                      cursor="hand2").pack(side=tk.LEFT)
+        self.telemetry_checkbox = tk.BooleanVar(value=False)
+        tk.Checkbutton(checkpoint_row, text="Statistics", variable=self.telemetry_checkbox,
+                      bg="white", fg="#2c3e50", font=("Comic Sans", 9), activebackground="white",
+                      cursor="hand2").pack(side=tk.LEFT)
+        tk.Button(checkpoint_row, text="Resume…", command=self.resume_schedule,
+                 bg="#ecf0f1", fg="black", font=("Comic Sans", 9), relief=tk.FLAT,
+                 cursor="hand2", borderwidth=0).pack(side=tk.RIGHT)
+        
+        options_row = tk.Frame(generate_frame, bg="white")
+        options_row.pack(fill=tk.X)
+        
+        self.trace_enabled = tk.BooleanVar(value=False)
+        tk.Checkbutton(options_row, text="Record search trace", variable=self.trace_enabled,
+                      bg="white", fg="#2c3e50", font=("Comic Sans", 9), activebackground="white",
+                      cursor="hand2").pack(side=tk.LEFT)
+        self.profile_enabled = tk.BooleanVar(value=False)
+        tk.Checkbutton(options_row, text="Profile", variable=self.profile_enabled,
+                      bg="white", fg="#2c3e50", font=("Comic Sans", 9), activebackground="white",
+                      cursor="hand2").pack(side=tk.LEFT)
+        self.lab_rotation_enabled = tk.BooleanVar(value=False)
+        tk.Checkbutton(options_row, text="Rotate lab batches", variable=self.lab_rotation_enabled,
+                      bg="white", fg="#2c3e50", font=("Comic Sans", 9), activebackground="white",
+                      cursor="hand2").pack(side=tk.LEFT)
+        self.defer_rooms_enabled = tk.BooleanVar(value=False)
+        tk.Checkbutton(options_row, text="Assign rooms last", variable=self.defer_rooms_enabled,
+                      bg="white", fg="#2c3e50", font=("Comic Sans", 9), activebackground="white",
+                      cursor="hand2").pack(side=tk.LEFT)
+        
         self.progress_label = tk.Label(generate_frame, text="", font=("Comic Sans", 9, "italic"),
                                       bg="white", fg="#7f8c8d")
         self.progress_label.pack(pady=(8, 0))
@@ -415,6 +740,16 @@ class TimetableScheduler:
                                                    self.export_pdf, "#e74c3c")
         export_pdf_btn.pack(fill=tk.X)
         
+        save_btn = self.create_modern_button(export_frame, "Save Schedule", self.save_schedule, "#27ae60")
+        save_btn.pack(fill=tk.X, pady=(5, 0))
+        
+        open_btn = self.create_modern_button(export_frame, "Open Schedule", self.open_schedule, "#2980b9")
+        open_btn.pack(fill=tk.X, pady=(5, 0))
+        
+        validate_btn = self.create_modern_button(export_frame, "Validate Schedule CSV",
+                                                 self.validate_schedule_file, "#16a085")
+        validate_btn.pack(fill=tk.X, pady=(5, 0))
+        
         # Middle panel - Tools
         middle_panel = tk.Frame(main_container, bg="white", relief=tk.FLAT, bd=0, width=300)
         middle_panel.pack(side=tk.LEFT, fill=tk.BOTH, padx=(0, 15))
@@ -539,131 +874,295 @@ class TimetableScheduler:
         btn = self.create_modern_button(frame, "Choose File", command, "#ecf0f1")
         btn.pack(fill=tk.X)
     
+    def refresh_input_choices(self):
+        """Refill the tool dropdowns after the calendar or the datasets change"""
+        self.find_day['values'] = self.days
+        self.find_time['values'] = self.time_slots
+        self.add_day['values'] = self.days
+        self.add_time['values'] = self.time_slots
+        self.add_course['values'] = [c['name'] for c in self.courses]
+        self.add_teacher['values'] = [t['teacher_name'] for t in self.teachers]
+        self.add_classroom['values'] = [c['room'] for c in self.classrooms]
+    
     def load_courses(self):
         """Load courses CSV: name, semester, no_of_batches, capacity, courses"""
         filename = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if filename:
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    self.courses = list(reader)
-                    
-                for course in self.courses:
-                    course['no_of_batches'] = int(course.get('no_of_batches', 1))
-                    course['capacity'] = int(course.get('capacity', 60))
-                    
+                self.read_courses(filename)
                 self.add_course['values'] = [c['name'] for c in self.courses]
                 messagebox.showinfo("Success", f"Loaded {len(self.courses)} courses")
                 self.update_status()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load courses: {str(e)}")
     
+    def read_courses(self, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            self.courses = list(reader)
+            
+        for course in self.courses:
+            course['no_of_batches'] = int(course.get('no_of_batches', 1))
+            course['capacity'] = int(course.get('capacity', 60))
+    
     def load_subject_details(self):
         """Load subject details CSV: subject, department, lecture_hours, lab_hours, tutorial_hours"""
         filename = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if filename:
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        subject_name = row['subject'].strip()
-                        self.subject_details[subject_name] = {
-                            'department': row['department'].strip(),
-                            'lecture_hours': int(row.get('lecture_hours', 0)),
-                            'lab_hours': int(row.get('lab_hours', 0)),
-                            'tutorial_hours': int(row.get('tutorial_hours', 0))
-                        }
+                self.read_subject_details(filename)
                 messagebox.showinfo("Success", f"Loaded {len(self.subject_details)} subject details")
                 self.update_status()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load subject details: {str(e)}")
     
+    def read_subject_details(self, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                subject_name = row['subject'].strip()
+                self.subject_details[subject_name] = {
+                    'department': row['department'].strip(),
+                    'lecture_hours': int(row.get('lecture_hours', 0)),
+                    'lab_hours': int(row.get('lab_hours', 0)),
+                    'tutorial_hours': int(row.get('tutorial_hours', 0))
+                }
+    
     def load_teachers(self):
         filename = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if filename:
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    self.teachers = list(reader)
+                self.read_teachers(filename)
                 self.add_teacher['values'] = [t['teacher_name'] for t in self.teachers]
                 messagebox.showinfo("Success", f"Loaded {len(self.teachers)} teachers")
                 self.update_status()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load teachers: {str(e)}")
     
+    def read_teachers(self, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            self.teachers = list(reader)
+    
     def load_availability(self):
         filename = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if filename:
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    
-                    for row in reader:
-                        teacher = None
-                        if 'teacher_name' in row:
-                            teacher = row['teacher_name']
-                        elif 'Teacher Name' in row:
-                            teacher = row['Teacher Name']
-                        elif 'Teacher' in row:
-                            teacher = row['Teacher']
-                        else:
-                            first_col = list(row.keys())[0] if row else None
-                            teacher = row.get(first_col) if first_col else None
-                        
-                        if not teacher:
-                            continue
-                        
-                        faculty_type = row.get('type of faculty', '').lower()
-                        if not faculty_type:
-                            faculty_type = row.get('faculty_type', 'permanent').lower()
-                        
-                        availability = {}
-                        
-                        for day in self.days:
-                            day_availability = row.get(day, '').strip()
-                            if day_availability and day_availability.lower() != 'na':
-                                time_ranges = [t.strip() for t in day_availability.split(';')]
-                                valid_slots = []
-                                for time_range in time_ranges:
-                                    expanded = self.expand_time_range(time_range)
-                                    valid_slots.extend(expanded)
-                                availability[day] = valid_slots
-                            else:
-                                availability[day] = []
-                        
-                        self.teacher_availability[teacher] = {
-                            'availability': availability,
-                            'faculty_type': faculty_type
-                        }
-                        
+                self.read_availability(filename)
                 messagebox.showinfo("Success", f"Loaded availability for {len(self.teacher_availability)} teachers")
                 self.update_status()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load availability: {str(e)}")
     
+    def read_availability(self, filename):
+        """
+        Teacher availability: one row per teacher, a column per day holding time ranges
+        separated by ';' or NA. Raises ValueError listing every malformed range; nothing is
+        loaded then.
+        """
+        teacher_availability = {}
+        errors = []
+        with open(filename, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            
+            for row in reader:
+                teacher = None
+                if 'teacher_name' in row:
+                    teacher = row['teacher_name']
+                elif 'Teacher Name' in row:
+                    teacher = row['Teacher Name']
+                elif 'Teacher' in row:
+                    teacher = row['Teacher']
+                else:
+                    first_col = list(row.keys())[0] if row else None
+                    teacher = row.get(first_col) if first_col else None
+                
+                if not teacher:
+                    continue
+                
+                faculty_type = row.get('type of faculty', '').lower()
+                if not faculty_type:
+                    faculty_type = row.get('faculty_type', 'permanent').lower()
+                
+                availability = {}
+                masks = {}
+                
+                for day in self.days:
+                    day_availability = (row.get(day) or '').strip()
+                    mask = 0
+                    if day_availability and day_availability.lower() != 'na':
+                        for time_range in day_availability.split(';'):
+                            if not time_range.strip():
+                                continue
+                            try:
+                                mask |= self.time_range_mask(time_range)
+                            except ValueError as e:
+                                errors.append(f"{teacher}, {day}: {e}")
+                    # Slots the calendar closes on this day are never available
+                    masks[day] = mask & self.open_slots[day]
+                    availability[day] = self.mask_slots(masks[day])
+                
+                teacher_availability[teacher] = {
+                    'availability': availability,
+                    'masks': masks,
+                    'faculty_type': faculty_type
+                }
+        
+        if errors:
+            raise ValueError("Malformed availability:\n" + "\n".join(errors))
+        self.teacher_availability.update(teacher_availability)
+    
     def load_classrooms(self):
         """Load classrooms CSV: class_type, room, department, capacity"""
         filename = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if filename:
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    self.classrooms = []
-                    for row in reader:
-                        classroom = {
-                            'class_type': row['class_type'].strip(),
-                            'room': row['room'].strip(),
-                            'department': row['department'].strip(),
-                            'capacity': int(row['capacity'])
-                        }
-                        self.classrooms.append(classroom)
-                        
+                self.read_classrooms(filename)
                 self.add_classroom['values'] = [c['room'] for c in self.classrooms]
                 messagebox.showinfo("Success", f"Loaded {len(self.classrooms)} classrooms")
                 self.update_status()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load classrooms: {str(e)}")
     
+    def read_classrooms(self, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            self.classrooms = []
+            self.suitable_rooms_cache = {}
+            for row in reader:
+                classroom = {
+                    'class_type': row['class_type'].strip(),
+                    'room': row['room'].strip(),
+                    'department': row['department'].strip(),
+                    'capacity': int(row['capacity'])
+                }
+                self.classrooms.append(classroom)
+    
+    def load_calendar(self):
+        filename = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
+        if filename:
+            try:
+                self.read_calendar(filename)
+                message = (f"Loaded calendar: {len(self.time_slots)} slots of {self.slot_minutes} "
+                           f"minutes a day")
+                if self.teacher_availability:
+                    message += "\nLoad the teacher availability again to match the new slots"
+                self.refresh_input_choices()
+                messagebox.showinfo("Success", message)
+                self.update_status()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load calendar: {str(e)}")
+    
+    def load_score_weights(self):
+        filename = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
+        if filename:
+            try:
+                self.read_score_weights(filename)
+                overrides = len(self.score_weights['departments'])
+                messagebox.showinfo("Success", f"Loaded score weights ({overrides} department overrides)")
+                self.update_status()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load score weights: {str(e)}")
+    
+    def load_constraints(self):
+        filename = filedialog.askopenfilename(filetypes=[("Python files", "*.py")])
+        if filename:
+            try:
+                added = self.read_constraints(filename)
+                messagebox.showinfo("Success", f"Loaded {added} constraints "
+                                               f"({len(self.constraints)} in total)")
+                self.update_status()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load constraints: {str(e)}")
+    
+    def load_pins(self):
+        """Load pinned sessions CSV: day, time, course, subject, teacher, classroom, type"""
+        filename = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+        if filename:
+            try:
+                self.read_pins(filename)
+                messagebox.showinfo("Success", f"Loaded {len(self.pins)} pinned sessions")
+                self.update_status()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load pinned sessions: {str(e)}")
+    
+    def read_pins(self, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            self.pins = []
+            for row in reader:
+                self.add_pin(row['course'], row['subject'], row['teacher'], row['day'],
+                             row['time'], row['classroom'], row.get('type') or 'lecture')
+    
+    def add_pin(self, course, subject, teacher, day, slot, classroom, session_type='lecture'):
+        """Fix a session before generation; it is applied to the grid before the search starts"""
+        if day not in self.days:
+            raise ValueError(f"Unknown day '{day}' for pinned {course} {subject}")
+        if slot.strip() not in self.time_slots:
+            raise ValueError(f"Unknown time slot '{slot}' for pinned {course} {subject}")
+        
+        self.pins.append({
+            'course': course.strip(),
+            'subject': subject.strip(),
+            'teacher': teacher.strip(),
+            'day': day,
+            'time': slot.strip(),
+            'classroom': classroom.strip(),
+            'type': session_type.strip().lower()
+        })
+    
+    def apply_pins(self, requirements, grid, assignments):
+        """
+        Place every pinned session into grid/assignments and return the requirements left
+        to search. Pins matching a requirement take its place; other pins only reserve
+        their teacher, room and course slots. Raises ValueError on clashing pins.
+        """
+        if not self.pins:
+            return requirements
+        
+        matched = self.match_entries_to_requirements(self.pins, requirements)
+        matched_pins = {id(pin): r for r, pin in matched.items()}
+        errors = []
+        
+        for pin in self.pins:
+            r = matched_pins.get(id(pin))
+            duration = requirements[r]['duration'] if r is not None else \
+                self.session_slots.get(pin['type'], self.session_slots['lecture'])
+            label = f"{pin['day']} {pin['time']} {pin['course']} {pin['subject']}"
+            if pin['time'] not in self.slot_index:
+                errors.append(f"{label}: {pin['time']} is not a time slot of the calendar")
+                continue
+            time_idx = self.slot_index[pin['time']]
+            
+            if time_idx + duration > len(self.time_slots):
+                errors.append(f"{label}: runs past the last time slot")
+                continue
+            if not self.can_use_classroom(pin['classroom'], pin['day'], time_idx, duration, grid):
+                errors.append(f"{label}: classroom {pin['classroom']} already pinned")
+                continue
+            clash = None
+            for i in range(duration):
+                for existing in grid[pin['day']][self.time_slots[time_idx + i]]:
+                    if existing['teacher'] == pin['teacher']:
+                        clash = f"teacher {pin['teacher']} already pinned"
+                    elif existing['course'] == pin['course']:
+                        existing_batch = existing['subject'].partition(' - Batch ')[2]
+                        pin_batch = pin['subject'].partition(' - Batch ')[2]
+                        if not (existing_batch and pin_batch and existing_batch != pin_batch):
+                            clash = f"course already has pinned {existing['subject']}"
+            if clash:
+                errors.append(f"{label}: {clash}")
+                continue
+            
+            assignment = dict(pin)
+            self.make_assignment(assignment, duration, time_idx, grid)
+            assignments.append(assignment)
+        
+        if errors:
+            raise ValueError("Pinned sessions clash:\n" + "\n".join(errors))
+        
+        return [lecture for r, lecture in enumerate(requirements) if r not in matched]
+    
     def update_status(self):
         self.status_text.delete(1.0, tk.END)
         status = f"Courses: {len(self.courses)}\n"
@@ -671,6 +1170,8 @@ class TimetableScheduler:
         status += f"Teachers: {len(self.teachers)}\n"
         status += f"Availability: {len(self.teacher_availability)}\n"
         status += f"Classrooms: {len(self.classrooms)}\n"
+        if self.pins:
+            status += f"Pinned: {len(self.pins)}\n"
         if self.schedule:
             status += f"\nClasses: {len(self.schedule)}"
         self.status_text.insert(1.0, status)
@@ -705,22 +1206,21 @@ class TimetableScheduler:
             return
         
         day = self.find_day.get()
-        time = self.find_time.get()
+        slot = self.find_time.get()
         
-        if not day or not time:
+        if not day or slot not in self.slot_index:
             messagebox.showwarning("Warning", "Please select both day and time")
             return
         
-        occupied = set()
-        for entry in self.schedule:
-            if entry['day'] == day and entry['time'] == time:
-                occupied.add(entry['classroom'])
-        
-        empty = [c['room'] for c in self.classrooms if c['room'] not in occupied]
+        # Multi-slot sessions keep a room busy after the slot they start in
+        grid = self.build_schedule_grid(self.schedule)
+        time_idx = self.slot_index[slot]
+        empty = [c['room'] for c in self.classrooms
+                 if self.can_use_classroom(c['room'], day, time_idx, 1, grid)]
         
         self.empty_rooms_text.delete(1.0, tk.END)
         if empty:
-            result = f"Empty on {day[:3]} {time}:\n\n"
+            result = f"Empty on {day[:3]} {slot}:\n\n"
             result += "\n".join(f"• {room}" for room in empty)
         else:
             result = "No empty classrooms."
@@ -732,33 +1232,40 @@ class TimetableScheduler:
         subject = self.add_subject.get()
         teacher = self.add_teacher.get()
         day = self.add_day.get()
-        time = self.add_time.get()
+        slot = self.add_time.get()
         classroom = self.add_classroom.get()
         
-        if not all([course, subject, teacher, day, time, classroom]):
+        if not all([course, subject, teacher, day, slot, classroom]):
             messagebox.showwarning("Warning", "Please fill all fields")
             return
         
-        for entry in self.schedule:
-            if entry['day'] == day and entry['time'] == time:
-                if entry['classroom'] == classroom:
-                    messagebox.showerror("Error", "Classroom occupied")
-                    return
-                if entry['teacher'] == teacher:
-                    messagebox.showerror("Error", "Teacher busy")
-                    return
-                if entry['course'] == course:
-                    messagebox.showerror("Error", "Course has class")
-                    return
+        duration = self.session_slots['lecture']
+        time_idx = self.slot_index.get(slot)
+        if time_idx not in self.start_slots(day, duration):
+            messagebox.showerror("Error", "Lecture does not fit in the day's hours")
+            return
+        
+        grid = self.build_schedule_grid(self.schedule)
+        mask = ((1 << duration) - 1) << time_idx
+        if not self.can_use_classroom(classroom, day, time_idx, duration, grid):
+            messagebox.showerror("Error", "Classroom occupied")
+            return
+        if grid.teacher_busy.get((teacher, day), 0) & mask:
+            messagebox.showerror("Error", "Teacher busy")
+            return
+        if any(busy & mask for busy in grid.course_busy.get((course, day), {}).values()):
+            messagebox.showerror("Error", "Course has class")
+            return
         
         self.schedule.append({
             'course': course,
             'subject': subject,
             'teacher': teacher,
             'day': day,
-            'time': time,
+            'time': slot,
             'classroom': classroom,
-            'type': 'lecture'
+            'type': 'lecture',
+            'duration': duration
         })
         
         self.display_schedule()
@@ -766,7 +1273,7 @@ class TimetableScheduler:
         messagebox.showinfo("Success", "Lecture added")
         self.add_subject.delete(0, tk.END)
     
-    def generate_schedule(self):
+    def generate_schedule(self, resume_path=None):
         if not all([self.courses, self.teachers, self.classrooms, self.subject_details]):
             messagebox.showerror("Error", "Please load all required data files")
             return
@@ -774,43 +1281,247 @@ class TimetableScheduler:
         self.progress_label.config(text="Initializing CSP algorithm...")
         self.root.update()
         
+        self.read_solver_settings()
+        
+        try:
+            if self.profile_path:
+                success, assignments = self.profile_call(self.solve_schedule, resume_path)
+            else:
+                success, assignments = self.solve_schedule(resume_path)
+            
+            if self.telemetry_enabled:
+                self.show_telemetry()
+            
+            if success:
+                self.schedule = assignments
+                self.progress_label.config(text="✓ Complete! Schedule generated successfully")
+                self.on_view_change()
+                self.display_schedule()
+                self.update_status()
+                messagebox.showinfo("Success", f"Generated {len(self.schedule)} classes!")
+            else:
+                self.progress_label.config(text="✗ Failed - Could not satisfy all constraints")
+                messagebox.showerror("Error", "Could not generate valid schedule with current constraints.\nTry: More classrooms, fewer courses, or relaxed availability.")
+        
+        except Exception as e:
+            self.progress_label.config(text="✗ Error occurred")
+            messagebox.showerror("Error", f"Schedule generation failed: {str(e)}")
+    
+    def solve_schedule(self, resume_path=None):
+        """Build the requirements from the loaded data and run the selected solver; returns (success, assignments)"""
+        if self.telemetry_enabled:
+            self.start_telemetry()
+        
         try:
+            phase_start = time.perf_counter()
             lecture_requirements = self.build_lecture_requirements()
             
             if not lecture_requirements:
-                messagebox.showerror("Error", "No lecture requirements found. Check that courses match subject details.")
-                return
+                raise ValueError("No lecture requirements found. Check that courses match subject details.")
             
-            teacher_subjects = defaultdict(list)
-            for teacher in self.teachers:
-                subjects = teacher.get('subjects', '').split(',')
-                for subject in subjects:
-                    teacher_subjects[subject.strip()].append(teacher['teacher_name'])
+            teacher_subjects = self.build_teacher_subjects()
+            schedule_grid = self.create_empty_grid()
+            self.weigh_rooms(lecture_requirements)
+            self.compile_scoring()
+            self.compile_constraints()
+            self.record_phase("requirements", phase_start)
             
-            schedule_grid = {}
-            for day in self.days:
-                schedule_grid[day] = {}
-                for time in self.time_slots:
-                    schedule_grid[day][time] = []
+            phase_start = time.perf_counter()
+            assignments = []
+            lecture_requirements = self.apply_pins(lecture_requirements, schedule_grid, assignments)
+            self.record_phase("pins", phase_start)
+            
+            if self.feasibility_check:
+                phase_start = time.perf_counter()
+                self.feasibility_report = self.analyze_feasibility(lecture_requirements, teacher_subjects,
+                                                                   schedule_grid, assignments)
+                self.record_phase("feasibility", phase_start)
+                if self.feasibility_report:
+                    raise ValueError("The timetable cannot be completed:\n" + "\n".join(self.feasibility_report))
+            
+            if self.teacher_allocation_enabled:
+                phase_start = time.perf_counter()
+                self.teacher_allocation = self.allocate_teachers(lecture_requirements, teacher_subjects,
+                                                                 assignments)
+                self.record_phase("teachers", phase_start)
             
+            phase_start = time.perf_counter()
+            if self.solver_mode == "tabu":
+                success = self.tabu_search(lecture_requirements, teacher_subjects,
+                                           schedule_grid, assignments)
+            elif self.solver_mode == "lns":
+                success = self.large_neighborhood_search(lecture_requirements, teacher_subjects,
+                                                         schedule_grid, assignments)
+            elif self.solver_mode == "genetic":
+                success = self.genetic_search(lecture_requirements, teacher_subjects,
+                                              schedule_grid, assignments)
+            elif self.solver_mode == "beam":
+                success = self.beam_search(lecture_requirements, teacher_subjects,
+                                           schedule_grid, assignments)
+            else:
+                success = self.backtrack_with_checkpoints(lecture_requirements, teacher_subjects,
+                                                          schedule_grid, assignments, resume_path)
+                if success and self.checkpoint_path and os.path.exists(self.checkpoint_path):
+                    os.remove(self.checkpoint_path)
+            self.record_phase("search", phase_start)
+            
+            return success, assignments
+        
+        finally:
+            self.teacher_allocation = {}
+            if self.telemetry is not None:
+                self.finish_telemetry()
+    
+    def profile_call(self, func, *args):
+        """
+        Run func under cProfile and tracemalloc. The raw stats are saved to profile_path
+        (load them with pstats or snakeviz) and a text report is written next to it.
+        """
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        profiler.enable()
+        try:
+            return func(*args)
+        finally:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            profiler.dump_stats(self.profile_path)
+            self.write_profile_report(profiler, snapshot, peak_memory)
+    
+    def write_profile_report(self, profiler, snapshot, peak_memory):
+        report = io.StringIO()
+        top = self.profile_top
+        
+        report.write(f"Top {top} functions by cumulative time\n")
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(top)
+        
+        report.write("Solver hot path\n")
+        hot_path = r"\((" + "|".join(self.profiled_functions) + r")\)$"
+        pstats.Stats(profiler, stream=report).sort_stats('tottime').print_stats(hot_path)
+        
+        report.write(f"Peak traced memory: {peak_memory / 1024:.1f} KiB\n\n")
+        report.write(f"Top {top} allocation sites\n")
+        for stat in snapshot.statistics('lineno')[:top]:
+            report.write(f"{stat}\n")
+        
+        report_path = os.path.splitext(self.profile_path)[0] + ".txt"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+    
+    def reschedule_changes(self):
+        """Re-solve the current schedule against reloaded inputs, keeping every placement still valid"""
+        if not self.schedule:
+            messagebox.showwarning("Warning", "Generate schedule first")
+            return
+        
+        if not all([self.courses, self.teachers, self.classrooms, self.subject_details]):
+            messagebox.showerror("Error", "Please load all required data files")
+            return
+        
+        self.report_progress("Re-solving changed requirements...")
+        
+        try:
+            lecture_requirements = self.build_lecture_requirements()
+            teacher_subjects = self.build_teacher_subjects()
+            schedule_grid = self.create_empty_grid()
+            self.compile_scoring()
+            self.compile_constraints()
             assignments = []
-            success = self.backtrack(0, lecture_requirements, teacher_subjects, 
-                                    schedule_grid, assignments, 0)
+            
+            start = time.perf_counter()
+            lecture_requirements = self.apply_pins(lecture_requirements, schedule_grid, assignments)
+            pinned = defaultdict(int)
+            for pin in self.pins:
+                pinned[(pin['course'], pin['subject'], pin['day'], pin['time'])] += 1
+            previous_schedule = []
+            for entry in self.schedule:
+                key = (entry['course'], entry['subject'], entry['day'], entry['time'])
+                if pinned[key] > 0:
+                    pinned[key] -= 1
+                else:
+                    previous_schedule.append(entry)
+            
+            if self.teacher_allocation_enabled:
+                self.teacher_allocation = self.allocate_teachers(lecture_requirements, teacher_subjects,
+                                                                 assignments, previous_schedule)
+            try:
+                success, changed = self.warm_start_schedule(previous_schedule, lecture_requirements,
+                                                            teacher_subjects, schedule_grid, assignments)
+            finally:
+                self.teacher_allocation = {}
+            elapsed_ms = (time.perf_counter() - start) * 1000
             
             if success:
                 self.schedule = assignments
-                self.progress_label.config(text="✓ Complete! Schedule generated successfully")
+                self.progress_label.config(text=f"✓ Re-solved in {elapsed_ms:.0f} ms, {changed} classes changed")
                 self.on_view_change()
                 self.display_schedule()
                 self.update_status()
-                messagebox.showinfo("Success", f"Generated {len(self.schedule)} classes!")
+                messagebox.showinfo("Success", f"Schedule updated: {changed} classes changed")
             else:
                 self.progress_label.config(text="✗ Failed - Could not satisfy all constraints")
-                messagebox.showerror("Error", "Could not generate valid schedule with current constraints.\nTry: More classrooms, fewer courses, or relaxed availability.")
+                messagebox.showerror("Error", "Could not repair the schedule with the changed inputs.")
         
         except Exception as e:
             self.progress_label.config(text="✗ Error occurred")
-            messagebox.showerror("Error", f"Schedule generation failed: {str(e)}")
+            messagebox.showerror("Error", f"Re-scheduling failed: {str(e)}")
+    
+    def report_progress(self, text):
+        if self.root is None:
+            return
+        self.progress_label.config(text=text)
+        self.root.update()
+    
+    def read_solver_settings(self):
+        """Copy the solver options selected in the UI into the solver settings"""
+        selected = self.mode_dropdown.get()
+        for mode, label in self.solver_modes.items():
+            if label == selected:
+                self.solver_mode = mode
+        
+        self.checkpoint_path = "timetable_checkpoint.ttck" if self.checkpoint_enabled.get() else None
+        self.telemetry_enabled = self.telemetry_checkbox.get()
+        self.trace_path = "timetable_trace.jsonl" if self.trace_enabled.get() else None
+        self.profile_path = "timetable_profile.pstats" if self.profile_enabled.get() else None
+        self.defer_rooms = self.defer_rooms_enabled.get()
+        self.lab_rotation = self.lab_rotation_enabled.get()
+        self.telemetry_listener = self.show_live_telemetry if self.telemetry_enabled else None
+    
+    def resume_schedule(self):
+        """Continue an interrupted backtracking solve from a checkpoint file"""
+        filename = filedialog.askopenfilename(filetypes=[("Checkpoint files", "*.ttck")])
+        if filename:
+            self.mode_dropdown.set(self.solver_modes["backtrack"])
+            self.generate_schedule(resume_path=filename)
+    
+    def build_teacher_subjects(self):
+        """Map each subject to the list of teachers qualified to teach it"""
+        teacher_subjects = defaultdict(list)
+        for teacher in self.teachers:
+            subjects = teacher.get('subjects', '').split(',')
+            for subject in subjects:
+                teacher_subjects[subject.strip()].append(teacher['teacher_name'])
+        return teacher_subjects
+    
+    def create_empty_grid(self):
+        return ScheduleGrid(self.days, self.time_slots)
+    
+    def build_schedule_grid(self, entries):
+        """Grid holding schedule entries (e.g. self.schedule), to check a manual change against"""
+        grid = self.create_empty_grid()
+        for entry in entries:
+            time_idx = self.slot_index.get(entry['time'])
+            if entry['day'] not in grid or time_idx is None:
+                continue
+            assignment = dict(entry)
+            assignment.setdefault('type', 'lecture')
+            duration = entry.get('duration') or \
+                self.session_slots.get(assignment['type'], self.session_slots['lecture'])
+            self.make_assignment(assignment, min(duration, len(self.time_slots) - time_idx),
+                                 time_idx, grid)
+        return grid
     
     def build_lecture_requirements(self):
         """Build lecture requirements from courses and subject details"""
@@ -829,28 +1540,29 @@ class TimetableScheduler:
                 details = self.subject_details[subject]
                 department = details['department']
                 
-                for i in range(details['lecture_hours']):
+                lecture_sessions = round(details['lecture_hours'] * 60 / self.calendar['lecture_minutes'])
+                for i in range(lecture_sessions):
                     requirements.append({
                         'course': course_name,
                         'subject': subject,
                         'type': 'lecture',
-                        'duration': 1,
+                        'duration': self.session_slots['lecture'],
                         'department': department,
                         'capacity_needed': total_capacity,
                         'batch': None
                     })
                 
                 lab_hours = details['lab_hours']
-                if lab_hours >= 2:
+                if lab_hours * 60 >= self.calendar['lab_minutes']:
                     batch_capacity = total_capacity // no_of_batches if no_of_batches > 0 else total_capacity
                     for batch_num in range(no_of_batches):
-                        num_lab_sessions = lab_hours // 2
+                        num_lab_sessions = lab_hours * 60 // self.calendar['lab_minutes']
                         for session in range(num_lab_sessions):
                             requirements.append({
                                 'course': course_name,
                                 'subject': f"{subject} (Lab)",
                                 'type': 'lab',
-                                'duration': 2,
+                                'duration': self.session_slots['lab'],
                                 'department': department,
                                 'capacity_needed': batch_capacity,
                                 'batch': f"Batch {batch_num + 1}" if no_of_batches > 1 else None
@@ -860,12 +1572,12 @@ class TimetableScheduler:
                 if tutorial_hours > 0:
                     batch_capacity = total_capacity // no_of_batches if no_of_batches > 0 else total_capacity
                     for batch_num in range(no_of_batches):
-                        for i in range(tutorial_hours):
+                        for i in range(tutorial_hours * 60 // self.calendar['tutorial_minutes']):
                             requirements.append({
                                 'course': course_name,
                                 'subject': f"{subject} (Tutorial)",
                                 'type': 'tutorial',
-                                'duration': 1,
+                                'duration': self.session_slots['tutorial'],
                                 'department': department,
                                 'capacity_needed': batch_capacity,
                                 'batch': f"Batch {batch_num + 1}" if no_of_batches > 1 else None
@@ -873,468 +1585,2404 @@ class TimetableScheduler:
         
         return requirements
     
+    def analyze_feasibility(self, requirements, teacher_subjects, grid, assignments):
+        """
+        Necessary conditions for a complete timetable, checked by counting before any search.
+        Returns a list of readable problems; an empty list does not prove the timetable exists.
+        """
+        problems = []
+        problems.extend(self.check_teacher_feasibility(requirements, teacher_subjects, assignments))
+        room_problems = self.check_room_feasibility(requirements, grid)
+        problems.extend(room_problems)
+        if not room_problems:
+            problems.extend(self.check_room_matching(requirements, teacher_subjects, grid))
+        problems.extend(self.check_course_feasibility(requirements, assignments))
+        return problems
+    
+    def allocate_teachers(self, requirements, teacher_subjects, assignments, preferred_entries=None):
+        """
+        First phase of the solve: give every (course, subject) one teacher, so the timetable
+        search no longer branches on teachers. Subjects with the fewest qualified teachers and
+        the most hours go first, each to the least loaded qualified teacher (or its preferred
+        one) with room under min(max_weekly_hours, available hours). When nobody has room, one
+        subject is moved off a qualified teacher to make space. Subjects with pinned sessions
+        keep their teachers and are never moved.
+        Returns {(course, subject): teacher}; subjects that could not be placed are left out
+        and listed in unallocated_subjects.
+        """
+        def block_key(course, subject):
+            subject = subject.partition(' - Batch ')[0]
+            return (course, subject.replace(' (Lab)', '').replace(' (Tutorial)', ''))
+        
+        capacity = {}
+        for teacher in self.teachers:
+            name = teacher['teacher_name']
+            capacity[name] = self.max_weekly_slots
+            if name in self.teacher_availability:
+                availability = self.teacher_availability[name].get('availability', {})
+                capacity[name] = min(self.max_weekly_slots,
+                                     sum(len(availability.get(day, [])) for day in self.days))
+        
+        allocation = {}
+        load = defaultdict(int)
+        for a in assignments:
+            load[a['teacher']] += a.get('duration', 1)
+            allocation.setdefault(block_key(a['course'], a['subject']), a['teacher'])
+        pinned = set(allocation)
+        
+        preferred = {}
+        for entry in preferred_entries or []:
+            preferred.setdefault(block_key(entry['course'], entry['subject']), entry['teacher'])
+        
+        hours = defaultdict(int)
+        for lecture in requirements:
+            hours[block_key(lecture['course'], lecture['subject'])] += lecture['duration']
+        
+        def room_for(teacher):
+            return capacity.get(teacher, self.max_weekly_slots) - load[teacher]
+        
+        def qualified(block):
+            return list(dict.fromkeys(teacher_subjects.get(block[1], [])))
+        
+        blocks = [b for b in hours if b not in allocation and qualified(b)]
+        blocks.sort(key=lambda b: (len(qualified(b)), -hours[b], b))
+        self.unallocated_subjects = []
+        
+        for block in blocks:
+            teachers = qualified(block)
+            fitting = [t for t in teachers if room_for(t) >= hours[block]]
+            if preferred.get(block) in fitting:
+                teacher = preferred[block]
+            elif fitting:
+                teacher = min(fitting, key=lambda t: ((load[t] + hours[block]) /
+                                                      max(capacity.get(t, self.max_weekly_slots), 1), t))
+            else:
+                teacher = self.make_room_for_block(block, teachers, hours, allocation, load,
+                                                   room_for, qualified, pinned)
+            
+            if teacher is None:
+                self.unallocated_subjects.append(block)
+                continue
+            allocation[block] = teacher
+            load[teacher] += hours[block]
+        
+        return allocation
+    
+    def make_room_for_block(self, block, teachers, hours, allocation, load, room_for, qualified, pinned):
+        """
+        Move one allocated subject off a qualified teacher so block fits there; returns that
+        teacher. Subjects in pinned (from pinned or kept sessions) stay with their teachers.
+        """
+        for teacher in teachers:
+            for other, holder in list(allocation.items()):
+                if holder != teacher or other in pinned or other not in hours or \
+                        room_for(teacher) + hours[other] < hours[block]:
+                    continue
+                for substitute in qualified(other):
+                    if substitute != teacher and room_for(substitute) >= hours[other]:
+                        allocation[other] = substitute
+                        load[substitute] += hours[other]
+                        load[teacher] -= hours[other]
+                        return teacher
+        return None
+    
+    def check_teacher_feasibility(self, requirements, teacher_subjects, assignments):
+        problems = []
+        missing = defaultdict(list)
+        forced_hours = defaultdict(int)
+        forced_subjects = defaultdict(set)
+        
+        for lecture in requirements:
+            subject_clean = lecture['subject'].replace(' (Lab)', '').replace(' (Tutorial)', '')
+            teachers = teacher_subjects.get(subject_clean, [])
+            if not teachers:
+                missing[subject_clean].append(lecture['course'])
+            elif len(set(teachers)) == 1:
+                forced_hours[teachers[0]] += lecture['duration']
+                forced_subjects[teachers[0]].add(subject_clean)
+        
+        for subject, courses in missing.items():
+            problems.append(f"No teacher can teach {subject} "
+                            f"({len(courses)} sessions for {', '.join(sorted(set(courses)))})")
+        
+        pinned_hours = defaultdict(int)
+        for a in assignments:
+            pinned_hours[a['teacher']] += a.get('duration', 1)
+        
+        for teacher, hours in forced_hours.items():
+            subjects = ', '.join(sorted(forced_subjects[teacher]))
+            if hours + pinned_hours[teacher] > self.max_weekly_slots:
+                pinned = ""
+                if pinned_hours[teacher]:
+                    pinned = f" plus {self.session_hours(pinned_hours[teacher]):g} pinned"
+                problems.append(f"{teacher} is the only teacher for {subjects}: "
+                                f"{self.session_hours(hours):g} hours{pinned} "
+                                f"a week, over the {self.max_weekly_hours}-hour limit")
+            if teacher in self.teacher_availability:
+                availability = self.teacher_availability[teacher].get('availability', {})
+                available_slots = sum(len(availability.get(day, [])) for day in self.days)
+                if hours > available_slots:
+                    problems.append(f"{teacher} is the only teacher for {subjects}: "
+                                    f"{self.session_hours(hours):g} hours a week but available "
+                                    f"for only {self.session_hours(available_slots):g}")
+        
+        return problems
+    
+    def check_room_feasibility(self, requirements, grid):
+        """
+        Every group of sessions whose suitable rooms all lie within a room set S must fit in
+        the free time of S: in slots, and for multi-slot sessions in free windows of their length.
+        """
+        problems = []
+        free_hours = {}
+        free_runs = {}
+        for classroom in self.classrooms:
+            room = classroom['room']
+            free_hours[room] = 0
+            free_runs[room] = []
+            for day in self.days:
+                free = self.open_slots[day] & ~grid.room_busy.get((room, day), 0)
+                free_hours[room] += bin(free).count('1')
+                run = 0
+                for t in range(len(self.time_slots) + 1):
+                    if (free >> t) & 1:
+                        run += 1
+                    elif run:
+                        free_runs[room].append(run)
+                        run = 0
+        
+        def free_windows(room, duration):
+            return sum(run // duration for run in free_runs[room])
+        
+        groups = {}
+        suitable_rooms = {}
+        for lecture in requirements:
+            key = (lecture['type'], lecture['department'], lecture['capacity_needed'])
+            if key not in suitable_rooms:
+                suitable_rooms[key] = frozenset(c['room'] for c in self.get_suitable_classrooms(lecture))
+            rooms = suitable_rooms[key]
+            if not rooms:
+                batch = f" ({lecture['batch']})" if lecture.get('batch') else ""
+                problem = (f"No classroom fits {lecture['course']} / {lecture['subject']}{batch}: "
+                           f"needs a {lecture['type']} room for {lecture['capacity_needed']} "
+                           f"students of {lecture['department']}")
+                if problem not in problems:
+                    problems.append(problem)
+                continue
+            group = groups.setdefault(rooms, {'hours': 0, 'windows': defaultdict(int), 'label': lecture})
+            group['hours'] += lecture['duration']
+            if lecture['duration'] > 1:
+                group['windows'][lecture['duration']] += 1
+        
+        for rooms, group in groups.items():
+            hours = sum(g['hours'] for other, g in groups.items() if other <= rooms)
+            capacity_hours = sum(free_hours[room] for room in rooms)
+            window_shortage = None
+            for duration in sorted(group['windows']):
+                windows = sum(g['windows'][duration] for other, g in groups.items() if other <= rooms)
+                capacity_windows = sum(free_windows(room, duration) for room in rooms)
+                if windows > capacity_windows:
+                    length = f"{self.session_hours(duration):g}-hour"
+                    window_shortage = (f"{windows} {length} sessions but {capacity_windows} "
+                                       f"free {length} windows")
+                    break
+            
+            if hours > capacity_hours or window_shortage:
+                lecture = group['label']
+                names = sorted(rooms)
+                room_list = ', '.join(names[:5]) + (f" and {len(names) - 5} more" if len(names) > 5 else "")
+                if window_shortage:
+                    shortage = window_shortage
+                else:
+                    shortage = (f"{self.session_hours(hours):g} hours but "
+                                f"{self.session_hours(capacity_hours):g} free room-hours")
+                problems.append(f"Rooms for {lecture['type']}s of {lecture['department']} "
+                                f"({lecture['capacity_needed']}+ seats: {room_list}): {shortage}")
+        
+        return problems
+    
+    def check_room_matching(self, requirements, teacher_subjects, grid):
+        """
+        Max-flow bound on rooms: session-hours flow to free (room, day, slot) units the session
+        may use, limited by its suitable rooms and the availability of its qualified teachers.
+        Sessions with the same rooms and hours are grouped, and rooms serving the same groups
+        form one room class, so the network stays small. A multi-slot session may take any
+        units, which keeps the bound a relaxation. On a shortfall the minimum cut names the
+        bottleneck room classes and the sessions that cannot all be housed.
+        """
+        slot_count = len(self.time_slots)
+        all_slots = frozenset(d * slot_count + t for d, day in enumerate(self.days)
+                              for t in range(slot_count) if (self.open_slots[day] >> t) & 1)
+        
+        teacher_slots = {}
+        for teacher, data in self.teacher_availability.items():
+            teacher_slots[teacher] = all_slots & frozenset(
+                d * slot_count + t for d, day in enumerate(self.days) for t in range(slot_count)
+                if (self.availability_mask(data, day) >> t) & 1)
+        
+        groups = {}
+        suitable_rooms = {}
+        for lecture in requirements:
+            key = (lecture['type'], lecture['department'], lecture['capacity_needed'])
+            if key not in suitable_rooms:
+                suitable_rooms[key] = frozenset(c['room'] for c in self.get_suitable_classrooms(lecture))
+            subject_clean = lecture['subject'].replace(' (Lab)', '').replace(' (Tutorial)', '')
+            teachers = teacher_subjects.get(subject_clean, [])
+            if not teachers:
+                continue  # already reported by check_teacher_feasibility
+            slots = frozenset()
+            for teacher in teachers:
+                slots |= teacher_slots.get(teacher, all_slots)
+            group_key = (suitable_rooms[key], slots)
+            group = groups.setdefault(group_key, {'hours': 0, 'kinds': defaultdict(int)})
+            group['hours'] += lecture['duration']
+            group['kinds'][(lecture['type'], lecture['department'])] += lecture['duration']
+        
+        group_keys = list(groups)
+        room_signature = defaultdict(set)
+        for g, (rooms, slots) in enumerate(group_keys):
+            for room in rooms:
+                room_signature[room].add(g)
+        room_classes = defaultdict(list)
+        for room, signature in room_signature.items():
+            room_classes[frozenset(signature)].append(room)
+        room_classes = list(room_classes.items())
+        
+        # Nodes: 0 source, 1 sink, then one per group, then one per (room class, slot) in use
+        graph = [[], []]
+        
+        def add_node():
+            graph.append([])
+            return len(graph) - 1
+        
+        def add_edge(u, v, capacity):
+            graph[u].append([v, capacity, len(graph[v])])
+            graph[v].append([u, 0, len(graph[u]) - 1])
+        
+        group_nodes = []
+        for rooms, slots in group_keys:
+            node = add_node()
+            group_nodes.append(node)
+            add_edge(0, node, groups[(rooms, slots)]['hours'])
+        
+        unit_nodes = {}
+        free_rooms = {}
+        for c, (signature, rooms) in enumerate(room_classes):
+            for g in signature:
+                hours = groups[group_keys[g]]['hours']
+                for slot in group_keys[g][1]:
+                    if (c, slot) not in free_rooms:
+                        day, t = self.days[slot // slot_count], slot % slot_count
+                        free_rooms[(c, slot)] = sum(
+                            1 for room in rooms if not (grid.room_busy.get((room, day), 0) >> t) & 1)
+                        if free_rooms[(c, slot)]:
+                            unit_nodes[(c, slot)] = add_node()
+                            add_edge(unit_nodes[(c, slot)], 1, free_rooms[(c, slot)])
+                    if free_rooms[(c, slot)]:
+                        add_edge(group_nodes[g], unit_nodes[(c, slot)], hours)
+        
+        demand = sum(group['hours'] for group in groups.values())
+        flow, reachable = self.max_flow(graph, 0, 1)
+        if flow >= demand:
+            return []
+        
+        short_kinds = defaultdict(int)
+        for g, node in enumerate(group_nodes):
+            if node in reachable:
+                for kind, hours in groups[group_keys[g]]['kinds'].items():
+                    short_kinds[kind] += hours
+        bottleneck_rooms = set()
+        usable_hours = 0
+        for (c, slot), node in unit_nodes.items():
+            if node in reachable:
+                bottleneck_rooms.update(room_classes[c][1])
+                usable_hours += free_rooms[(c, slot)]
+        
+        hours = self.session_hours
+        sessions = ', '.join(f"{hours(slots):g} hours of {session_type}s for {department}"
+                             for (session_type, department), slots in sorted(short_kinds.items()))
+        names = sorted(bottleneck_rooms)
+        room_list = ', '.join(names[:8]) + (f" and {len(names) - 8} more" if len(names) > 8 else "")
+        return [f"Rooms can take at most {hours(flow):g} of the {hours(demand):g} class hours when "
+                f"teacher hours are respected. Bottleneck rooms: {room_list or 'none'} "
+                f"({hours(usable_hours):g} usable hours) for {sessions}"]
+    
+    def max_flow(self, graph, source, sink):
+        """
+        Dinic's algorithm on adjacency lists of [to, capacity, reverse index] edges.
+        Returns the flow value and the nodes still reachable from source in the residual graph.
+        """
+        flow = 0
+        while True:
+            level = [-1] * len(graph)
+            level[source] = 0
+            queue = [source]
+            for u in queue:
+                for v, capacity, rev in graph[u]:
+                    if capacity > 0 and level[v] < 0:
+                        level[v] = level[u] + 1
+                        queue.append(v)
+            if level[sink] < 0:
+                return flow, {u for u in range(len(graph)) if level[u] >= 0}
+            
+            next_edge = [0] * len(graph)
+            
+            def push(u, limit):
+                if u == sink:
+                    return limit
+                edges = graph[u]
+                while next_edge[u] < len(edges):
+                    edge = edges[next_edge[u]]
+                    v, capacity = edge[0], edge[1]
+                    if capacity > 0 and level[v] == level[u] + 1:
+                        pushed = push(v, min(limit, capacity))
+                        if pushed:
+                            edge[1] -= pushed
+                            graph[v][edge[2]][1] += pushed
+                            return pushed
+                    next_edge[u] += 1
+                return 0
+            
+            while True:
+                pushed = push(source, float('inf'))
+                if not pushed:
+                    break
+                flow += pushed
+    
+    def check_course_feasibility(self, requirements, assignments):
+        """Each batch attends its own sessions plus the whole-course ones, at most 8 a day"""
+        problems = []
+        course_hours = defaultdict(lambda: {'hours': 0, 'sessions': 0})
+        batch_hours = defaultdict(lambda: {'hours': 0, 'sessions': 0})
+        
+        for lecture in requirements + assignments:
+            batch = lecture.get('batch')
+            if batch is None and ' - Batch ' in lecture['subject']:
+                batch = 'Batch ' + lecture['subject'].partition(' - Batch ')[2]
+            load = batch_hours[(lecture['course'], batch)] if batch else course_hours[lecture['course']]
+            load['hours'] += lecture.get('duration', 1)
+            load['sessions'] += 1
+        
+        week_hours = sum(bin(self.open_slots[day]).count('1') for day in self.days)
+        week_sessions = len(self.days) * 8
+        batches = defaultdict(list)
+        for course, batch in batch_hours:
+            batches[course].append(batch)
+        
+        for course in set(course_hours) | set(batches):
+            for batch in batches[course] or [None]:
+                hours = course_hours[course]['hours']
+                sessions = course_hours[course]['sessions']
+                if batch:
+                    hours += batch_hours[(course, batch)]['hours']
+                    sessions += batch_hours[(course, batch)]['sessions']
+                label = f"{course} ({batch})" if batch else course
+                if hours > week_hours:
+                    problems.append(f"{label} needs {self.session_hours(hours):g} hours a week but "
+                                    f"a week has {self.session_hours(week_hours):g} teaching hours")
+                elif sessions > week_sessions:
+                    problems.append(f"{label} needs {sessions} sessions a week but at most "
+                                    f"{week_sessions} fit under the 8-a-day limit")
+        
+        return problems
+    
     def backtrack(self, index, requirements, teacher_subjects, grid, assignments, depth=0):
         if index >= len(requirements):
             return True
         
-        if depth > 10000:
+        self.nodes_visited += 1
+        if self.node_limit is not None and self.nodes_visited > self.node_limit:
             return False
         
+        if self.checkpoint_state is not None and time.perf_counter() >= self.checkpoint_state['next_save']:
+            self.write_checkpoint()
+        
+        if self.telemetry is not None:
+            self.record_node(depth)
+        
         lecture = requirements[index]
         
         if index % 3 == 0:
             progress = (index / len(requirements)) * 100
-            self.progress_label.config(text=f"Scheduling: {progress:.0f}% ({index}/{len(requirements)})")
-            self.root.update()
-        
-        subject_clean = lecture['subject'].replace(' (Lab)', '').replace(' (Tutorial)', '')
+            self.report_progress(f"Scheduling: {progress:.0f}% ({index}/{len(requirements)})")
         
-        assigned_teacher = None
-        for a in assignments:
-            if a['course'] == lecture['course']:
-                a_subject_clean = a['subject'].replace(' (Lab)', '').replace(' (Tutorial)', '').replace(' - Batch 1', '').replace(' - Batch 2', '')
-                if a_subject_clean == subject_clean:
-                    assigned_teacher = a['teacher']
-                    break
-        
-        if assigned_teacher:
-            available_teachers = [assigned_teacher]
+        if lecture['type'] == 'lab_group':
+            possible_assignments = self.get_group_assignments(lecture, teacher_subjects, grid, assignments)
         else:
-            available_teachers = teacher_subjects.get(subject_clean, [])
-        
-        if not available_teachers:
-            return self.backtrack(index + 1, requirements, teacher_subjects, grid, assignments, depth + 1)
-        
-        possible_assignments = []
-        for teacher in available_teachers:
-            for day in self.days:
-                for time_idx in range(len(self.time_slots) - lecture['duration'] + 1):
-                    suitable_classrooms = self.get_suitable_classrooms(lecture)
-                    
-                    for classroom in suitable_classrooms:
-                        classroom_name = classroom['room']
-                        
-                        if self.can_use_classroom(classroom_name, day, time_idx, 
-                                                 lecture['duration'], grid):
-                            if self.is_valid_assignment_relaxed(lecture, teacher, day, 
-                                                               time_idx, grid, assignments, classroom):
-                                score = self.calculate_assignment_score(lecture, teacher, day, 
-                                                                       time_idx, assignments)
-                                possible_assignments.append({
-                                    'teacher': teacher,
-                                    'day': day,
-                                    'time_idx': time_idx,
-                                    'classroom': classroom_name,
-                                    'score': score
-                                })
-        
-        possible_assignments.sort(key=lambda x: x['score'], reverse=True)
-        
-        for assign_data in possible_assignments:
+            available_teachers = self.get_available_teachers(lecture, teacher_subjects, assignments)
+            
+            if not available_teachers:
+                if self.trace_file is not None:
+                    self.trace_event({'ev': 'skip', 'req': index})
+                return self.backtrack(index + 1, requirements, teacher_subjects, grid, assignments, depth + 1)
+            
+            possible_assignments = self.get_possible_assignments(lecture, available_teachers, grid, assignments,
+                                                                 self.room_records is not None)
+        
+        level = len(self.search_trail)
+        start = 0
+        if self.checkpoint_state is not None:
+            start = self.checkpoint_resume_position(level, index, possible_assignments)
+        self.search_trail.append(None)
+        
+        for position in range(start, len(possible_assignments)):
+            assign_data = possible_assignments[position]
+            self.search_trail[level] = (index, position, assign_data)
             teacher = assign_data['teacher']
             day = assign_data['day']
             time_idx = assign_data['time_idx']
             classroom_name = assign_data['classroom']
-            start_time = self.time_slots[time_idx]
             
-            batch_info = f" - {lecture['batch']}" if lecture.get('batch') else ""
+            if lecture['type'] == 'lab_group':
+                # One lab per batch, all at the same time
+                placements = [(member, self.build_assignment(member, member_teacher, day, time_idx, room))
+                              for member, member_teacher, room
+                              in zip(lecture['members'], teacher, classroom_name)]
+                teacher = ", ".join(teacher)
+                classroom_name = ", ".join(classroom_name)
+            else:
+                if classroom_name is None:
+                    classroom_name = self.reserve_room(lecture, day, time_idx, grid)
+                    if classroom_name is None:
+                        continue
+                placements = [(lecture, self.build_assignment(lecture, teacher, day, time_idx,
+                                                              classroom_name))]
             
-            assignment = {
-                'course': lecture['course'],
-                'subject': lecture['subject'] + batch_info,
-                'teacher': teacher,
-                'day': day,
-                'time': start_time,
-                'classroom': classroom_name,
-                'type': lecture['type']
-            }
+            room_records = []
+            for member, assignment in placements:
+                self.make_assignment(assignment, member['duration'], time_idx, grid)
+                assignments.append(assignment)
+                if self.room_records is not None:
+                    room_records.append(self.register_room(member, assignment, time_idx, grid))
             
-            self.make_assignment(assignment, lecture['duration'], time_idx, grid)
-            assignments.append(assignment)
+            if self.trace_file is not None:
+                self.trace_event({'ev': 'try', 'req': index, 'depth': depth, 'pos': position,
+                                  'alts': len(possible_assignments), 'teacher': teacher, 'day': day,
+                                  'slot': time_idx, 'room': classroom_name,
+                                  'score': assign_data['score']})
             
             if self.backtrack(index + 1, requirements, teacher_subjects, 
                             grid, assignments, depth + 1):
+                self.search_trail.pop()
                 return True
             
-            self.undo_assignment(assignment, lecture['duration'], time_idx, grid)
-            assignments.pop()
-        
+            for room_record in room_records:
+                self.release_room(room_record)
+            for member, assignment in reversed(placements):
+                self.undo_assignment(assignment, member['duration'], time_idx, grid)
+                assignments.pop()
+            
+            if self.trace_file is not None:
+                self.trace_event({'ev': 'undo', 'req': index})
+            
+            if self.node_limit is not None and self.nodes_visited > self.node_limit:
+                break
+        
+        self.search_trail.pop()
+        self.requirement_failures[index] += 1
+        if self.telemetry is not None:
+            self.telemetry['backtracks'][depth] += 1
+        if self.trace_file is not None:
+            self.trace_event({'ev': 'fail', 'req': index, 'alts': len(possible_assignments)})
         return False
     
-    def get_suitable_classrooms(self, lecture):
-        """Get classrooms suitable for the lecture based on type, department, and capacity"""
-        suitable = []
-        ideal = []
-        fallback = []
-        
-        for classroom in self.classrooms:
-            class_type_lower = classroom['class_type'].lower()
+    def backtrack_with_checkpoints(self, requirements, teacher_subjects, grid, assignments,
+                                   resume_path=None):
+        """
+        Run backtrack while saving a checkpoint to checkpoint_path every checkpoint_interval
+        seconds. With resume_path, the search continues from that checkpoint: each level of
+        the saved trail skips the candidates that were already fully explored.
+        """
+        if self.lab_rotation:
+            requirements = self.group_lab_rotations(requirements, teacher_subjects)
+        self.search_trail = []
+        self.requirement_failures = defaultdict(int)
+        self.nodes_visited = 0
+        resume_trail = []
+        elapsed_before = 0.0
+        
+        if resume_path:
+            checkpoint = self.read_checkpoint(resume_path)
+            if checkpoint['requirements'] != self.requirement_signature(requirements):
+                raise ValueError("Checkpoint was written for different input data")
+            resume_trail = checkpoint['trail']
+            # The node being entered when the checkpoint was written is visited again
+            self.nodes_visited = checkpoint['nodes'] - 1
+            elapsed_before = checkpoint['elapsed']
+            self.requirement_failures.update({int(k): v for k, v in checkpoint['failures'].items()})
+        
+        self.checkpoint_state = {
+            'requirements': requirements,
+            'resume_trail': resume_trail,
+            'resume_level': 0,
+            'started': time.perf_counter() - elapsed_before,
+            'next_save': time.perf_counter() + self.checkpoint_interval
+        }
+        self.ensure_recursion_depth(len(requirements))
+        if self.trace_path:
+            self.open_trace(requirements)
+        if self.defer_rooms:
+            self.room_records = {}
+        success = False
+        try:
+            success = self.backtrack(0, requirements, teacher_subjects, grid, assignments, 0)
+            if success and self.room_records is not None:
+                self.settle_rooms(grid)
+            return success
+        finally:
+            self.checkpoint_state = None
+            self.search_trail = []
+            self.room_records = None
+            if self.trace_file is not None:
+                self.close_trace(success)
+    
+    def group_lab_rotations(self, requirements, teacher_subjects):
+        """
+        Replace the batch labs of each course by rotation groups. In a group every batch
+        has a lab of a different subject (so a different teacher) at the same time, and
+        over the groups each batch works through all of the course's labs.
+        """
+        batch_labs = defaultdict(list)
+        for lecture in requirements:
+            if lecture['type'] == 'lab' and lecture.get('batch') and \
+                    self.get_available_teachers(lecture, teacher_subjects, []):
+                batch_labs[lecture['course']].append(lecture)
+        
+        grouped = []
+        for lecture in requirements:
+            labs = batch_labs.get(lecture['course'])
+            if not labs or not any(lab is lecture for lab in labs):
+                grouped.append(lecture)
+            elif lecture is labs[0]:
+                grouped.extend(self.build_lab_rotation(labs, teacher_subjects))
+        return grouped
+    
+    def build_lab_rotation(self, labs, teacher_subjects):
+        """Rounds of a course's batch labs, at most one lab per batch, teacher and room in each round"""
+        remaining = defaultdict(list)
+        for lab in labs:
+            remaining[lab['batch']].append(lab)
+        batches = sorted(remaining)
+        
+        groups = []
+        offset = 0
+        while any(remaining.values()):
+            members = []
+            used = set()
+            for i in range(len(batches)):
+                batch = batches[(i + offset) % len(batches)]
+                for lab in remaining[batch]:
+                    # The allocated teacher when there is one, else the subject stands in for it
+                    teachers = self.get_available_teachers(lab, teacher_subjects, [])
+                    key = teachers[0] if len(teachers) == 1 else lab['subject']
+                    # A round needs a separate lab for every batch in it
+                    if key not in used and self.match_rooms(
+                            [[c['room'] for c in self.get_suitable_classrooms(m)] for m in members + [lab]]):
+                        used.add(key)
+                        members.append(lab)
+                        remaining[batch].remove(lab)
+                        break
+            offset += 1
             
-            if classroom['capacity'] < lecture['capacity_needed']:
+            if len(members) == 1:
+                groups.append(members[0])
+            else:
+                groups.append({
+                    'course': members[0]['course'],
+                    'subject': f"Lab rotation {len(groups) + 1}",
+                    'type': 'lab_group',
+                    'duration': max(m['duration'] for m in members),
+                    'department': members[0]['department'],
+                    'capacity_needed': max(m['capacity_needed'] for m in members),
+                    'batch': None,
+                    'members': members
+                })
+        return groups
+    
+    def get_group_assignments(self, group, teacher_subjects, grid, assignments):
+        """
+        Valid placements of a lab rotation, best score first. Each candidate holds one
+        teacher and one lab per member; the labs are matched to the batches together.
+        """
+        members = group['members']
+        options = [(self.get_available_teachers(m, teacher_subjects, assignments),
+                    self.get_suitable_classrooms(m)) for m in members]
+        if any(not teachers or not rooms for teachers, rooms in options):
+            return []
+        
+        candidates = []
+        for day in self.days:
+            profiles = {}
+            for time_idx in self.start_slots(day, group['duration']):
+                teachers = []
+                score = 0
+                for member, (available, rooms) in zip(members, options):
+                    # Batches and subjects differ, so members only clash with each other through teachers
+                    teacher = next((t for t in available if t not in teachers and
+                                    self.is_valid_assignment_relaxed(member, t, day, time_idx, grid,
+                                                                     assignments, rooms[0])), None)
+                    if teacher is None:
+                        break
+                    teachers.append(teacher)
+                    key = (id(member), teacher)
+                    if key not in profiles:
+                        profiles[key] = self.score_profile(member, teacher, day, assignments)
+                    score += self.score_placement(member, teacher, day, time_idx, profiles[key])
+                else:
+                    free = [[c['room'] for c in rooms
+                             if self.can_use_classroom(c['room'], day, time_idx, member['duration'], grid)]
+                            for member, (_, rooms) in zip(members, options)]
+                    rooms = self.match_rooms(free)
+                    if rooms is not None:
+                        candidates.append({
+                            'teacher': teachers,
+                            'day': day,
+                            'time_idx': time_idx,
+                            'classroom': rooms,
+                            'score': score
+                        })
+        
+        candidates.sort(key=lambda x: x['score'], reverse=True)
+        return candidates
+    
+    def match_rooms(self, free):
+        """A different room for every member from its list of free rooms (augmenting paths), or None"""
+        holder = {}
+        
+        def assign(i, visited):
+            for room in free[i]:
+                if room in visited:
+                    continue
+                visited.add(room)
+                if room not in holder or assign(holder[room], visited):
+                    holder[room] = i
+                    return True
+            return False
+        
+        for i in range(len(free)):
+            if not assign(i, set()):
+                return None
+        rooms = [None] * len(free)
+        for room, i in holder.items():
+            rooms[i] = room
+        return rooms
+    
+    def reserve_room(self, lecture, day, time_idx, grid):
+        """
+        Free room for a deferred placement, or None. Other deferred placements on the day
+        may be moved to another suitable room along an augmenting path, as in bipartite
+        matching, so a slot is only refused when no room assignment can fit it.
+        """
+        rooms = [c['room'] for c in self.get_suitable_classrooms(lecture)]
+        path = self.find_room_path(rooms, day, time_idx, lecture['duration'], grid, set())
+        if path is None:
+            return None
+        for record, room in path[:-1]:
+            self.move_room(record, room, grid)
+        return path[-1][1]
+    
+    def find_room_path(self, rooms, day, time_idx, duration, grid, visited, moving=None):
+        """Moves [(record, room), ...] that free one of rooms over these hours, ending with (moving, room)"""
+        candidates = set(rooms) - visited
+        occupants = defaultdict(list)
+        for slot in self.time_slots[time_idx:time_idx + duration]:
+            for existing in grid[day][slot]:
+                if existing['classroom'] in candidates:
+                    occupants[existing['classroom']].append(existing)
+        
+        for room in rooms:
+            if room not in occupants and room not in visited:
+                return [(moving, room)]
+        
+        for room in rooms:
+            if room in visited:
                 continue
+            visited.add(room)
             
-            if lecture['type'] == 'lab':
-                if class_type_lower in ['cl', 'lab'] and \
-                   classroom['department'] == lecture['department']:
-                    suitable.append(classroom)
+            blockers = {}
+            movable = True
+            for existing in occupants[room]:
+                record = self.room_records.get(id(existing))
+                if record is None:
+                    # Pinned or otherwise fixed placements keep their room
+                    movable = False
+                elif record is not moving:
+                    blockers[id(record)] = record
+            if not movable or len(blockers) != 1:
+                continue
+            blocker = next(iter(blockers.values()))
+            path = self.find_room_path(blocker['rooms'], day, blocker['time_idx'], blocker['duration'],
+                                       grid, visited, blocker)
+            if path is not None:
+                return path + [(moving, room)]
+        return None
+    
+    def register_room(self, lecture, assignment, time_idx, grid):
+        """Track a just-made deferred placement so later reservations may move it"""
+        record = {
+            'assignment': assignment,
+            'entries': [grid[assignment['day']][slot][-1]
+                        for slot in self.time_slots[time_idx:time_idx + lecture['duration']]],
+            'rooms': [c['room'] for c in self.get_suitable_classrooms(lecture)],
+            'department': lecture['department'],
+            'time_idx': time_idx,
+            'duration': lecture['duration']
+        }
+        for entry in record['entries']:
+            self.room_records[id(entry)] = record
+        return record
+    
+    def release_room(self, record):
+        for entry in record['entries']:
+            del self.room_records[id(entry)]
+    
+    def move_room(self, record, room, grid):
+        mask = ((1 << record['duration']) - 1) << record['time_idx']
+        self.clear_busy(record['assignment'], mask, grid)
+        record['assignment']['classroom'] = room
+        self.mark_busy(record['assignment'], mask, grid)
+        for entry in record['entries']:
+            entry['classroom'] = room
+    
+    def settle_rooms(self, grid):
+        """Move deferred placements into a free room of their own department where one exists"""
+        departments = {c['room']: c['department'] for c in self.classrooms}
+        records = {id(r): r for r in self.room_records.values()}.values()
+        for record in records:
+            if departments.get(record['assignment']['classroom']) == record['department']:
+                continue
+            own = [room for room in record['rooms'] if departments.get(room) == record['department']]
+            day = record['assignment']['day']
+            for room in own:
+                if self.can_use_classroom(room, day, record['time_idx'], record['duration'], grid):
+                    self.move_room(record, room, grid)
+                    break
+    
+    def ensure_recursion_depth(self, requirement_count):
+        """backtrack recurses once per requirement, so large colleges need more than Python's default limit"""
+        needed = requirement_count + 1000
+        if sys.getrecursionlimit() < needed:
+            sys.setrecursionlimit(needed)
+    
+    def checkpoint_resume_position(self, level, index, possible_assignments):
+        """First candidate to try at this level: the saved one while replaying the checkpoint trail"""
+        state = self.checkpoint_state
+        resume_trail = state['resume_trail']
+        if level != state['resume_level'] or level >= len(resume_trail):
+            return 0
+        
+        saved_index, position, teacher, day, time_idx, classroom = resume_trail[level]
+        if saved_index != index or position >= len(possible_assignments):
+            raise ValueError(f"Checkpoint does not match the search at requirement {index}")
+        candidate = possible_assignments[position]
+        if (candidate['teacher'], candidate['day'], candidate['time_idx'],
+                candidate['classroom']) != (teacher, day, time_idx, classroom):
+            raise ValueError(f"Checkpoint does not match the search at requirement {index}")
+        
+        # Replaying the saved path is not new search work
+        self.nodes_visited -= 1
+        state['resume_level'] += 1
+        return position
+    
+    def requirement_signature(self, requirements):
+        return [[r['course'], r['subject'], r['type'], r.get('batch') or ''] for r in requirements]
+    
+    def write_checkpoint(self):
+        """Atomically save the current search trail and statistics to checkpoint_path"""
+        state = self.checkpoint_state
+        state['next_save'] = time.perf_counter() + self.checkpoint_interval
+        if not self.checkpoint_path:
+            return
+        
+        checkpoint = {
+            'requirements': self.requirement_signature(state['requirements']),
+            'trail': [[index, position, c['teacher'], c['day'], c['time_idx'], c['classroom']]
+                      for index, position, c in self.search_trail if c is not None],
+            'nodes': self.nodes_visited,
+            'elapsed': time.perf_counter() - state['started'],
+            'failures': dict(self.requirement_failures)
+        }
+        self.write_binary_file(self.checkpoint_path, b'TTCK', checkpoint)
+    
+    def read_checkpoint(self, path):
+        return self.read_binary_file(path, b'TTCK')
+    
+    def write_binary_file(self, path, magic, payload):
+        """Write magic + version + zlib-compressed JSON to a temp file, then rename it into place"""
+        data = magic + struct.pack('<B', 1) + zlib.compress(json.dumps(payload).encode('utf-8'), 6)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    
+    def read_binary_file(self, path, magic):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(magic)] != magic:
+            raise ValueError(f"{path} is not a {magic.decode()} file")
+        version, = struct.unpack_from('<B', data, len(magic))
+        if version != 1:
+            raise ValueError(f"Unsupported file version {version}")
+        return json.loads(zlib.decompress(data[len(magic) + 1:]).decode('utf-8'))
+    
+    def open_trace(self, requirements):
+        """Start a JSONL trace at trace_path; the header lists the requirements and time slots"""
+        self.trace_file = open(self.trace_path, 'w', encoding='utf-8', buffering=1 << 16)
+        self.trace_steps = 0
+        self.trace_event({'ev': 'start', 'requirements': self.requirement_signature(requirements),
+                          'time_slots': self.time_slots})
+    
+    def trace_event(self, event):
+        event['step'] = self.trace_steps
+        self.trace_steps += 1
+        self.trace_file.write(json.dumps(event, separators=(',', ':')))
+        self.trace_file.write('\n')
+    
+    def close_trace(self, success):
+        self.trace_event({'ev': 'end', 'success': success, 'nodes': self.nodes_visited})
+        self.trace_file.close()
+        self.trace_file = None
+    
+    def start_telemetry(self):
+        """Reset the solver counters and wrap the hot-path helpers with call counters and timers"""
+        now = time.perf_counter()
+        self.telemetry = {
+            'started': now,
+            'next_report': now + self.telemetry_interval,
+            'phases': {},
+            'nodes': 0,
+            'max_depth': 0,
+            'backtracks': defaultdict(int),
+            'rejections': defaultdict(int),
+            'calls': defaultdict(int),
+            'seconds': defaultdict(float)
+        }
+        for name in self.instrumented_helpers:
+            setattr(self, name, self.timed_helper(name, getattr(TimetableScheduler, name)))
+    
+    def timed_helper(self, name, method):
+        calls = self.telemetry['calls']
+        seconds = self.telemetry['seconds']
+        perf_counter = time.perf_counter
+        
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                seconds[name] += perf_counter() - start
+                calls[name] += 1
+        return timed
+    
+    def finish_telemetry(self):
+        """Remove the helper wrappers and keep the final statistics in solver_stats"""
+        for name in self.instrumented_helpers:
+            self.__dict__.pop(name, None)
+        self.solver_stats = self.telemetry_snapshot()
+        self.telemetry = None
+        return self.solver_stats
+    
+    def record_phase(self, phase, start):
+        if self.telemetry is not None:
+            self.telemetry['phases'][phase] = time.perf_counter() - start
+    
+    def record_node(self, depth):
+        telemetry = self.telemetry
+        telemetry['nodes'] += 1
+        if depth > telemetry['max_depth']:
+            telemetry['max_depth'] = depth
+        if self.telemetry_listener is not None:
+            now = time.perf_counter()
+            if now >= telemetry['next_report']:
+                telemetry['next_report'] = now + self.telemetry_interval
+                self.telemetry_listener(self.telemetry_snapshot())
+    
+    def telemetry_snapshot(self):
+        """
+        Current solver statistics as plain data. Helper times are inclusive, so the
+        time of break_gap_allowed is also part of is_valid_assignment_relaxed.
+        """
+        telemetry = self.telemetry
+        elapsed = time.perf_counter() - telemetry['started']
+        backtracks = dict(sorted(telemetry['backtracks'].items()))
+        return {
+            'elapsed': elapsed,
+            'phases': dict(telemetry['phases']),
+            'nodes': telemetry['nodes'],
+            'nodes_per_sec': telemetry['nodes'] / elapsed if elapsed > 0 else 0.0,
+            'max_depth': telemetry['max_depth'],
+            'backtracks': sum(backtracks.values()),
+            'backtracks_per_level': backtracks,
+            'rejections': dict(sorted(telemetry['rejections'].items(), key=lambda x: -x[1])),
+            'helpers': {
+                name: {
+                    'calls': telemetry['calls'][name],
+                    'seconds': telemetry['seconds'][name],
+                    'avg_us': telemetry['seconds'][name] / telemetry['calls'][name] * 1e6
+                              if telemetry['calls'][name] else 0.0
+                }
+                for name in self.instrumented_helpers
+            }
+        }
+    
+    def show_live_telemetry(self, stats):
+        self.report_progress(f"Nodes: {stats['nodes']} ({stats['nodes_per_sec']:.0f}/s), "
+                             f"depth {stats['max_depth']}, backtracks {stats['backtracks']}")
+    
+    def show_telemetry(self):
+        """Display the statistics of the last solve"""
+        stats = self.solver_stats
+        if not stats:
+            return
+        
+        lines = [f"Total time: {stats['elapsed']:.2f} s"]
+        for phase, seconds in stats['phases'].items():
+            lines.append(f"  {phase}: {seconds:.2f} s")
+        lines.append("")
+        lines.append(f"Nodes: {stats['nodes']} ({stats['nodes_per_sec']:.0f}/s)")
+        lines.append(f"Max depth: {stats['max_depth']}")
+        lines.append(f"Backtracks: {stats['backtracks']}")
+        worst = sorted(stats['backtracks_per_level'].items(), key=lambda x: -x[1])[:10]
+        for level, count in worst:
+            lines.append(f"  level {level}: {count}")
+        lines.append("")
+        lines.append("Rejections:")
+        for reason, count in stats['rejections'].items():
+            lines.append(f"  {reason}: {count}")
+        lines.append("")
+        lines.append("Helpers:")
+        for name, helper in stats['helpers'].items():
+            lines.append(f"  {name}: {helper['calls']} calls, {helper['seconds']:.2f} s, "
+                         f"{helper['avg_us']:.1f} µs/call")
+        
+        stats_window = Toplevel(self.root)
+        stats_window.title("Solver Statistics")
+        stats_window.geometry("520x560")
+        stats_window.configure(bg="white")
+        stats_window.transient(self.root)
+        
+        text = tk.Text(stats_window, font=("Consolas", 10), bg="white", fg="#2c3e50",
+                      relief=tk.FLAT, padx=15, pady=15)
+        text.insert(tk.END, "\n".join(lines))
+        text.config(state=tk.DISABLED)
+        text.pack(fill=tk.BOTH, expand=True)
+    
+    def tabu_search(self, requirements, teacher_subjects, grid, assignments,
+                    seed=None, max_iterations=None, tenure=None):
+        """
+        Improve a greedy schedule with tabu search over (day, time, classroom) moves.
+        Each requirement keeps the teacher it was first given. Candidate moves are
+        cached per requirement and only re-evaluated when a move touches the same
+        course or teacher, so every iteration scores the whole neighborhood cheaply.
+        Returns True when every requirement with a qualified teacher is placed.
+        """
+        rng = random.Random(self.random_seed if seed is None else seed)
+        max_iterations = self.tabu_iterations if max_iterations is None else max_iterations
+        tenure = self.tabu_tenure if tenure is None else tenure
+        
+        placements, unplaced = self.build_greedy_schedule(requirements, teacher_subjects,
+                                                          grid, assignments)
+        schedulable = sorted(set(placements) | unplaced)
+        
+        def place(r, teacher, day, time_idx, classroom_name):
+            assignment = self.place_requirement(requirements[r], teacher, day, time_idx,
+                                                classroom_name, grid, assignments)
+            placements[r] = (assignment, time_idx)
+            unplaced.discard(r)
+        
+        def unplace(r):
+            assignment, time_idx = placements.pop(r)
+            self.undo_assignment(assignment, requirements[r]['duration'], time_idx, grid)
+            assignments.remove(assignment)
+            placement_scores.pop(r, None)
+            unplaced.add(r)
+        
+        def score_placement(r):
+            assignment, time_idx = placements[r]
+            return self.calculate_placement_score(requirements[r], assignment, time_idx, assignments)
+        
+        placement_scores = {r: score_placement(r) for r in placements}
+        
+        def objective():
+            return sum(placement_scores.values()) - self.unplaced_penalty * len(unplaced)
+        
+        def snapshot():
+            return {r: (a['teacher'], a['day'], time_idx, a['classroom'])
+                    for r, (a, time_idx) in placements.items()}
+        
+        def evaluate_row(r):
+            """Valid (score, teacher, day, time_idx) moves for r, scored with r itself removed"""
+            lecture = requirements[r]
+            current = placements.get(r)
+            if current:
+                assignment, current_time_idx = current
+                self.undo_assignment(assignment, lecture['duration'], current_time_idx, grid)
+                assignments.remove(assignment)
+                teachers = [assignment['teacher']]
+                days = self.days
+                # Leaving a day can open a gap for the course's other sessions there; if it
+                # does, r may only move within the day, which assignment_violation re-checks
+                key = (lecture['course'], assignment['day'])
+                if self.course_day_violation(grid.course_busy.get(key, {}),
+                                             grid.course_sessions.get(key, {})):
+                    days = [assignment['day']]
+            else:
+                teachers = self.get_available_teachers(lecture, teacher_subjects, assignments)
+                days = self.days
             
-            elif lecture['type'] == 'tutorial':
-                if class_type_lower == 'tr' and classroom['department'] == lecture['department']:
-                    ideal.append(classroom)
-                elif class_type_lower == 'tr':
-                    ideal.append(classroom)
-                elif class_type_lower == 'cr' and classroom['department'] == lecture['department']:
-                    fallback.append(classroom)
-                elif class_type_lower == 'cr':
-                    fallback.append(classroom)
+            # Room occupancy changes with every move, so it is checked at selection time
+            representative = self.get_suitable_classrooms(lecture)[:1]
+            moves = []
+            if representative:
+                for teacher in teachers:
+                    for day in days:
+                        profile = None
+                        for time_idx in self.start_slots(day, lecture['duration']):
+                            if self.is_valid_assignment_relaxed(lecture, teacher, day, time_idx,
+                                                                grid, assignments, representative[0]):
+                                if profile is None:
+                                    profile = self.score_profile(lecture, teacher, day, assignments)
+                                score = self.score_placement(lecture, teacher, day, time_idx, profile)
+                                moves.append((score, teacher, day, time_idx))
+            moves.sort(key=lambda m: m[0], reverse=True)
+            
+            if current:
+                self.make_assignment(assignment, lecture['duration'], current_time_idx, grid)
+                assignments.append(assignment)
+            return moves
+        
+        rows = {}
+        dirty = set(schedulable)
+        tabu = {}
+        current_total = objective()
+        best_total = current_total
+        best_solution = snapshot()
+        
+        for iteration in range(max_iterations):
+            if iteration % 10 == 0:
+                self.report_progress(
+                    f"Tabu search: iteration {iteration}/{max_iterations}, best score {best_total}")
+            
+            for r in sorted(dirty | unplaced):
+                rows[r] = evaluate_row(r)
+            dirty = set()
+            
+            best_move = None
+            for r in schedulable:
+                lecture = requirements[r]
+                current = placements.get(r)
+                if current:
+                    current_score = placement_scores[r]
+                    current_day, current_time_idx = current[0]['day'], current[1]
+                else:
+                    current_score = -self.unplaced_penalty
+                    current_day, current_time_idx = None, None
                 
-                suitable = ideal + fallback
+                for score, teacher, day, time_idx in rows[r]:
+                    if day == current_day and time_idx == current_time_idx:
+                        continue
+                    delta = score - current_score
+                    if best_move and delta < best_move[0]:
+                        break
+                    is_tabu = tabu.get((r, day, time_idx), -1) >= iteration
+                    if is_tabu and current_total + delta <= best_total:
+                        continue
+                    
+                    classroom_name = None
+                    for classroom in self.get_suitable_classrooms(lecture):
+                        if self.can_use_classroom(classroom['room'], day, time_idx,
+                                                  lecture['duration'], grid):
+                            classroom_name = classroom['room']
+                            break
+                    if classroom_name is None:
+                        continue
+                    
+                    tie_break = rng.random()
+                    if best_move is None or (delta, tie_break) > best_move[:2]:
+                        best_move = (delta, tie_break, r, teacher, day, time_idx, classroom_name)
+                    break
             
-            else:
-                if class_type_lower in ['classroom', 'lecture hall', 'room', 'cr', 'lh']:
-                    if classroom['department'] == lecture['department']:
-                        suitable.insert(0, classroom)
-                    else:
-                        suitable.append(classroom)
+            if best_move is None:
+                break
+            
+            _, _, r, teacher, day, time_idx, classroom_name = best_move
+            course = requirements[r]['course']
+            if r in placements:
+                old_assignment, old_time_idx = placements[r]
+                tabu[(r, old_assignment['day'], old_time_idx)] = iteration + tenure
+                unplace(r)
+            place(r, teacher, day, time_idx, classroom_name)
+            
+            affected = [
+                other for other in schedulable
+                if requirements[other]['course'] == course
+                or (other in placements and placements[other][0]['teacher'] == teacher)
+            ]
+            dirty.update(affected)
+            for other in affected:
+                if other in placements:
+                    placement_scores[other] = score_placement(other)
+            
+            current_total = objective()
+            if current_total > best_total:
+                best_total = current_total
+                best_solution = snapshot()
         
-        return suitable
+        for r in list(placements):
+            unplace(r)
+        for r, (teacher, day, time_idx, classroom_name) in sorted(best_solution.items()):
+            place(r, teacher, day, time_idx, classroom_name)
+        
+        return len(placements) == len(schedulable)
     
-    def calculate_isolation_penalty(self, lecture, day, time_idx, assignments):
+    def large_neighborhood_search(self, requirements, teacher_subjects, grid, assignments,
+                                  seed=None, max_iterations=None):
         """
-        Penalize scheduling a 1-hour class with breaks on both sides.
-        Only applies to single-hour lectures/tutorials, not 2-hour labs.
+        Destroy-and-repair search. Starting from a greedy schedule, each iteration frees a
+        related group of placements (whole weeks of some teachers, some course days, or
+        everything booked in some labs) and re-solves just those requirements with backtrack
+        while every other placement stays pinned. Improvements are kept when the course days
+        the freed sessions left still pass the break and load rules. Each neighborhood
+        grows when it stops helping and shrinks when repairs run out of budget.
+        Returns True when every requirement with a qualified teacher is placed.
         """
-        if lecture['duration'] != 1:
-            return 0
+        rng = random.Random(self.random_seed if seed is None else seed)
+        max_iterations = self.lns_iterations if max_iterations is None else max_iterations
         
-        score = 0
-        course = lecture['course']
-        batch = lecture.get('batch')
+        placements, unplaced = self.build_greedy_schedule(requirements, teacher_subjects,
+                                                          grid, assignments)
+        schedulable = sorted(set(placements) | unplaced)
         
-        occupied_slots = set()
-        for a in assignments:
-            if a['course'] == course and a['day'] == day:
-                a_subject = a.get('subject', '')
-                
-                if batch:
-                    if batch in a_subject or ('Batch' not in a_subject and '(Lab)' not in a_subject and '(Tutorial)' not in a_subject):
-                        existing_time_idx = self.time_slots.index(a['time'])
-                        duration = a.get('duration', 1)
-                        for i in range(duration):
-                            occupied_slots.add(existing_time_idx + i)
+        def score_placement(r):
+            assignment, time_idx = placements[r]
+            return self.calculate_placement_score(requirements[r], assignment, time_idx, assignments)
+        
+        def rescore(related):
+            for r in related:
+                if r in placements:
+                    placement_scores[r] = score_placement(r)
                 else:
-                    existing_time_idx = self.time_slots.index(a['time'])
-                    duration = a.get('duration', 1)
-                    for i in range(duration):
-                        occupied_slots.add(existing_time_idx + i)
+                    placement_scores.pop(r, None)
+        
+        def objective():
+            return sum(placement_scores.values()) - self.unplaced_penalty * len(unplaced)
+        
+        def related_to(freed):
+            courses = {requirements[r]['course'] for r in freed}
+            teachers = {placements[r][0]['teacher'] for r in freed if r in placements}
+            return [r for r in schedulable
+                    if requirements[r]['course'] in courses
+                    or (r in placements and placements[r][0]['teacher'] in teachers)]
+        
+        def choose_neighborhood(kind, size):
+            if kind == "teacher":
+                keys = sorted({a['teacher'] for a, _ in placements.values()})
+                chosen = set(rng.sample(keys, min(size, len(keys))))
+                return [r for r, (a, _) in placements.items() if a['teacher'] in chosen]
+            if kind == "course_day":
+                keys = sorted({(a['course'], a['day']) for a, _ in placements.values()})
+                chosen = set(rng.sample(keys, min(size, len(keys))))
+                return [r for r, (a, _) in placements.items() if (a['course'], a['day']) in chosen]
+            keys = sorted({a['classroom'] for a, _ in placements.values() if a['type'] == 'lab'})
+            chosen = set(rng.sample(keys, min(size, len(keys))))
+            return [r for r, (a, _) in placements.items() if a['classroom'] in chosen]
+        
+        def remove(r):
+            assignment, time_idx = placements.pop(r)
+            self.undo_assignment(assignment, requirements[r]['duration'], time_idx, grid)
+            assignments.remove(assignment)
+            unplaced.add(r)
+        
+        def restore(r, teacher, day, time_idx, classroom_name):
+            assignment = self.place_requirement(requirements[r], teacher, day, time_idx,
+                                                classroom_name, grid, assignments)
+            placements[r] = (assignment, time_idx)
+            unplaced.discard(r)
+        
+        def repair(subset):
+            """Re-place the subset exactly with backtrack, or greedily if the budget runs out"""
+            sub_requirements = [requirements[r] for r in subset]
+            first_new = len(assignments)
+            
+            node_limit = self.node_limit
+            self.node_limit = self.lns_repair_node_limit
+            self.nodes_visited = 0
+            try:
+                solved = self.backtrack(0, sub_requirements, teacher_subjects, grid, assignments, 0)
+            finally:
+                self.node_limit = node_limit
+            
+            if solved:
+                # backtrack skips requirements without a teacher, so placements are matched by key
+                matched = self.match_entries_to_requirements(assignments[first_new:], sub_requirements)
+                for i, assignment in matched.items():
+                    placements[subset[i]] = (assignment, self.slot_index[assignment['time']])
+                    unplaced.discard(subset[i])
+                return True
+            
+            for r in subset:
+                lecture = requirements[r]
+                available_teachers = self.get_available_teachers(lecture, teacher_subjects, assignments)
+                candidates = self.get_possible_assignments(lecture, available_teachers, grid, assignments)
+                if candidates:
+                    best = candidates[0]
+                    restore(r, best['teacher'], best['day'], best['time_idx'], best['classroom'])
+            return False
         
-        has_before = (time_idx - 1) in occupied_slots
-        has_after = (time_idx + 1) in occupied_slots
+        placement_scores = {}
+        rescore(placements)
+        current_total = objective()
         
-        if not has_before and not has_after:
-            score -= 40
-        elif not has_before or not has_after:
-            score -= 10
+        kinds = ["teacher", "course_day", "lab"]
+        sizes = {kind: 1 for kind in kinds}
+        weights = {kind: 1.0 for kind in kinds}
+        stalls = {kind: 0 for kind in kinds}
         
-        return score
+        for iteration in range(max_iterations):
+            if iteration % 5 == 0:
+                self.report_progress(f"LNS: iteration {iteration}/{max_iterations}, "
+                                     f"score {current_total}, unplaced {len(unplaced)}")
+            
+            kind = rng.choices(kinds, weights=[weights[k] for k in kinds])[0]
+            freed = choose_neighborhood(kind, sizes[kind])
+            if not freed and not unplaced:
+                weights[kind] = max(0.1, weights[kind] * 0.5)
+                continue
+            
+            previous = {r: (placements[r][0]['teacher'], placements[r][0]['day'],
+                            placements[r][1], placements[r][0]['classroom']) for r in freed}
+            previous_scores = dict(placement_scores)
+            previous_unplaced = set(unplaced)
+            touched = set(related_to(freed))
+            
+            for r in freed:
+                remove(r)
+            subset = sorted(unplaced)
+            solved = repair(subset)
+            touched.update(related_to(subset))
+            rescore(touched)
+            new_total = objective()
+            
+            # Repairs only check the slots they fill; the days freed sessions left must hold too
+            vacated = {(requirements[r]['course'], day) for r, (_, day, _, _) in previous.items()}
+            valid = not any(self.course_day_violation(grid.course_busy.get(key, {}),
+                                                      grid.course_sessions.get(key, {}))
+                            for key in vacated)
+            
+            if valid and new_total >= current_total:
+                if new_total > current_total:
+                    weights[kind] += 1.0
+                    stalls[kind] = 0
+                else:
+                    stalls[kind] += 1
+                current_total = new_total
+            else:
+                for r in subset:
+                    if r in placements:
+                        remove(r)
+                for r, (teacher, day, time_idx, classroom_name) in sorted(previous.items()):
+                    restore(r, teacher, day, time_idx, classroom_name)
+                unplaced.clear()
+                unplaced.update(previous_unplaced)
+                placement_scores = previous_scores
+                stalls[kind] += 1
+            
+            if not solved:
+                sizes[kind] = max(1, sizes[kind] - 1)
+            elif stalls[kind] >= 3:
+                sizes[kind] = min(self.lns_max_neighborhood, sizes[kind] + 1)
+                stalls[kind] = 0
+            weights[kind] = max(0.1, weights[kind] * 0.95)
+        
+        return not unplaced
     
-    def calculate_assignment_score(self, lecture, teacher, day, time_idx, assignments):
-        score = 0
+    def genetic_search(self, requirements, teacher_subjects, grid, assignments,
+                       seed=None, generations=None, population_size=None):
+        """
+        Evolutionary optimizer over compact schedule genomes. A genome stores four indices per
+        requirement (teacher, day, time slot, classroom), with day -1 meaning unplaced.
+        Crossover copies whole course-day blocks from one parent and repair re-places every
+        gene that breaks a hard constraint. Repair and fitness evaluation run in a process
+        pool, one worker per core unless ga_workers is set.
+        Returns True when every requirement with a qualified teacher is placed.
+        """
+        rng = random.Random(self.random_seed if seed is None else seed)
+        generations = self.ga_generations if generations is None else generations
+        population_size = self.ga_population if population_size is None else population_size
+        elite = min(2, population_size)
+        
+        self.genome_state = {
+            'requirements': requirements,
+            'teacher_subjects': dict(teacher_subjects),
+            'teacher_names': sorted({t for names in teacher_subjects.values() for t in names}),
+            'base_assignments': [dict(a) for a in assignments]
+        }
+        worker_state = {
+            'attributes': {name: getattr(self, name) for name in (
+                'courses', 'teachers', 'teacher_availability', 'classrooms', 'subject_details',
+                'days', 'max_weekly_hours', 'calendar', 'score_weights', 'compiled_constraints',
+                'unplaced_penalty', 'ga_repair_choices', 'teacher_allocation', 'room_weights')},
+            'genome_state': self.genome_state
+        }
+        workers = self.ga_workers or os.cpu_count() or 1
         
-        course_days = {}
-        for a in assignments:
-            if a['course'] == lecture['course']:
-                course_days[a['day']] = course_days.get(a['day'], 0) + a.get('duration', 1)
-        
-        current_day_hours = course_days.get(day, 0)
-        
-        if current_day_hours == 0:
-            if len(course_days) > 0:
-                score -= 30 
-            score += 20  
-        elif current_day_hours == 1:
-            score += 40  
-        elif current_day_hours >= 2:
-            score += 15
-        
-        daily_count = sum(1 for a in assignments if a['course'] == lecture['course'] and a['day'] == day)
-        if daily_count < 4:
-            score += 20
-        elif daily_count < 6:
-            score += 10
-        
-        teacher_weekly_hours = sum(
-            a.get('duration', 1) for a in assignments if a['teacher'] == teacher
-        )
-        if teacher_weekly_hours < 15:
-            score += 25 
-        elif teacher_weekly_hours < 18:
-            score += 10  
-        else:
-            score -= 20  
+        def tournament(population):
+            contenders = [population[rng.randrange(len(population))] for _ in range(3)]
+            return max(contenders, key=lambda individual: individual[0])
         
-        teacher_day_hours = sum(
-            a.get('duration', 1) for a in assignments 
-            if a['teacher'] == teacher and a['day'] == day
-        )
-        if teacher_day_hours == 0:
-            score += 5
-        elif teacher_day_hours == 1:
-            score += 30
-        elif teacher_day_hours >= 2 and teacher_day_hours < 5:
-            score += 20
-        elif teacher_day_hours >= 5:
-            score -= 15
-        
-        course_days_count = len(course_days)
-        if day not in course_days and course_days_count < 4:
-            score += 25  
-        
-        if 2 <= time_idx <= 6:
-            score += 10
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(workers, initializer=_init_solver_worker, initargs=(worker_state,)) as pool:
+            empty = array('h', [-1]) * (4 * len(requirements))
+            jobs = [(empty, rng.randrange(2 ** 31), i == 0) for i in range(population_size)]
+            population = pool.map(_evaluate_genome_job, jobs)
+            
+            start = time.perf_counter()
+            for generation in range(generations):
+                population.sort(key=lambda individual: individual[0], reverse=True)
+                elapsed = time.perf_counter() - start
+                rate = generation / elapsed if elapsed > 0 else 0.0
+                self.report_progress(f"Genetic: generation {generation}/{generations}, "
+                                     f"best {population[0][0]}, {rate:.2f} gen/s")
+                
+                jobs = []
+                while len(jobs) < population_size - elite:
+                    child = self.crossover_genomes(tournament(population)[1],
+                                                   tournament(population)[1], requirements, rng)
+                    self.mutate_genome(child, rng)
+                    jobs.append((child, rng.randrange(2 ** 31), False))
+                population = population[:elite] + pool.map(_evaluate_genome_job, jobs)
+            elapsed = time.perf_counter() - start
+        
+        best_fitness, best_genome, _ = max(population, key=lambda individual: individual[0])
+        self.ga_stats = {
+            'generations': generations,
+            'population': population_size,
+            'workers': workers,
+            'elapsed_seconds': elapsed,
+            'generations_per_sec': generations / elapsed if elapsed > 0 else 0.0,
+            'best_fitness': best_fitness
+        }
         
-        if teacher in self.teacher_availability:
-            teacher_data = self.teacher_availability[teacher]
-            faculty_type = teacher_data.get('faculty_type', '')
-            availability = teacher_data.get('availability', {})
+        _, _, unplaced = self.repair_genome(best_genome, requirements, teacher_subjects,
+                                            grid, assignments, rng, greedy=True)
+        return unplaced == 0
+    
+    def evaluate_genome(self, genome, seed, greedy=False):
+        """Repair a genome on a fresh grid and score it; returns (fitness, repaired genome, unplaced)"""
+        state = self.genome_state
+        grid = self.create_empty_grid()
+        assignments = []
+        for base in state['base_assignments']:
+            assignment = dict(base)
+            self.make_assignment(assignment, assignment['duration'],
+                                 self.slot_index[assignment['time']], grid)
+            assignments.append(assignment)
+        
+        genome, placed, unplaced = self.repair_genome(genome, state['requirements'],
+                                                      state['teacher_subjects'], grid, assignments,
+                                                      random.Random(seed), greedy)
+        fitness = self.calculate_schedule_score(placed, assignments) - self.unplaced_penalty * unplaced
+        return fitness, genome, unplaced
+    
+    def repair_genome(self, genome, requirements, teacher_subjects, grid, assignments, rng, greedy=False):
+        """
+        Place a genome into grid/assignments in requirement order. A gene that breaks a hard
+        constraint is replaced by one of the best valid placements (the best one when greedy),
+        or marked unplaced. Returns (repaired genome, [(lecture, assignment)], unplaced count).
+        """
+        genome = array('h', genome)
+        teacher_names = self.genome_state['teacher_names']
+        teacher_ids = {name: i for i, name in enumerate(teacher_names)}
+        room_ids = {classroom['room']: i for i, classroom in enumerate(self.classrooms)}
+        placed = []
+        unplaced = 0
+        
+        for r, lecture in enumerate(requirements):
+            gene = slice(4 * r, 4 * r + 4)
+            available_teachers = self.get_available_teachers(lecture, teacher_subjects, assignments)
+            if not available_teachers:
+                genome[gene] = array('h', [-1, -1, -1, -1])
+                continue
             
-            assigned_time = self.time_slots[time_idx]
-            day_availability = availability.get(day, [])
+            teacher_id, day_id, time_idx, room_id = genome[gene]
+            placement = None
+            if day_id >= 0 and time_idx + lecture['duration'] <= len(self.time_slots):
+                teacher = teacher_names[teacher_id]
+                day = self.days[day_id]
+                classroom = self.classrooms[room_id]
+                if (teacher in available_teachers
+                        and classroom in self.get_suitable_classrooms(lecture)
+                        and self.can_use_classroom(classroom['room'], day, time_idx,
+                                                   lecture['duration'], grid)
+                        and self.is_valid_assignment_relaxed(lecture, teacher, day, time_idx,
+                                                             grid, assignments, classroom)):
+                    placement = (teacher, day, time_idx, classroom['room'])
             
-            if assigned_time in day_availability:
-                score += 40
-            elif day_availability:
-                score += 10
-            else:
-                score -= 30
+            if placement is None:
+                candidates = self.get_possible_assignments(lecture, available_teachers, grid, assignments)
+                if candidates:
+                    pick = candidates[0] if greedy else rng.choice(candidates[:self.ga_repair_choices])
+                    placement = (pick['teacher'], pick['day'], pick['time_idx'], pick['classroom'])
             
-            if faculty_type == 'permanent':
-                score += 15
-            elif faculty_type == 'visiting':
-                score += 5
-        
-        score += self.calculate_isolation_penalty(lecture, day, time_idx, assignments)
-        score += self.calculate_break_quality_score(lecture, day, time_idx, assignments)
-        
-        return score
+            if placement is None:
+                genome[gene] = array('h', [-1, -1, -1, -1])
+                unplaced += 1
+                continue
+            
+            teacher, day, time_idx, classroom_name = placement
+            assignment = self.place_requirement(lecture, teacher, day, time_idx, classroom_name,
+                                                grid, assignments)
+            placed.append((lecture, assignment))
+            genome[gene] = array('h', [teacher_ids[teacher], self.days.index(day), time_idx,
+                                       room_ids[classroom_name]])
+        
+        return genome, placed, unplaced
     
-    def is_valid_assignment_relaxed(self, lecture, teacher, day, time_idx, grid, assignments, classroom):
-        for i in range(lecture['duration']):
-            time = self.time_slots[time_idx + i]
+    def crossover_genomes(self, first, second, requirements, rng):
+        """Child genome that takes each course's day block whole from one parent"""
+        child = array('h', [-1]) * len(first)
+        block_parent = {}
+        
+        for r, lecture in enumerate(requirements):
+            gene = slice(4 * r, 4 * r + 4)
+            options = []
+            for parent in (first, second):
+                day_id = parent[4 * r + 1]
+                if day_id < 0:
+                    continue
+                key = (lecture['course'], day_id)
+                if key not in block_parent:
+                    block_parent[key] = rng.choice((first, second))
+                if block_parent[key] is parent:
+                    options.append(parent)
+            if options:
+                child[gene] = rng.choice(options)[gene]
+        
+        return child
+    
+    def mutate_genome(self, genome, rng):
+        """Unplace random genes so repair re-places them elsewhere"""
+        for r in range(len(genome) // 4):
+            if rng.random() < self.ga_mutation_rate:
+                genome[4 * r + 1] = -1
+    
+    def calculate_schedule_score(self, placements, assignments):
+        """Total soft score of (lecture, assignment) pairs, each measured against all other assignments"""
+        return sum(
+            self.calculate_placement_score(lecture, assignment,
+                                           self.slot_index[assignment['time']], assignments)
+            for lecture, assignment in placements
+        )
+    
+    def beam_search(self, requirements, teacher_subjects, grid, assignments, width=None):
+        """
+        Keep the `width` best partial schedules at each requirement level instead of
+        committing depth-first to one. States are ranked by their summed placement scores
+        plus a one-step lookahead: the best score still open to the next requirement,
+        with states that leave it no valid slot dropped.
+        
+        States share structure: each node holds one placement and a link to its parent,
+        and the single working grid/assignments pair is moved between nodes by undoing
+        back to their common ancestor and replaying the other branch.
+        Returns True if a complete schedule was found; it is left in grid/assignments.
+        """
+        width = self.beam_width if width is None else width
+        root = {'parent': None, 'depth': 0, 'lecture': None, 'assignment': None,
+                'time_idx': None, 'score': 0}
+        current = [root]
+        
+        def path_from_root(node):
+            path = []
+            while node is not None:
+                path.append(node)
+                node = node['parent']
+            return path[::-1]
+        
+        def switch_to(target):
+            source_path = path_from_root(current[0])
+            target_path = path_from_root(target)
+            shared = 0
+            while (shared < min(len(source_path), len(target_path))
+                   and source_path[shared] is target_path[shared]):
+                shared += 1
+            for node in reversed(source_path[shared:]):
+                if node['assignment'] is not None:
+                    self.undo_assignment(node['assignment'], node['lecture']['duration'],
+                                         node['time_idx'], grid)
+                    assignments.pop()
+            for node in target_path[shared:]:
+                if node['assignment'] is not None:
+                    self.make_assignment(node['assignment'], node['lecture']['duration'],
+                                         node['time_idx'], grid)
+                    assignments.append(node['assignment'])
+            current[0] = target
+        
+        def lookahead(index):
+            """Best score available to the next requirement, or None if it has no valid slot"""
+            if index >= len(requirements):
+                return 0
+            lecture = requirements[index]
+            available_teachers = self.get_available_teachers(lecture, teacher_subjects, assignments)
+            if not available_teachers:
+                return 0
+            candidates = self.get_possible_assignments(lecture, available_teachers, grid, assignments)
+            return candidates[0]['score'] if candidates else None
+        
+        beam = [root]
+        for index, lecture in enumerate(requirements):
+            self.report_progress(f"Beam search: {index}/{len(requirements)} (width {width})")
             
-            for existing in grid[day][time]:
-                if existing['teacher'] == teacher:
-                    return False
+            children = []
+            for state in beam:
+                switch_to(state)
+                available_teachers = self.get_available_teachers(lecture, teacher_subjects, assignments)
+                if not available_teachers:
+                    children.append(({'parent': state, 'depth': state['depth'] + 1, 'lecture': lecture,
+                                      'assignment': None, 'time_idx': None,
+                                      'score': state['score']}, state['score']))
+                    continue
                 
-                if existing['course'] == lecture['course']:
-                    current_subject = lecture['subject'].replace(' (Lab)', '').replace(' (Tutorial)', '')
-                    existing_subject = existing.get('subject', '').replace(' (Lab)', '').replace(' (Tutorial)', '')
+                seen_slots = set()
+                for candidate in self.get_possible_assignments(lecture, available_teachers,
+                                                               grid, assignments):
+                    slot_key = (candidate['teacher'], candidate['day'], candidate['time_idx'])
+                    if slot_key in seen_slots:
+                        continue
+                    seen_slots.add(slot_key)
                     
-                    if lecture.get('batch'):
-                        if lecture['batch'] in existing.get('subject', ''):
-                            return False
-                        if 'Batch' not in existing.get('subject', ''):
-                            return False
-                        if current_subject == existing_subject:
-                            return False
-                    else:
-                        return False
-        
-        if classroom['capacity'] < lecture['capacity_needed']:
-            return False
-        
-        class_type_lower = classroom['class_type'].lower()
-        
-        if lecture['type'] == 'lab':
-            if class_type_lower not in ['cl', 'lab']:
-                return False
-            if classroom['department'] != lecture['department']:
-                return False
-        
-        elif lecture['type'] == 'tutorial':
-            if class_type_lower not in ['tr', 'cr']:
+                    child = {
+                        'parent': state,
+                        'depth': state['depth'] + 1,
+                        'lecture': lecture,
+                        'assignment': self.build_assignment(lecture, candidate['teacher'],
+                                                            candidate['day'], candidate['time_idx'],
+                                                            candidate['classroom']),
+                        'time_idx': candidate['time_idx'],
+                        'score': state['score'] + candidate['score']
+                    }
+                    switch_to(child)
+                    outlook = lookahead(index + 1)
+                    switch_to(state)
+                    if outlook is not None:
+                        children.append((child, child['score'] + outlook))
+                    if len(seen_slots) >= width:
+                        break
+            
+            if not children:
+                switch_to(root)
                 return False
+            
+            children.sort(key=lambda ranked: ranked[1], reverse=True)
+            beam = [child for child, _ in children[:width]]
         
-        teacher_weekly_hours = sum(
-            a.get('duration', 1) for a in assignments if a['teacher'] == teacher
-        )
-        if teacher_weekly_hours + lecture['duration'] > 20:
-            return False
-        
-        if teacher in self.teacher_availability:
-            teacher_data = self.teacher_availability[teacher]
-            availability_dict = teacher_data.get('availability', {})
-            day_availability = availability_dict.get(day, [])
+        switch_to(max(beam, key=lambda state: state['score']))
+        return True
+    
+    def warm_start_schedule(self, previous_schedule, requirements, teacher_subjects, grid, assignments):
+        """
+        Re-solve after input changes while disturbing as little as possible. Previous entries
+        are matched to the new requirements and every one that still passes the hard checks
+        is pinned. The rest are re-searched with backtrack in widening rings: alone, then
+        with the pinned classes sharing their course/teacher day, then with the whole
+        courses and teachers involved, then everything. Freed classes are biased towards
+        their old slots.
+        Returns (success, changed) where changed counts classes not kept exactly as before.
+        """
+        fixed_count = len(assignments)
+        node_limit = self.node_limit
+        matched = self.match_entries_to_requirements(previous_schedule, requirements)
+        pinned = {}
+        dirty = []
+        
+        for r, lecture in enumerate(requirements):
+            entry = matched.get(r)
+            placement = None
+            if entry is not None:
+                placement = self.pin_entry(lecture, entry, teacher_subjects, grid, assignments)
+            if placement is None:
+                dirty.append(r)
+            else:
+                pinned[r] = placement
+        
+        dirty_courses = {requirements[r]['course'] for r in dirty}
+        dirty_course_days = set()
+        dirty_teachers = set()
+        dirty_teacher_days = set()
+        for r in dirty:
+            entry = matched.get(r)
+            if entry is not None:
+                dirty_course_days.add((entry['course'], entry['day']))
+                dirty_teachers.add(entry['teacher'])
+                dirty_teacher_days.add((entry['teacher'], entry['day']))
+        
+        def neighbors(ring):
+            if ring == 0:
+                return []
+            result = []
+            for r, (assignment, _) in pinned.items():
+                if ring == 1:
+                    related = ((assignment['course'], assignment['day']) in dirty_course_days
+                               or (assignment['teacher'], assignment['day']) in dirty_teacher_days)
+                elif ring == 2:
+                    related = (assignment['course'] in dirty_courses
+                               or assignment['teacher'] in dirty_teachers)
+                else:
+                    related = True
+                if related:
+                    result.append(r)
+            return result
+        
+        solved = not dirty
+        tried = set()
+        for ring in range(4 if dirty else 0):
+            freed = neighbors(ring)
+            if ring > 0 and tuple(freed) in tried:
+                continue
+            tried.add(tuple(freed))
             
-            for i in range(lecture['duration']):
-                time_slot = self.time_slots[time_idx + i]
-                if time_slot not in day_availability:
-                    return False
+            previous = {r: pinned.pop(r) for r in freed}
+            for r, (assignment, time_idx) in previous.items():
+                self.undo_assignment(assignment, requirements[r]['duration'], time_idx, grid)
+                assignments.remove(assignment)
+            
+            for r in sorted(set(dirty) | set(freed)):
+                entry = matched.get(r)
+                if entry is not None and entry['day'] in self.days and entry['time'] in self.time_slots:
+                    lecture = requirements[r]
+                    key = (lecture['course'], lecture['subject'], lecture.get('batch'),
+                           entry['teacher'], entry['day'], self.slot_index[entry['time']])
+                    self.placement_bias[key] = 1000
+            
+            subset = [requirements[r] for r in sorted(set(dirty) | set(freed))]
+            self.report_progress(f"Re-solving {len(subset)} classes (ring {ring})...")
+            # The last ring searches under the caller's own limit
+            self.node_limit = self.warm_start_node_limit if ring < 3 else node_limit
+            self.nodes_visited = 0
+            self.ensure_recursion_depth(len(subset))
+            try:
+                solved = self.backtrack(0, subset, teacher_subjects, grid, assignments, 0)
+            finally:
+                self.node_limit = node_limit
+                self.placement_bias = {}
+            
+            if solved:
+                break
+            
+            for r, (assignment, time_idx) in sorted(previous.items()):
+                self.make_assignment(assignment, requirements[r]['duration'], time_idx, grid)
+                assignments.append(assignment)
+                pinned[r] = (assignment, time_idx)
+        
+        kept = defaultdict(int)
+        for entry in previous_schedule:
+            kept[(entry['course'], entry['subject'], entry['teacher'], entry['day'],
+                  entry['time'], entry['classroom'])] += 1
+        changed = 0
+        for assignment in assignments[fixed_count:]:
+            key = (assignment['course'], assignment['subject'], assignment['teacher'],
+                   assignment['day'], assignment['time'], assignment['classroom'])
+            if kept[key] > 0:
+                kept[key] -= 1
+            else:
+                changed += 1
         
-        if not self.check_break_constraint(lecture, day, time_idx, assignments):
-            return False
+        return solved, changed
+    
+    def match_entries_to_requirements(self, entries, requirements):
+        """
+        Pair schedule entries with the requirements they fulfil, by course, subject label
+        (including batch) and type, in day/time order. Returns {requirement index: entry}.
+        """
+        open_requirements = defaultdict(list)
+        for r, lecture in enumerate(requirements):
+            batch_info = f" - {lecture['batch']}" if lecture.get('batch') else ""
+            key = (lecture['course'], lecture['subject'] + batch_info, lecture['type'])
+            open_requirements[key].append(r)
         
-        batch = lecture.get('batch')
-        if batch:
-            daily_count = sum(1 for a in assignments 
-                            if a['course'] == lecture['course'] and a['day'] == day
-                            and (batch in a.get('subject', '') or 'Batch' not in a.get('subject', '')))
-        else:
-            daily_count = sum(1 for a in assignments 
-                            if a['course'] == lecture['course'] and a['day'] == day)
+        day_order = {day: i for i, day in enumerate(self.days)}
+        matched = {}
+        for entry in sorted(entries, key=lambda e: (day_order.get(e['day'], len(self.days)), e['time'])):
+            key = (entry['course'], entry['subject'], entry.get('type', 'lecture'))
+            if open_requirements.get(key):
+                matched[open_requirements[key].pop(0)] = entry
         
-        if daily_count >= 8:
-            return False
+        return matched
+    
+    def pin_entry(self, lecture, entry, teacher_subjects, grid, assignments):
+        """Place an existing entry if it still passes every hard check; returns (assignment, time_idx) or None"""
+        if entry['day'] not in self.days or entry['time'] not in self.time_slots:
+            return None
+        
+        time_idx = self.slot_index[entry['time']]
+        if time_idx + lecture['duration'] > len(self.time_slots):
+            return None
+        
+        if entry['teacher'] not in self.get_available_teachers(lecture, teacher_subjects, assignments):
+            return None
+        
+        classroom = next((c for c in self.get_suitable_classrooms(lecture)
+                          if c['room'] == entry['classroom']), None)
+        if classroom is None:
+            return None
+        
+        if not self.can_use_classroom(classroom['room'], entry['day'], time_idx,
+                                      lecture['duration'], grid):
+            return None
+        if not self.is_valid_assignment_relaxed(lecture, entry['teacher'], entry['day'], time_idx,
+                                                grid, assignments, classroom):
+            return None
+        
+        assignment = self.place_requirement(lecture, entry['teacher'], entry['day'], time_idx,
+                                            classroom['room'], grid, assignments)
+        return assignment, time_idx
+    
+    def build_greedy_schedule(self, requirements, teacher_subjects, grid, assignments):
+        """
+        Place each requirement at its best-scored valid slot, in order and without backtracking.
+        Returns (placements, unplaced): placements maps requirement index to (assignment, time_idx)
+        and unplaced holds the indices that found no valid slot. Requirements without a
+        qualified teacher appear in neither.
+        """
+        placements = {}
+        unplaced = set()
         
-        return True
+        for r, lecture in enumerate(requirements):
+            available_teachers = self.get_available_teachers(lecture, teacher_subjects, assignments)
+            if not available_teachers:
+                continue
+            candidates = self.get_possible_assignments(lecture, available_teachers, grid, assignments)
+            if candidates:
+                best = candidates[0]
+                assignment = self.place_requirement(lecture, best['teacher'], best['day'],
+                                                    best['time_idx'], best['classroom'],
+                                                    grid, assignments)
+                placements[r] = (assignment, best['time_idx'])
+            else:
+                unplaced.add(r)
+        
+        return placements, unplaced
     
-    def check_break_constraint(self, lecture, day, time_idx, assignments):
-        course = lecture['course']
-        batch = lecture.get('batch')
+    def place_requirement(self, lecture, teacher, day, time_idx, classroom_name, grid, assignments):
+        assignment = self.build_assignment(lecture, teacher, day, time_idx, classroom_name)
+        self.make_assignment(assignment, lecture['duration'], time_idx, grid)
+        assignments.append(assignment)
+        return assignment
+    
+    def calculate_placement_score(self, lecture, assignment, time_idx, assignments):
+        """Score of an existing placement measured against every other placement"""
+        others = [a for a in assignments if a is not assignment]
+        return self.calculate_assignment_score(lecture, assignment['teacher'], assignment['day'],
+                                               time_idx, others)
+    
+    def get_available_teachers(self, lecture, teacher_subjects, assignments):
+        """
+        Teachers who may take this lecture: only the allocated or already teaching one when
+        there is one, else all qualified
+        """
+        subject_clean = lecture['subject'].replace(' (Lab)', '').replace(' (Tutorial)', '')
+        
+        if self.teacher_allocation:
+            teacher = self.teacher_allocation.get((lecture['course'], subject_clean))
+            if teacher is not None:
+                return [teacher]
         
-        course_times_on_day = []
         for a in assignments:
-            if a['course'] == course and a['day'] == day:
-                a_subject = a.get('subject', '')
-                
-                if batch:
-                    if batch in a_subject or ('Batch' not in a_subject and '(Lab)' not in a_subject and '(Tutorial)' not in a_subject):
-                        existing_time_idx = self.time_slots.index(a['time'])
-                        duration = a.get('duration', 1)
-                        for i in range(duration):
-                            course_times_on_day.append(existing_time_idx + i)
-                else:
-                    existing_time_idx = self.time_slots.index(a['time'])
-                    duration = a.get('duration', 1)
-                    for i in range(duration):
-                        course_times_on_day.append(existing_time_idx + i)
+            if a['course'] == lecture['course']:
+                a_subject_clean = a['subject'].replace(' (Lab)', '').replace(' (Tutorial)', '').replace(' - Batch 1', '').replace(' - Batch 2', '')
+                if a_subject_clean == subject_clean:
+                    return [a['teacher']]
         
-        for i in range(lecture['duration']):
-            course_times_on_day.append(time_idx + i)
+        return teacher_subjects.get(subject_clean, [])
+    
+    def get_possible_assignments(self, lecture, available_teachers, grid, assignments, defer_rooms=False):
+        """
+        All valid (teacher, day, time, classroom) placements for a lecture, best score first.
+        With defer_rooms there is one candidate per (teacher, day, time) with classroom None,
+        kept when reserve_room could find it a room.
+        """
+        possible_assignments = []
+        suitable_classrooms = self.get_suitable_classrooms(lecture)
+        if not suitable_classrooms:
+            return possible_assignments
+        suitable_names = [c['room'] for c in suitable_classrooms]
         
-        all_times = sorted(set(course_times_on_day))
+        for teacher in available_teachers:
+            for day in self.days:
+                profile = None
+                for time_idx in self.start_slots(day, lecture['duration']):
+                    if defer_rooms:
+                        free_rooms = [None]
+                    else:
+                        free_rooms = [
+                            room for room in suitable_names
+                            if self.can_use_classroom(room, day, time_idx, lecture['duration'], grid)
+                        ]
+                        if not free_rooms:
+                            continue
+                    
+                    # Suitable rooms all pass the room checks, so validity only depends on the slot
+                    if not self.is_valid_assignment_relaxed(lecture, teacher, day, time_idx,
+                                                            grid, assignments, suitable_classrooms[0]):
+                        continue
+                    
+                    if defer_rooms and self.find_room_path(suitable_names, day, time_idx,
+                                                           lecture['duration'], grid, set()) is None:
+                        continue
+                    
+                    if profile is None:
+                        profile = self.score_profile(lecture, teacher, day, assignments)
+                    score = self.score_placement(lecture, teacher, day, time_idx, profile)
+                    if self.placement_bias:
+                        score += self.placement_bias.get(
+                            (lecture['course'], lecture['subject'], lecture.get('batch'),
+                             teacher, day, time_idx), 0)
+                    for room in free_rooms:
+                        possible_assignments.append({
+                            'teacher': teacher,
+                            'day': day,
+                            'time_idx': time_idx,
+                            'classroom': room,
+                            'score': score
+                        })
         
-        if len(all_times) <= 1:
-            return True
+        possible_assignments.sort(key=lambda x: x['score'], reverse=True)
+        return possible_assignments
+    
+    def build_assignment(self, lecture, teacher, day, time_idx, classroom_name):
+        batch_info = f" - {lecture['batch']}" if lecture.get('batch') else ""
         
-        total_lecture_hours = len(all_times)
+        return {
+            'course': lecture['course'],
+            'subject': lecture['subject'] + batch_info,
+            'teacher': teacher,
+            'day': day,
+            'time': self.time_slots[time_idx],
+            'classroom': classroom_name,
+            'type': lecture['type']
+        }
+    
+    def get_suitable_classrooms(self, lecture):
+        """
+        Classrooms suitable for the lecture based on type, department, and capacity.
+        Within each preference tier the smallest sufficient rooms come first, and among
+        equal capacities the rooms in less demand (see weigh_rooms).
+        """
+        key = (lecture['type'], lecture['department'], lecture['capacity_needed'])
+        if key in self.suitable_rooms_cache:
+            return self.suitable_rooms_cache[key]
         
-        min_slot = min(all_times)
-        max_slot = max(all_times)
-        total_break_hours = 0
-        for slot in range(min_slot, max_slot + 1):
-            if slot not in all_times:
-                total_break_hours += 1
+        tiers = [[], []]
         
-        if total_lecture_hours <= 3:
-            return total_break_hours == 0
-        elif total_lecture_hours <= 5:
-            return total_break_hours <= 1
-        else:
-            return total_break_hours <= 2
-   
-    def calculate_break_quality_score(self, lecture, day, time_idx, assignments):
-        score = 0
+        for classroom in self.classrooms:
+            class_type_lower = classroom['class_type'].lower()
+            
+            if classroom['capacity'] < lecture['capacity_needed']:
+                continue
+            
+            if lecture['type'] == 'lab':
+                if class_type_lower in ['cl', 'lab'] and \
+                   classroom['department'] == lecture['department']:
+                    tiers[0].append(classroom)
+            
+            elif lecture['type'] == 'tutorial':
+                if class_type_lower == 'tr':
+                    tiers[0].append(classroom)
+                elif class_type_lower == 'cr':
+                    tiers[1].append(classroom)
+            
+            else:
+                if class_type_lower in ['classroom', 'lecture hall', 'room', 'cr', 'lh']:
+                    if classroom['department'] == lecture['department']:
+                        tiers[0].append(classroom)
+                    else:
+                        tiers[1].append(classroom)
+        
+        suitable = []
+        for tier in tiers:
+            suitable.extend(sorted(tier, key=lambda c: (c['capacity'],
+                                                        self.room_weights.get(c['room'], 0))))
+        self.suitable_rooms_cache[key] = suitable
+        return suitable
+    
+    def weigh_rooms(self, requirements):
+        """
+        Expected weekly demand on each room: every requirement spreads its hours evenly over
+        the rooms it could use, so rooms that few requirements can fall back from weigh most
+        """
+        self.room_weights = {}
+        self.suitable_rooms_cache = {}
+        weights = defaultdict(float)
+        for lecture in requirements:
+            suitable = self.get_suitable_classrooms(lecture)
+            for classroom in suitable:
+                weights[classroom['room']] += lecture['duration'] / len(suitable)
+        self.room_weights = dict(weights)
+        self.suitable_rooms_cache = {}
+    
+    def read_score_weights(self, filename):
+        """Load soft-constraint weights from JSON; keys missing from the file keep their current values"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            weights = self.merge_weights(self.score_weights, json.load(f))
+        try:
+            self.compile_score_weights(weights)
+            for overrides in weights['departments'].values():
+                self.compile_score_weights(self.merge_weights(weights, overrides))
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid score weights: {e!r}")
+        self.score_weights = weights
+        self.score_tables = {}
+    
+    def merge_weights(self, base, overrides):
+        """base with overrides on top; dict values such as 'breaks' are merged one level down"""
+        merged = dict(base)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(base.get(key), dict):
+                merged[key] = {**base[key], **value}
+            else:
+                merged[key] = value
+        return merged
+    
+    def band_points(self, bands, value):
+        """Points of the first band that value falls in: 'max' (<=), 'below' (<), 'min' (>=) or none"""
+        for band in bands:
+            if 'max' in band:
+                if value <= band['max']:
+                    return band['points']
+            elif 'below' in band:
+                if value < band['below']:
+                    return band['points']
+            elif 'min' in band:
+                if value >= band['min']:
+                    return band['points']
+            else:
+                return band['points']
+        return 0
+    
+    def compile_score_weights(self, weights):
+        """
+        Lookup tables for one set of weights. Hour bands are indexed by a count of slots
+        (counts past the end use the last entry), the preferred start by slot index, and
+        break patterns are filled in per course-day bitmask as they are met.
+        """
+        week_slots = len(self.days) * len(self.time_slots)
+        hours = [self.session_hours(slots) for slots in range(week_slots + 1)]
+        preferred = weights['preferred_start']
+        first = self.parse_minutes(preferred['from'])
+        last = self.parse_minutes(preferred['to'])
+        self.break_pattern_score(0b1101, weights['breaks'])  # break weights are read lazily; check them now
+        return {
+            'weights': weights,
+            'course_day': [self.band_points(weights['course_day_hours'], h) for h in hours],
+            'new_day': [(weights['extra_day'] if days else 0) +
+                        (weights['spread_day']['points'] if days < weights['spread_day']['below_days'] else 0)
+                        for days in range(len(self.days) + 1)],
+            'daily_sessions': [self.band_points(weights['daily_sessions'], count)
+                               for count in range(week_slots + 1)],
+            'teacher_week': [self.band_points(weights['teacher_week_hours'], h) for h in hours],
+            'teacher_day': [self.band_points(weights['teacher_day_hours'], h) for h in hours],
+            'start': [preferred['points'] if first <= start <= last else 0 for start in self.slot_starts],
+            'availability': weights['availability'],
+            'faculty_type': weights['faculty_type'],
+            'isolation': weights['isolation'],
+            'breaks': {}
+        }
+    
+    def compile_scoring(self):
+        """Compile the default and per-department weights; called at solve start"""
+        self.score_tables = {None: self.compile_score_weights(self.score_weights)}
+        for department, overrides in self.score_weights['departments'].items():
+            self.score_tables[department] = self.compile_score_weights(
+                self.merge_weights(self.score_weights, overrides))
+    
+    def scoring_tables(self, department):
+        if not self.score_tables:
+            self.compile_scoring()
+        return self.score_tables.get(department) or self.score_tables[None]
+    
+    def score_profile(self, lecture, teacher, day, assignments):
+        """
+        Everything the soft score reads from the other assignments, in one pass:
+        (days the course meets on, course slots on day, course sessions on day, teacher slots
+        in the week, teacher slots on day, bitmask of the slots the course or batch sits in on day).
+        """
         course = lecture['course']
         batch = lecture.get('batch')
-        
-        course_times_on_day = []
+        course_days = set()
+        course_day_slots = daily_sessions = teacher_week = teacher_day = mask = 0
         for a in assignments:
-            if a['course'] == course and a['day'] == day:
-                a_subject = a.get('subject', '')
-                
-                if batch:
-                    if batch in a_subject or ('Batch' not in a_subject and '(Lab)' not in a_subject and '(Tutorial)' not in a_subject):
-                        existing_time_idx = self.time_slots.index(a['time'])
-                        duration = a.get('duration', 1)
-                        for i in range(duration):
-                            course_times_on_day.append(existing_time_idx + i)
-                else:
-                    existing_time_idx = self.time_slots.index(a['time'])
-                    duration = a.get('duration', 1)
-                    for i in range(duration):
-                        course_times_on_day.append(existing_time_idx + i)
-        
-        for i in range(lecture['duration']):
-            course_times_on_day.append(time_idx + i)
-        
-        all_times = sorted(set(course_times_on_day))
+            duration = a.get('duration', 1)
+            if a['course'] == course:
+                course_days.add(a['day'])
+                if a['day'] == day:
+                    course_day_slots += duration
+                    daily_sessions += 1
+                    a_subject = a.get('subject', '')
+                    if not batch or batch in a_subject or ('Batch' not in a_subject and '(Lab)' not in a_subject
+                                                          and '(Tutorial)' not in a_subject):
+                        mask |= ((1 << duration) - 1) << self.slot_index[a['time']]
+            if a['teacher'] == teacher:
+                teacher_week += duration
+                if a['day'] == day:
+                    teacher_day += duration
+        return len(course_days), course_day_slots, daily_sessions, teacher_week, teacher_day, mask
+    
+    def score_placement(self, lecture, teacher, day, time_idx, profile):
+        """Soft score of a placement from its score_profile, by table lookups"""
+        tables = self.scoring_tables(lecture.get('department'))
+        days_met, course_day_slots, daily_sessions, teacher_week, teacher_day, mask = profile
+        
+        table = tables['course_day']
+        score = table[min(course_day_slots, len(table) - 1)]
+        if not course_day_slots:
+            score += tables['new_day'][min(days_met, len(self.days))]
+        table = tables['daily_sessions']
+        score += table[min(daily_sessions, len(table) - 1)]
+        table = tables['teacher_week']
+        score += table[min(teacher_week, len(table) - 1)]
+        table = tables['teacher_day']
+        score += table[min(teacher_day, len(table) - 1)]
+        score += tables['start'][time_idx]
         
-        if len(all_times) <= 1:
+        if teacher in self.teacher_availability:
+            teacher_data = self.teacher_availability[teacher]
+            day_mask = self.availability_mask(teacher_data, day)
+            availability = tables['availability']
+            if (day_mask >> time_idx) & 1:
+                score += availability['available']
+            elif day_mask:
+                score += availability['other_slot']
+            else:
+                score += availability['unavailable_day']
+            score += tables['faculty_type'].get(teacher_data.get('faculty_type', ''), 0)
+        
+        if lecture['type'] != 'lab':
+            has_before = time_idx > 0 and (mask >> (time_idx - 1)) & 1
+            has_after = (mask >> (time_idx + lecture['duration'])) & 1
+            if not has_before and not has_after:
+                score += tables['isolation']['both_sides']
+            elif not has_before or not has_after:
+                score += tables['isolation']['one_side']
+        
+        placed = mask | (((1 << lecture['duration']) - 1) << time_idx)
+        breaks = tables['breaks']
+        if placed not in breaks:
+            breaks[placed] = self.break_pattern_score(placed, tables['weights']['breaks'])
+        return score + breaks[placed]
+    
+    def break_pattern_score(self, mask, weights):
+        """Break quality of a day whose occupied slots are the bits of mask"""
+        slots = [t for t in range(mask.bit_length()) if (mask >> t) & 1]
+        if len(slots) <= 1:
             return 0
+        score = 0
+        total_hours = self.session_hours(len(slots))
+        if total_hours >= weights['long_day_hours']:
+            score += int(total_hours * weights['long_day_per_hour'])
         
-        total_lecture_hours = len(all_times)
-        if total_lecture_hours >= 7:
-            score -= (total_lecture_hours * 5)
-            
-        break_blocks = []
         lecture_blocks = []
-        current_break = 0
-        current_lecture = 0
-        
-        min_slot = min(all_times)
-        max_slot = max(all_times)
-        
-        for slot in range(min_slot, max_slot + 1):
-            if slot in all_times:
-                current_lecture += 1
-                if current_break > 0:
-                    break_blocks.append(current_break)
-                    current_break = 0
+        break_count = 0
+        run = 1
+        for previous, slot in zip(slots, slots[1:]):
+            if slot == previous + 1:
+                run += 1
             else:
-                current_break += 1
-                if current_lecture > 0:
-                    lecture_blocks.append(current_lecture)
-                    current_lecture = 0
-        if current_break > 0:
-            break_blocks.append(current_break)
-        if current_lecture > 0:
-            lecture_blocks.append(current_lecture)
-        
-        if len(break_blocks) > 0:
-            score += 10
-            
-            if len(break_blocks) == 1 and len(lecture_blocks) == 2:
-                first_block = lecture_blocks[0]
-                second_block = lecture_blocks[1]
-                
-                ratio = min(first_block, second_block) / max(first_block, second_block)
-                
-                if ratio >= 0.6:
-                    score += 20
-                elif ratio >= 0.3:
-                    score += 10
+                lecture_blocks.append(run)
+                break_count += 1
+                run = 1
+        lecture_blocks.append(run)
+        
+        if break_count:
+            score += weights['has_break']
+            if break_count == 1:
+                ratio = min(lecture_blocks) / max(lecture_blocks)
+                score += self.band_points(weights['balance'], ratio)
+        
+        max_continuous = self.session_hours(max(lecture_blocks))
+        if max_continuous > weights['max_continuous_hours']:
+            score += int((max_continuous - weights['max_continuous_hours']) * weights['continuous_per_hour'])
+        return score
+    
+    def calculate_isolation_penalty(self, lecture, day, time_idx, assignments):
+        """
+        Penalize scheduling a lecture or tutorial with breaks on both sides.
+        Labs are not penalized.
+        """
+        if lecture['type'] == 'lab':
+            return 0
+        mask = self.score_profile(lecture, None, day, assignments)[5]
+        isolation = self.scoring_tables(lecture.get('department'))['isolation']
+        has_before = time_idx > 0 and (mask >> (time_idx - 1)) & 1
+        has_after = (mask >> (time_idx + lecture['duration'])) & 1
+        if not has_before and not has_after:
+            return isolation['both_sides']
+        elif not has_before or not has_after:
+            return isolation['one_side']
+        return 0
+    
+    def calculate_assignment_score(self, lecture, teacher, day, time_idx, assignments):
+        profile = self.score_profile(lecture, teacher, day, assignments)
+        return self.score_placement(lecture, teacher, day, time_idx, profile)
+    
+    def is_valid_assignment_relaxed(self, lecture, teacher, day, time_idx, grid, assignments, classroom):
+        reason = self.assignment_violation(lecture, teacher, day, time_idx, grid, assignments, classroom)
+        if reason is None:
+            return True
+        if self.telemetry is not None:
+            self.telemetry['rejections'][reason] += 1
+        return False
+    
+    def assignment_violation(self, lecture, teacher, day, time_idx, grid, assignments, classroom):
+        """
+        Name of the first hard constraint the placement breaks, or None if it is valid.
+        The built-in rules read the grid's busy masks and session counts; rules added with
+        add_constraint are checked last, from their compiled masks and limits.
+        """
+        mask = ((1 << lecture['duration']) - 1) << time_idx
+        if grid.teacher_busy.get((teacher, day), 0) & mask:
+            return 'teacher_clash'
+        
+        batches = grid.course_busy.get((lecture['course'], day), {})
+        if lecture.get('batch'):
+            if batches.get(lecture['batch'], 0) & mask:
+                return 'batch_clash'
+            if (batches.get('', 0) | batches.get('*', 0)) & mask:
+                return 'course_clash'
+            if any(busy & mask for batch, busy in batches.items() if batch not in ('', '*', lecture['batch'])):
+                # Other batches may run alongside, but not the same subject
+                current_subject = lecture['subject'].replace(' (Lab)', '').replace(' (Tutorial)', '')
+                for slot in self.time_slots[time_idx:time_idx + lecture['duration']]:
+                    for existing in grid[day][slot]:
+                        if existing['course'] == lecture['course'] and \
+                                existing['subject'].replace(' (Lab)', '').replace(' (Tutorial)', '') == current_subject:
+                            return 'batch_clash'
+        elif any(busy & mask for busy in batches.values()):
+            return 'course_clash'
+        
+        reason = self.room_violation(lecture, classroom)
+        if reason:
+            return reason
+        
+        teacher_busy = grid.teacher_busy
+        teacher_weekly_slots = sum(bin(teacher_busy.get((teacher, d), 0)).count('1') for d in self.days)
+        if teacher_weekly_slots + lecture['duration'] > self.max_weekly_slots:
+            return 'teacher_hours'
         
-        max_continuous = max(lecture_blocks) if lecture_blocks else 0
-        if max_continuous > 3:
-            score -= (max_continuous - 3) * 10
+        if teacher in self.teacher_availability:
+            if mask & ~self.availability_mask(self.teacher_availability[teacher], day):
+                return 'teacher_availability'
+        
+        label = lecture.get('batch') or self.entry_batch(lecture['subject'])
+        reason = self.course_day_violation(batches, grid.course_sessions.get((lecture['course'], day), {}),
+                                           label, mask)
+        if reason:
+            return reason
+        
+        compiled = self.compiled_constraints or self.compile_constraints()
+        if compiled['slot_rules']:
+            allowed, rules = self.allowed_slots(lecture, teacher, day)
+            if mask & ~allowed:
+                return next(name for name, rule_mask in rules if mask & ~rule_mask)
+        if teacher in compiled['day_limits'] and not teacher_busy.get((teacher, day), 0):
+            limit, name = compiled['day_limits'][teacher]
+            if sum(1 for d in self.days if teacher_busy.get((teacher, d), 0)) >= limit:
+                return name
+        
+        return None
+    
+    def room_violation(self, lecture, classroom):
+        """Name of the room rule the classroom breaks for the lecture, or None"""
+        if classroom['capacity'] < lecture['capacity_needed']:
+            return 'room_capacity'
         
-        return score
+        class_type_lower = classroom['class_type'].lower()
+        
+        if lecture['type'] == 'lab':
+            if class_type_lower not in ['cl', 'lab']:
+                return 'room_type'
+            if classroom['department'] != lecture['department']:
+                return 'room_department'
+        
+        elif lecture['type'] == 'tutorial':
+            if class_type_lower not in ['tr', 'cr']:
+                return 'room_type'
+        
+        return None
+    
+    def check_break_constraint(self, lecture, day, time_idx, assignments):
+        batches = {}
+        sessions = {}
+        for a in assignments:
+            if a['course'] == lecture['course'] and a['day'] == day:
+                label = self.entry_batch(a['subject'])
+                batches[label] = batches.get(label, 0) | \
+                    ((1 << a.get('duration', 1)) - 1) << self.slot_index[a['time']]
+                sessions[label] = sessions.get(label, 0) + 1
+        label = lecture.get('batch') or self.entry_batch(lecture['subject'])
+        mask = ((1 << lecture['duration']) - 1) << time_idx
+        return self.course_day_violation(batches, sessions, label, mask) != 'break_gap'
+    
+    def course_day_violation(self, batches, sessions, label=None, mask=0):
+        """
+        'break_gap' or 'daily_load' if a group of students of a course breaks the break or
+        load rule on a day, else None. batches and sessions are the day's busy masks and
+        session counts per batch label (see entry_batch); label and mask add a session being
+        placed, and then only the groups it changes are checked. Each batch attends its own
+        sessions and the whole-course ones; a day without batch sessions is one group.
+        """
+        lecture_mask = batches.get('', 0)
+        whole_count = sessions.get('', 0) + sessions.get('*', 0)
+        if label is not None and label not in ('', '*'):
+            # A batch session only changes its own batch's day
+            groups = [(lecture_mask | batches.get(label, 0) | mask,
+                       whole_count + sessions.get(label, 0) + 1)]
+        else:
+            if label is not None:
+                whole_count += 1
+                if label == '':
+                    lecture_mask |= mask
+            groups = [(lecture_mask | batches.get(batch, 0), whole_count + count)
+                      for batch, count in sessions.items() if count and batch not in ('', '*')]
+            if not groups:
+                groups = [(lecture_mask | batches.get('*', 0) | (mask if label == '*' else 0), whole_count)]
+        
+        for day_mask, _ in groups:
+            if not self.break_gap_allowed(day_mask):
+                return 'break_gap'
+        for _, count in groups:
+            if count > 8:
+                return 'daily_load'
+        return None
+    
+    def break_gap_allowed(self, mask):
+        """
+        Whether a course day whose occupied slots are the bits of mask has acceptable breaks:
+        none up to 3 hours of classes, 1 hour up to 5, else 2. Memoized per mask.
+        """
+        allowed = self.break_gap_cache.get(mask)
+        if allowed is None:
+            slots = bin(mask).count('1')
+            if slots <= 1:
+                allowed = True
+            else:
+                first = (mask & -mask).bit_length() - 1
+                total_lecture_hours = self.session_hours(slots)
+                total_break_hours = self.session_hours(mask.bit_length() - first - slots)
+                if total_lecture_hours <= 3:
+                    allowed = total_break_hours == 0
+                elif total_lecture_hours <= 5:
+                    allowed = total_break_hours <= 1
+                else:
+                    allowed = total_break_hours <= 2
+            self.break_gap_cache[mask] = allowed
+        return allowed
+    
+    def add_constraint(self, name, reads, compile):
+        """
+        Add a hard rule. compile(scheduler) runs at solve start and turns the rule into data
+        for the aggregate it reads:
+          'slots': a list of (match, {day: allowed slot mask}); match maps lecture fields
+                   (type, department, course, subject) or 'teacher' / 'faculty_type' to a
+                   value or a list of values, and days left out are unrestricted
+          'teacher_days': {teacher: most days a week they may teach}
+        Placements the rule rejects are counted under its name in the solver statistics.
+        """
+        if reads not in ('slots', 'teacher_days'):
+            raise ValueError(f"Constraint '{name}' reads unknown state '{reads}'")
+        self.constraints.append({'name': name, 'reads': reads, 'compile': compile})
+        self.compiled_constraints = None
+    
+    def read_constraints(self, filename):
+        """Load a constraint plugin: a Python file whose register(scheduler) calls add_constraint"""
+        spec = importlib.util.spec_from_file_location(
+            os.path.splitext(os.path.basename(filename))[0], filename)
+        if spec is None:
+            raise ValueError(f"Not a Python file: {filename}")
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except SyntaxError as e:
+            raise ValueError(f"Constraint plugin {filename} does not compile: {e}")
+        if not hasattr(module, 'register'):
+            raise ValueError(f"Constraint plugin {filename} has no register(scheduler) function")
+        count = len(self.constraints)
+        module.register(self)
+        return len(self.constraints) - count
+    
+    def compile_constraints(self):
+        """Compile the added rules into slot masks and day limits; called at solve start"""
+        slot_rules = []
+        day_limits = {}
+        for rule in self.constraints:
+            try:
+                compiled = rule['compile'](self)
+                if rule['reads'] == 'slots':
+                    for match, days in compiled:
+                        match = {key: set(value) if isinstance(value, (list, tuple, set)) else {value}
+                                 for key, value in match.items()}
+                        slot_rules.append((rule['name'], match, dict(days)))
+                else:
+                    for teacher, limit in compiled.items():
+                        if teacher not in day_limits or limit < day_limits[teacher][0]:
+                            day_limits[teacher] = (int(limit), rule['name'])
+            except (KeyError, TypeError, AttributeError) as e:
+                raise ValueError(f"Invalid constraint '{rule['name']}': {e!r}")
+        # 'allowed' memoizes allowed_slots per lecture, teacher and day
+        self.compiled_constraints = {'slot_rules': slot_rules, 'day_limits': day_limits, 'allowed': {}}
+        return self.compiled_constraints
+    
+    def allowed_slots(self, lecture, teacher, day):
+        """
+        (mask of the slots the 'slots' rules allow the lecture in on day, [(rule name, mask)]
+        of the rules that apply), worked out once per lecture kind, teacher and day
+        """
+        compiled = self.compiled_constraints or self.compile_constraints()
+        key = (lecture['type'], lecture.get('department'), lecture['course'], lecture['subject'], teacher, day)
+        result = compiled['allowed'].get(key)
+        if result is None:
+            fields = {
+                'type': lecture['type'],
+                'department': lecture.get('department'),
+                'course': lecture['course'],
+                'subject': lecture['subject'],
+                'teacher': teacher,
+                'faculty_type': self.teacher_availability.get(teacher, {}).get('faculty_type')
+            }
+            allowed = (1 << len(self.time_slots)) - 1
+            rules = []
+            for name, match, days in compiled['slot_rules']:
+                if day in days and all(fields.get(k) in values for k, values in match.items()):
+                    allowed &= days[day]
+                    rules.append((name, days[day]))
+            result = compiled['allowed'][key] = (allowed, rules)
+        return result
+    
+    def calculate_break_quality_score(self, lecture, day, time_idx, assignments):
+        mask = self.score_profile(lecture, None, day, assignments)[5]
+        placed = mask | (((1 << lecture['duration']) - 1) << time_idx)
+        tables = self.scoring_tables(lecture.get('department'))
+        if placed not in tables['breaks']:
+            tables['breaks'][placed] = self.break_pattern_score(placed, tables['weights']['breaks'])
+        return tables['breaks'][placed]
     
     def is_time_available(self, lecture, teacher, day, time_idx, grid):
-        for i in range(lecture['duration']):
-            if time_idx + i >= len(self.time_slots):
-                return False
-            time = self.time_slots[time_idx + i]
-            for existing in grid[day][time]:
-                if existing['teacher'] == teacher or existing['course'] == lecture['course']:
-                    return False
-        return True
+        if time_idx + lecture['duration'] > len(self.time_slots):
+            return False
+        mask = ((1 << lecture['duration']) - 1) << time_idx
+        if grid.teacher_busy.get((teacher, day), 0) & mask:
+            return False
+        return not any(busy & mask for busy in grid.course_busy.get((lecture['course'], day), {}).values())
     
     def can_use_classroom(self, classroom, day, time_idx, duration, grid):
-        for i in range(duration):
-            time = self.time_slots[time_idx + i]
-            for existing in grid[day][time]:
-                if existing['classroom'] == classroom:
-                    return False
-        return True
+        return not grid.room_busy.get((classroom, day), 0) & (((1 << duration) - 1) << time_idx)
     
     def make_assignment(self, assignment, duration, time_idx, grid):
         day = assignment['day']
         assignment['duration'] = duration
         for i in range(duration):
-            time = self.time_slots[time_idx + i]
-            grid[day][time].append({
+            slot = self.time_slots[time_idx + i]
+            grid[day][slot].append({
                 'course': assignment['course'],
                 'subject': assignment['subject'],
                 'teacher': assignment['teacher'],
@@ -1342,17 +3990,55 @@ class TimetableScheduler:
                 'type': assignment['type'],
                 'duration': duration
             })
+        self.mark_busy(assignment, ((1 << duration) - 1) << time_idx, grid)
     
     def undo_assignment(self, assignment, duration, time_idx, grid):
         day = assignment['day']
         for i in range(duration):
-            time = self.time_slots[time_idx + i]
-            grid[day][time] = [
-                e for e in grid[day][time]
+            slot = self.time_slots[time_idx + i]
+            grid[day][slot] = [
+                e for e in grid[day][slot]
                 if not (e['course'] == assignment['course'] and 
                        e['subject'] == assignment['subject'] and
                        e['teacher'] == assignment['teacher'])
             ]
+        self.clear_busy(assignment, ((1 << duration) - 1) << time_idx, grid)
+    
+    def entry_batch(self, subject):
+        """
+        Batch label of a grid entry's subject: 'Batch N', or for entries the whole course
+        attends '' (lectures) or '*' (labs and tutorials, which batches' break rules ignore)
+        """
+        batch = subject.partition(' - Batch ')[2]
+        if batch:
+            return 'Batch ' + batch
+        if '(Lab)' in subject or '(Tutorial)' in subject:
+            return '*'
+        return ''
+    
+    def mark_busy(self, assignment, mask, grid):
+        day = assignment['day']
+        key = (assignment['teacher'], day)
+        grid.teacher_busy[key] = grid.teacher_busy.get(key, 0) | mask
+        key = (assignment['classroom'], day)
+        grid.room_busy[key] = grid.room_busy.get(key, 0) | mask
+        batches = grid.course_busy.setdefault((assignment['course'], day), {})
+        batch = self.entry_batch(assignment['subject'])
+        batches[batch] = batches.get(batch, 0) | mask
+        sessions = grid.course_sessions.setdefault((assignment['course'], day), {})
+        sessions[batch] = sessions.get(batch, 0) + 1
+    
+    def clear_busy(self, assignment, mask, grid):
+        day = assignment['day']
+        key = (assignment['teacher'], day)
+        grid.teacher_busy[key] = grid.teacher_busy.get(key, 0) & ~mask
+        key = (assignment['classroom'], day)
+        grid.room_busy[key] = grid.room_busy.get(key, 0) & ~mask
+        batches = grid.course_busy.setdefault((assignment['course'], day), {})
+        batch = self.entry_batch(assignment['subject'])
+        batches[batch] = batches.get(batch, 0) & ~mask
+        sessions = grid.course_sessions.setdefault((assignment['course'], day), {})
+        sessions[batch] = sessions.get(batch, 0) - 1
     
     def get_filtered_schedule(self):
         view = self.current_view.get()
@@ -1534,17 +4220,383 @@ class TimetableScheduler:
                                                filetypes=[("CSV files", "*.csv")])
         if filename:
             try:
-                with open(filename, 'w', newline='', encoding='utf-8') as f:
-                    fieldnames = ['day', 'time', 'course', 'subject', 'teacher', 'classroom', 'type']
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    for entry in filtered_schedule:
-                        writer.writerow(entry)
-                
+                self.write_schedule_csv(filename, filtered_schedule)
                 messagebox.showinfo("Success", "Schedule exported successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export: {str(e)}")
     
+    def write_schedule_csv(self, filename, schedule):
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            fieldnames = ['day', 'time', 'course', 'subject', 'teacher', 'classroom', 'type']
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for entry in schedule:
+                writer.writerow(entry)
+    
+    def read_schedule_csv(self, filename):
+        """Schedule entries from a CSV in the export_csv format; raises ValueError if columns are missing"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            missing = [column for column in ['day', 'time', 'course', 'subject', 'teacher', 'classroom']
+                       if column not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"{filename} has no {', '.join(missing)} column")
+            entries = []
+            for row in reader:
+                entry = {column: (row[column] or '').strip()
+                         for column in ['day', 'time', 'course', 'subject', 'teacher', 'classroom']}
+                entry['type'] = (row.get('type') or 'lecture').strip()
+                entry['duration'] = self.session_slots.get(entry['type'], self.session_slots['lecture'])
+                entries.append(entry)
+        return entries
+    
+    def write_schedule_file(self, filename, schedule):
+        """
+        Save the schedule together with the calendar, weights and datasets it was built from,
+        as a compressed binary file that read_schedule_file opens without re-reading the CSVs
+        """
+        self.write_binary_file(filename, b'TTSC', {
+            'calendar': self.calendar,
+            'max_weekly_hours': self.max_weekly_hours,
+            'score_weights': self.score_weights,
+            'courses': self.courses,
+            'subject_details': self.subject_details,
+            'teachers': self.teachers,
+            'teacher_availability': self.teacher_availability,
+            'classrooms': self.classrooms,
+            'pins': self.pins,
+            'schedule': schedule
+        })
+    
+    def read_schedule_file(self, filename):
+        """
+        Open a saved schedule into self.schedule. A file from write_schedule_file also brings
+        back its datasets; a CSV in the export_csv format is read against the data already
+        loaded. Raises ValueError if an entry does not fit the calendar, and then nothing
+        is changed.
+        """
+        saved = None
+        if filename.lower().endswith('.csv'):
+            schedule = self.read_schedule_csv(filename)
+            days, slot_index = self.days, self.slot_index
+        else:
+            saved = self.read_binary_file(filename, b'TTSC')
+            datasets = {name: saved[name] for name in ['score_weights', 'courses', 'subject_details',
+                                                       'teachers', 'teacher_availability',
+                                                       'classrooms', 'pins']}
+            schedule = saved['schedule']
+            # The entries are checked against the saved calendar before anything is replaced
+            calendar = TimetableScheduler()
+            calendar.max_weekly_hours = saved['max_weekly_hours']
+            calendar.apply_calendar(saved['calendar'])
+            days, slot_index = calendar.days, calendar.slot_index
+        
+        errors = [f"{entry['day']} {entry['time']} {entry['course']} {entry['subject']}"
+                  for entry in schedule if entry['day'] not in days or entry['time'] not in slot_index]
+        if errors:
+            raise ValueError("Entries outside the calendar:\n" + "\n".join(errors[:20]))
+        
+        if saved is not None:
+            self.max_weekly_hours = saved['max_weekly_hours']
+            self.apply_calendar(saved['calendar'])
+            for name, value in datasets.items():
+                setattr(self, name, value)
+            self.score_tables = {}
+            self.compiled_constraints = None
+            self.room_weights = {}
+            self.suitable_rooms_cache = {}
+        self.schedule = schedule
+        return schedule
+    
+    def save_schedule(self):
+        if not self.schedule:
+            messagebox.showwarning("Warning", "No schedule to save")
+            return
+        
+        filename = filedialog.asksaveasfilename(defaultextension=".ttsc",
+                                               filetypes=[("Saved schedules", "*.ttsc")])
+        if filename:
+            try:
+                self.write_schedule_file(filename, self.schedule)
+                messagebox.showinfo("Success", f"Saved {len(self.schedule)} classes with their data")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save: {str(e)}")
+    
+    def open_schedule(self, filename=None):
+        """Show a saved schedule (.ttsc) or exported CSV without solving"""
+        if filename is None:
+            filename = filedialog.askopenfilename(filetypes=[("Saved schedules", "*.ttsc"),
+                                                             ("CSV files", "*.csv")])
+        if not filename:
+            return
+        try:
+            self.read_schedule_file(filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open schedule: {str(e)}")
+            return
+        
+        self.refresh_input_choices()
+        self.progress_label.config(text=f"✓ Opened {os.path.basename(filename)}")
+        self.on_view_change()
+        self.display_schedule()
+        self.update_status()
+        if not all([self.courses, self.teachers, self.classrooms]):
+            messagebox.showinfo("Opened", f"Opened {len(self.schedule)} classes. Load the data files "
+                                          f"to use the course, teacher and classroom views and tools.")
+    
+    def validate_schedule(self, entries):
+        """
+        Check a whole schedule, e.g. one read with read_schedule_csv, against the hard rules
+        of assignment_violation (each entry against all the others) and total its soft score
+        the way calculate_schedule_score does. The checks read teacher, room and course-day
+        indexes built in one pass, so the cost is linear in the entries. Breaks and daily
+        loads are checked once per course day for every batch (see course_day_violation).
+        Entries matching a loaded pin are only checked for teacher and room clashes.
+        Returns (violations, score); violations is a list of readable lines.
+        """
+        courses = {course['name']: course for course in self.courses}
+        rooms = {classroom['room']: classroom for classroom in self.classrooms}
+        teacher_subjects = self.build_teacher_subjects()
+        compiled = self.compile_constraints()
+        violations = []
+        
+        # Busy indexes hold (slots covered once or more, slots covered twice or more), so an
+        # entry's clashes are twice & window and the others cover (once & ~window) | (twice & window)
+        def cover(index, key, mask):
+            once, twice = index.get(key, (0, 0))
+            index[key] = (once | mask, twice | (once & mask))
+        
+        def combine(pairs):
+            once = twice = 0
+            for pair_once, pair_twice in pairs:
+                twice |= pair_twice | (once & pair_once)
+                once |= pair_once
+            return once, twice
+        
+        teacher_busy = {}     # (teacher, day) -> (once, twice)
+        room_busy = {}        # (room, day) -> (once, twice)
+        course_busy = {}      # (course, day) -> {batch label: (once, twice)}
+        subject_busy = {}     # (course, day, subject) -> (once, twice) of batch sessions
+        course_sessions = {}  # (course, day) -> {batch label: sessions}
+        course_slots = defaultdict(int)
+        course_days = defaultdict(lambda: defaultdict(int))
+        teacher_slots = defaultdict(int)
+        teacher_week = defaultdict(int)
+        teacher_days = defaultdict(set)
+        
+        pinned = {(pin['day'], pin['time'], pin['course'], pin['subject'], pin['teacher'], pin['classroom'])
+                  for pin in self.pins}
+        rows = []
+        pin_rows = []
+        for entry in entries:
+            label = f"{entry['day']} {entry['time']} {entry['course']} {entry['subject']} ({entry['teacher']})"
+            subject, _, batch = entry['subject'].partition(' - Batch ')
+            batch = 'Batch ' + batch if batch else None
+            base_subject = subject.replace(' (Lab)', '').replace(' (Tutorial)', '')
+            course_data = courses.get(entry['course'])
+            details = self.subject_details.get(base_subject)
+            session_type = entry.get('type') or 'lecture'
+            
+            if entry['day'] not in self.days:
+                violations.append(f"{label}: unknown day")
+                continue
+            if entry['time'] not in self.slot_index:
+                violations.append(f"{label}: {entry['time']} is not a time slot of the calendar")
+                continue
+            if (entry['day'], entry['time'], entry['course'], entry['subject'], entry['teacher'],
+                    entry['classroom']) in pinned:
+                # Pins may be bookings outside the courses (see apply_pins): only the teacher
+                # and room rules apply to them, but they still hold their course's slots
+                duration = self.session_slots.get(session_type, self.session_slots['lecture'])
+                window = ((1 << duration) - 1) << self.slot_index[entry['time']]
+                cover(teacher_busy, (entry['teacher'], entry['day']), window)
+                cover(room_busy, (entry['classroom'], entry['day']), window)
+                teacher_slots[(entry['teacher'], entry['day'])] += duration
+                teacher_week[entry['teacher']] += duration
+                teacher_days[entry['teacher']].add(entry['day'])
+                if course_data is not None:
+                    entry_label = self.entry_batch(entry['subject'])
+                    cover(course_busy.setdefault((entry['course'], entry['day']), {}), entry_label, window)
+                    sessions = course_sessions.setdefault((entry['course'], entry['day']), {})
+                    sessions[entry_label] = sessions.get(entry_label, 0) + 1
+                    course_slots[(entry['course'], entry['day'])] += duration
+                    course_days[entry['course']][entry['day']] += 1
+                pin_rows.append((label, entry, window))
+                continue
+            if course_data is None:
+                violations.append(f"{label}: unknown course")
+                continue
+            if details is None:
+                violations.append(f"{label}: unknown subject")
+                continue
+            if session_type not in self.session_slots:
+                violations.append(f"{label}: unknown session type '{session_type}'")
+                continue
+            
+            batches = course_data['no_of_batches']
+            lecture = {
+                'course': entry['course'],
+                'subject': subject,
+                'type': session_type,
+                'duration': self.session_slots[session_type],
+                'department': details['department'],
+                'capacity_needed': course_data['capacity'] if session_type == 'lecture' or batches <= 0
+                                   else course_data['capacity'] // batches,
+                'batch': batch
+            }
+            teacher = entry['teacher']
+            day = entry['day']
+            time_idx = self.slot_index[entry['time']]
+            window = ((1 << lecture['duration']) - 1) << time_idx
+            if window & ~self.open_slots[day]:
+                violations.append(f"{label}: outside the calendar's teaching hours")
+            if teacher not in teacher_subjects.get(base_subject, []):
+                violations.append(f"{label}: teacher_subject ({teacher} does not teach {base_subject})")
+            
+            entry_label = self.entry_batch(entry['subject'])
+            cover(teacher_busy, (teacher, day), window)
+            cover(room_busy, (entry['classroom'], day), window)
+            cover(course_busy.setdefault((lecture['course'], day), {}), entry_label, window)
+            if batch:
+                cover(subject_busy, (lecture['course'], day, base_subject), window)
+            sessions = course_sessions.setdefault((lecture['course'], day), {})
+            sessions[entry_label] = sessions.get(entry_label, 0) + 1
+            course_slots[(lecture['course'], day)] += lecture['duration']
+            course_days[lecture['course']][day] += 1
+            teacher_slots[(teacher, day)] += lecture['duration']
+            teacher_week[teacher] += lecture['duration']
+            teacher_days[teacher].add(day)
+            rows.append((label, entry, lecture, entry_label, base_subject, time_idx, window))
+        
+        for label, entry, window in pin_rows:
+            if teacher_busy[(entry['teacher'], entry['day'])][1] & window:
+                violations.append(f"{label}: teacher_clash")
+            if room_busy[(entry['classroom'], entry['day'])][1] & window:
+                violations.append(f"{label}: room_clash")
+        
+        views = {}
+        score = 0
+        for label, entry, lecture, entry_label, base_subject, time_idx, window in rows:
+            teacher = entry['teacher']
+            day = entry['day']
+            course = lecture['course']
+            batch = lecture['batch']
+            labels = course_busy[(course, day)]
+            
+            if teacher_busy[(teacher, day)][1] & window:
+                violations.append(f"{label}: teacher_clash")
+            if batch:
+                if labels[entry_label][1] & window:
+                    violations.append(f"{label}: batch_clash")
+                elif (labels.get('', (0, 0))[0] | labels.get('*', (0, 0))[0]) & window:
+                    violations.append(f"{label}: course_clash")
+                elif subject_busy[(course, day, base_subject)][1] & window:
+                    violations.append(f"{label}: batch_clash")
+            elif combine(labels.values())[1] & window:
+                violations.append(f"{label}: course_clash")
+            
+            classroom = rooms.get(entry['classroom'])
+            if classroom is None:
+                violations.append(f"{label}: unknown classroom {entry['classroom']}")
+            else:
+                if room_busy[(entry['classroom'], day)][1] & window:
+                    violations.append(f"{label}: room_clash")
+                reason = self.room_violation(lecture, classroom)
+                if reason:
+                    violations.append(f"{label}: {reason}")
+            
+            if teacher in self.teacher_availability:
+                if window & ~self.availability_mask(self.teacher_availability[teacher], day):
+                    violations.append(f"{label}: teacher_availability")
+            
+            if compiled['slot_rules']:
+                allowed, rules = self.allowed_slots(lecture, teacher, day)
+                for name, rule_mask in rules:
+                    if window & ~rule_mask:
+                        violations.append(f"{label}: {name}")
+            
+            # The slots the soft score sees: the batch's and whole-course lectures, or everything
+            view_key = (course, day, entry_label if batch else None)
+            view = views.get(view_key)
+            if view is None:
+                if batch:
+                    view = combine([labels[entry_label], labels.get('', (0, 0))])
+                else:
+                    view = combine(labels.values())
+                views[view_key] = view
+            once, twice = view
+            
+            days_met = course_days[course]
+            profile = (len(days_met) - (days_met[day] == 1),
+                       course_slots[(course, day)] - lecture['duration'],
+                       sum(course_sessions[(course, day)].values()) - 1,
+                       teacher_week[teacher] - lecture['duration'],
+                       teacher_slots[(teacher, day)] - lecture['duration'],
+                       (once & ~window) | (twice & window))
+            score += self.score_placement(lecture, teacher, day, time_idx, profile)
+        
+        for (course, day), labels in course_busy.items():
+            reason = self.course_day_violation({label: once for label, (once, _) in labels.items()},
+                                               course_sessions[(course, day)])
+            if reason:
+                violations.append(f"{course} on {day}: {reason}")
+        
+        for teacher, slots in teacher_week.items():
+            if slots > self.max_weekly_slots:
+                violations.append(f"{teacher}: teacher_hours ({self.session_hours(slots):g} hours a week, "
+                                  f"limit {self.max_weekly_hours})")
+            if teacher in compiled['day_limits']:
+                limit, name = compiled['day_limits'][teacher]
+                if len(teacher_days[teacher]) > limit:
+                    violations.append(f"{teacher}: {name} ({len(teacher_days[teacher])} days, limit {limit})")
+        
+        requirements = self.build_lecture_requirements()
+        matched = self.match_entries_to_requirements(entries, requirements)
+        unplaced = defaultdict(int)
+        for r, lecture in enumerate(requirements):
+            if r not in matched:
+                batch_info = f" - {lecture['batch']}" if lecture.get('batch') else ""
+                unplaced[(lecture['course'], lecture['subject'] + batch_info)] += 1
+        for (course, subject), count in unplaced.items():
+            violations.append(f"{course} {subject}: {count} session{'s' if count > 1 else ''} not scheduled")
+        
+        return violations, score
+    
+    def validate_schedule_file(self):
+        """Check an exported or hand-edited schedule CSV against the loaded data"""
+        if not all([self.courses, self.teachers, self.classrooms, self.subject_details]):
+            messagebox.showerror("Error", "Please load all required data files")
+            return
+        
+        filename = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+        if not filename:
+            return
+        try:
+            entries = self.read_schedule_csv(filename)
+            violations, score = self.validate_schedule(entries)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to validate: {str(e)}")
+            return
+        
+        lines = [f"{len(entries)} classes, soft score {score}", ""]
+        if violations:
+            lines.append(f"{len(violations)} violations:")
+            lines.extend(f"  {violation}" for violation in violations)
+        else:
+            lines.append("No violations")
+        
+        report_window = Toplevel(self.root)
+        report_window.title(f"Validation - {os.path.basename(filename)}")
+        report_window.geometry("720x560")
+        report_window.configure(bg="white")
+        report_window.transient(self.root)
+        
+        text = tk.Text(report_window, font=("Consolas", 10), bg="white", fg="#2c3e50",
+                      relief=tk.FLAT, padx=15, pady=15)
+        text.insert(tk.END, "\n".join(lines))
+        text.config(state=tk.DISABLED)
+        text.pack(fill=tk.BOTH, expand=True)
+    
     def export_pdf(self):
         if not PDF_AVAILABLE:
             messagebox.showerror("Error", "ReportLab library not installed.\nPlease install it using: pip install reportlab")
@@ -1737,7 +4789,168 @@ class TimetableScheduler:
             return f"{entry['course']}\n{entry['subject']}{lab_indicator}{tutorial_indicator}\n{entry['teacher']}"
         return ""
 
+_solver_worker = None
+
+
+def _init_solver_worker(state):
+    """Process pool initializer: build a headless scheduler holding the solver's dataset"""
+    global _solver_worker
+    _solver_worker = TimetableScheduler()
+    for name, value in state['attributes'].items():
+        setattr(_solver_worker, name, value)
+    _solver_worker.apply_calendar(_solver_worker.calendar)
+    _solver_worker.genome_state = state['genome_state']
+
+
+def _evaluate_genome_job(job):
+    genome, seed, greedy = job
+    return _solver_worker.evaluate_genome(genome, seed, greedy)
+
+
+def read_data_files(scheduler, args):
+    """Load the calendar, weights, plugins and data files given on the command line"""
+    if args.calendar:
+        scheduler.read_calendar(args.calendar)
+    if args.weights:
+        scheduler.read_score_weights(args.weights)
+    for plugin in args.constraints:
+        scheduler.read_constraints(plugin)
+    if args.courses:
+        scheduler.read_courses(args.courses)
+    if args.subjects:
+        scheduler.read_subject_details(args.subjects)
+    if args.teachers:
+        scheduler.read_teachers(args.teachers)
+    if args.classrooms:
+        scheduler.read_classrooms(args.classrooms)
+    if args.availability:
+        scheduler.read_availability(args.availability)
+    if args.pins:
+        scheduler.read_pins(args.pins)
+
+
+def load_scheduler(directory):
+    """Build a scheduler from the standard input files in a directory, as written by generate_instance.py"""
+    scheduler = TimetableScheduler()
+    scheduler.read_courses(os.path.join(directory, INPUT_FILES['courses']))
+    scheduler.read_subject_details(os.path.join(directory, INPUT_FILES['subjects']))
+    scheduler.read_teachers(os.path.join(directory, INPUT_FILES['teachers']))
+    scheduler.read_availability(os.path.join(directory, INPUT_FILES['availability']))
+    scheduler.read_classrooms(os.path.join(directory, INPUT_FILES['classrooms']))
+    return scheduler
+
+
+def run_headless(args):
+    """Solve from CSV files without the GUI; returns the process exit code"""
+    scheduler = TimetableScheduler()
+    read_data_files(scheduler, args)
+    
+    if args.validate:
+        start = time.perf_counter()
+        entries = scheduler.read_schedule_csv(args.validate)
+        violations, score = scheduler.validate_schedule(entries)
+        elapsed = time.perf_counter() - start
+        for violation in violations:
+            print(violation)
+        print(f"{len(entries)} classes, {len(violations)} violations, soft score {score} ({elapsed:.2f} s)")
+        return 1 if violations else 0
+    
+    if args.mode not in scheduler.solver_modes:
+        raise ValueError(f"Unknown solver mode {args.mode}; choose from {', '.join(scheduler.solver_modes)}")
+    scheduler.solver_mode = args.mode
+    scheduler.random_seed = args.seed
+    scheduler.node_limit = args.node_limit
+    scheduler.checkpoint_path = args.checkpoint
+    scheduler.trace_path = args.trace
+    scheduler.telemetry_enabled = args.stats
+    scheduler.profile_path = args.profile
+    scheduler.feasibility_check = not args.skip_feasibility
+    scheduler.teacher_allocation_enabled = not args.no_teacher_allocation
+    scheduler.defer_rooms = args.defer_rooms
+    scheduler.lab_rotation = args.lab_rotation
+    
+    start = time.perf_counter()
+    if scheduler.profile_path:
+        success, assignments = scheduler.profile_call(scheduler.solve_schedule, args.resume)
+    else:
+        success, assignments = scheduler.solve_schedule(args.resume)
+    elapsed = time.perf_counter() - start
+    
+    if success:
+        print(f"Generated {len(assignments)} classes in {elapsed:.2f} s")
+        if args.output:
+            scheduler.write_schedule_csv(args.output, assignments)
+        if args.save:
+            scheduler.write_schedule_file(args.save, assignments)
+    else:
+        print(f"Could not satisfy all constraints ({elapsed:.2f} s)")
+    if args.stats:
+        print(json.dumps(scheduler.solver_stats, indent=2))
+    if args.profile:
+        print(f"Profile saved to {args.profile}")
+    return 0 if success else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="College timetable scheduler. Without data files the GUI is started.")
+    parser.add_argument("--courses", help="courses CSV")
+    parser.add_argument("--subjects", help="subject details CSV")
+    parser.add_argument("--teachers", help="teachers CSV")
+    parser.add_argument("--availability", help="teacher availability CSV")
+    parser.add_argument("--classrooms", help="classrooms CSV")
+    parser.add_argument("--pins", help="pinned sessions CSV")
+    parser.add_argument("--calendar", help="calendar JSON: day hours, slot and session lengths")
+    parser.add_argument("--weights", help="score weights JSON, optionally per department")
+    parser.add_argument("--constraints", action="append", default=[],
+                        help="constraint plugin (Python file with register(scheduler)); repeatable")
+    parser.add_argument("--mode", default="backtrack", help="solver mode (default: backtrack)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the local search modes")
+    parser.add_argument("--node-limit", type=int, default=None, help="node budget for backtracking")
+    parser.add_argument("--output", help="write the schedule to this CSV file")
+    parser.add_argument("--save", help="save the schedule with its data to this file (.ttsc)")
+    parser.add_argument("--open", help="start the GUI showing this saved schedule (.ttsc, or a CSV "
+                                       "read against the data files given)")
+    parser.add_argument("--validate", help="check this schedule CSV instead of solving")
+    parser.add_argument("--checkpoint", help="save backtracking checkpoints to this file")
+    parser.add_argument("--resume", help="resume backtracking from this checkpoint")
+    parser.add_argument("--trace", help="record a search trace to this JSONL file")
+    parser.add_argument("--no-teacher-allocation", action="store_true",
+                        help="let the search choose teachers instead of fixing them first")
+    parser.add_argument("--defer-rooms", action="store_true",
+                        help="backtracking chooses slots only and matches rooms per slot")
+    parser.add_argument("--lab-rotation", action="store_true",
+                        help="backtracking places each course's batch labs together as rotations")
+    parser.add_argument("--skip-feasibility", action="store_true",
+                        help="start the search without the counting pre-checks")
+    parser.add_argument("--stats", action="store_true", help="print solver statistics")
+    parser.add_argument("--profile", help="profile the solve and save pstats to this file")
+    args = parser.parse_args()
+    
+    if args.open or not any([args.courses, args.subjects, args.teachers, args.classrooms]):
+        root = tk.Tk()
+        app = TimetableScheduler(root)
+        if args.open:
+            # Data files given with --open are loaded first, e.g. for an exported CSV
+            try:
+                read_data_files(app, args)
+            except (OSError, ValueError, KeyError) as e:
+                root.destroy()
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(2)
+            app.open_schedule(args.open)
+        root.mainloop()
+        return
+    
+    if not all([args.courses, args.subjects, args.teachers, args.classrooms]):
+        parser.error("--courses, --subjects, --teachers and --classrooms are required for a headless run")
+    
+    try:
+        sys.exit(run_headless(args))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = TimetableScheduler(root)
-    root.mainloop()
+    main()
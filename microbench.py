@@ -0,0 +1,218 @@
+"""
+Per-call timings of the solver's hot-path helpers on real mid-search states.
+
+    python microbench.py
+    python microbench.py --instance instances/c100 --output micro.json
+    python microbench.py --baseline micro_baseline.json
+
+A generated instance (or --instance) is solved once with backtracking. The
+search states after 25%, 50%, 75% and 95% of the placements are rebuilt,
+and every helper is timed on the calls the search makes for the next
+requirement in that state. The best of --repeat rounds is reported in
+microseconds per call.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+from generate_instance import generate_instance, write_instance
+from last_running_v3 import INPUT_FILES, load_scheduler
+
+HELPERS = ['expand_time_range', 'get_suitable_classrooms', 'is_valid_assignment_relaxed',
+           'check_break_constraint', 'calculate_break_quality_score', 'calculate_assignment_score',
+           'make_assignment', 'undo_assignment']
+
+
+def capture_states(scheduler, fractions, node_limit):
+    """Solve once, then rebuild the grid and assignments at each fraction of the final schedule"""
+    requirements = scheduler.build_lecture_requirements()
+    teacher_subjects = scheduler.build_teacher_subjects()
+    grid = scheduler.create_empty_grid()
+    assignments = []
+    scheduler.node_limit = node_limit
+    if not scheduler.backtrack_with_checkpoints(requirements, teacher_subjects, grid, assignments):
+        raise ValueError("The instance could not be solved; pick an easier one or raise --node-limit")
+
+    matched = scheduler.match_entries_to_requirements(assignments, requirements)
+    requirement_of = {id(entry): r for r, entry in matched.items()}
+
+    states = []
+    for fraction in fractions:
+        placed = int(len(assignments) * fraction)
+        state_grid = scheduler.create_empty_grid()
+        for assignment in assignments[:placed]:
+            time_idx = scheduler.slot_index[assignment['time']]
+            scheduler.make_assignment(dict(assignment), assignment['duration'], time_idx, state_grid)
+
+        lecture = requirements[requirement_of[id(assignments[placed])]]
+        teacher = assignments[placed]['teacher']
+        slots = [(day, time_idx) for day in scheduler.days
+                 for time_idx in scheduler.start_slots(day, lecture['duration'])]
+        states.append({
+            'label': f"{int(fraction * 100)}%",
+            'grid': state_grid,
+            'assignments': assignments[:placed],
+            'lecture': lecture,
+            'teacher': teacher,
+            'slots': slots,
+            'classroom': next(c for c in scheduler.classrooms
+                              if c['room'] == assignments[placed]['classroom'])
+        })
+    return states
+
+
+def best_per_call(func, calls, repeat):
+    """Best time over repeat rounds of running func on every argument tuple, in microseconds per call"""
+    best = None
+    perf_counter = time.perf_counter
+    for _ in range(repeat):
+        start = perf_counter()
+        for args in calls:
+            func(*args)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(calls) * 1e6
+
+
+def time_make_and_undo(scheduler, state, repeat):
+    """make_assignment and undo_assignment on every free slot of the next requirement"""
+    lecture = state['lecture']
+    grid = state['grid']
+    placements = []
+    for day, time_idx in state['slots']:
+        if scheduler.is_valid_assignment_relaxed(lecture, state['teacher'], day, time_idx, grid,
+                                                 state['assignments'], state['classroom']) and \
+                scheduler.can_use_classroom(state['classroom']['room'], day, time_idx,
+                                            lecture['duration'], grid):
+            placements.append((scheduler.build_assignment(lecture, state['teacher'], day, time_idx,
+                                                          state['classroom']['room']), time_idx))
+    if not placements:
+        return None, None
+
+    best_make = best_undo = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for assignment, time_idx in placements:
+            scheduler.make_assignment(assignment, lecture['duration'], time_idx, grid)
+        made = time.perf_counter()
+        for assignment, time_idx in placements:
+            scheduler.undo_assignment(assignment, lecture['duration'], time_idx, grid)
+        undone = time.perf_counter()
+        best_make = made - start if best_make is None else min(best_make, made - start)
+        best_undo = undone - made if best_undo is None else min(best_undo, undone - made)
+    return best_make / len(placements) * 1e6, best_undo / len(placements) * 1e6
+
+
+def run_microbenchmarks(scheduler, states, ranges, repeat):
+    results = {}
+    results['expand_time_range'] = {'all': best_per_call(scheduler.expand_time_range,
+                                                         [(r,) for r in ranges], repeat)}
+
+    for helper in HELPERS[1:]:
+        results[helper] = {}
+    for state in states:
+        lecture = state['lecture']
+        teacher = state['teacher']
+        grid = state['grid']
+        assignments = state['assignments']
+        label = state['label']
+
+        results['get_suitable_classrooms'][label] = best_per_call(
+            scheduler.get_suitable_classrooms, [(lecture,)] * 50, repeat)
+        results['is_valid_assignment_relaxed'][label] = best_per_call(
+            scheduler.is_valid_assignment_relaxed,
+            [(lecture, teacher, day, t, grid, assignments, state['classroom']) for day, t in state['slots']],
+            repeat)
+        for helper in ('check_break_constraint', 'calculate_break_quality_score'):
+            results[helper][label] = best_per_call(
+                getattr(scheduler, helper),
+                [(lecture, day, t, assignments) for day, t in state['slots']], repeat)
+        results['calculate_assignment_score'][label] = best_per_call(
+            scheduler.calculate_assignment_score,
+            [(lecture, teacher, day, t, assignments) for day, t in state['slots']], repeat)
+        make_us, undo_us = time_make_and_undo(scheduler, state, repeat)
+        if make_us is not None:
+            results['make_assignment'][label] = make_us
+            results['undo_assignment'][label] = undo_us
+
+    return results
+
+
+def availability_ranges(directory, days):
+    """Every time range written in the availability file, as expand_time_range receives them"""
+    ranges = []
+    with open(os.path.join(directory, INPUT_FILES['availability']), encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            for day in days:
+                value = (row.get(day) or '').strip()
+                if value and value.lower() != 'na':
+                    ranges.extend(r.strip() for r in value.split(';'))
+    return ranges or ["08:00-18:00"]
+
+
+def print_results(results, labels):
+    print(f"{'helper (µs/call)':32}" + "".join(f"{label:>10}" for label in labels))
+    for helper in HELPERS:
+        row = results[helper]
+        print(f"{helper:32}" + "".join(f"{row[label]:10.2f}" if label in row else f"{'-':>10}"
+                                       for label in labels))
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for helper, row in results.items():
+        for label, value in row.items():
+            base = baseline['results'].get(helper, {}).get(label)
+            if base is not None and value > base * (1 + threshold):
+                regressions.append(f"{helper} at {label}: {base:.2f} µs -> {value:.2f} µs")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the solver helpers")
+    parser.add_argument("--instance", help="directory with the five input CSVs (default: generated)")
+    parser.add_argument("--courses", type=int, default=20, help="size of the generated instance")
+    parser.add_argument("--seed", type=int, default=2)
+    parser.add_argument("--node-limit", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per helper; the best is kept")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative per-call slowdown (default 0.2)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        directory = args.instance
+        if not directory:
+            directory = corpus_dir
+            write_instance(generate_instance(courses=args.courses, seed=args.seed), directory)
+        scheduler = load_scheduler(directory)
+        ranges = availability_ranges(directory, scheduler.days)
+
+    fractions = [0.25, 0.5, 0.75, 0.95]
+    states = capture_states(scheduler, fractions, args.node_limit)
+    results = run_microbenchmarks(scheduler, states, ranges, args.repeat)
+    print_results(results, ['all'] + [state['label'] for state in states])
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
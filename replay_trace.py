@@ -0,0 +1,111 @@
+"""
+Replay a search trace written by the scheduler's "Record search trace" option.
+
+    python replay_trace.py timetable_trace.jsonl
+    python replay_trace.py timetable_trace.jsonl --step 5000 --top 20
+
+Rebuilds the stack of placements the backtracking search held after the given
+step and lists the requirements that caused the most backtracking.
+"""
+import argparse
+import json
+from collections import defaultdict
+
+
+def read_trace(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(path, step=None):
+    """Replay the trace up to and including step (the whole trace if None)"""
+    header = None
+    placed = []
+    end = None
+    stats = defaultdict(lambda: {'tries': 0, 'undos': 0, 'fails': 0, 'skips': 0})
+    last_step = -1
+
+    for event in read_trace(path):
+        if step is not None and event['step'] > step:
+            break
+        last_step = event['step']
+        kind = event['ev']
+
+        if kind == 'start':
+            header = event
+        elif kind == 'try':
+            placed.append(event)
+            stats[event['req']]['tries'] += 1
+        elif kind == 'undo':
+            if not placed or placed[-1]['req'] != event['req']:
+                raise ValueError(f"Undo at step {event['step']} does not match the last placement")
+            placed.pop()
+            stats[event['req']]['undos'] += 1
+        elif kind == 'fail':
+            stats[event['req']]['fails'] += 1
+        elif kind == 'skip':
+            stats[event['req']]['skips'] += 1
+        elif kind == 'end':
+            end = event
+
+    if header is None:
+        raise ValueError(f"{path} has no trace header")
+
+    return {
+        'requirements': header['requirements'],
+        'time_slots': header['time_slots'],
+        'step': last_step,
+        'placed': placed,
+        'stats': stats,
+        'end': end
+    }
+
+
+def describe(requirement):
+    course, subject, session_type, batch = requirement
+    return f"{course} / {subject}" + (f" ({batch})" if batch else "")
+
+
+def hot_spots(state, top):
+    """Requirements ranked by how often they were exhausted, then by how often they were undone"""
+    ranked = sorted(state['stats'].items(), key=lambda x: (-x[1]['fails'], -x[1]['undos'], x[0]))
+    return [(req, counts) for req, counts in ranked[:top] if counts['fails'] or counts['undos']]
+
+
+def print_report(state, top):
+    requirements = state['requirements']
+    time_slots = state['time_slots']
+    end = state['end']
+
+    print(f"Replayed {state['step'] + 1} events, {len(requirements)} requirements")
+    if end is not None and end['step'] == state['step']:
+        print(f"Search {'succeeded' if end['success'] else 'failed'} after {end['nodes']} nodes")
+
+    print(f"\nSearch state: {len(state['placed'])} placements")
+    for event in state['placed']:
+        print(f"  [{event['req']:4}] {describe(requirements[event['req']]):40} "
+              f"{event['teacher']:20} {event['day']:10} {time_slots[event['slot']]:12} "
+              f"{event['room']:10} score {event['score']:5}  ({event['pos'] + 1}/{event['alts']})")
+
+    print(f"\nHot spots (top {top})")
+    print(f"  {'req':>6} {'fails':>7} {'undos':>7} {'tries':>7}  requirement")
+    for req, counts in hot_spots(state, top):
+        print(f"  {req:6} {counts['fails']:7} {counts['undos']:7} {counts['tries']:7}  "
+              f"{describe(requirements[req])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a timetable search trace")
+    parser.add_argument("trace", help="JSONL trace written by the scheduler")
+    parser.add_argument("--step", type=int, default=None,
+                        help="rebuild the search state after this step (default: end of trace)")
+    parser.add_argument("--top", type=int, default=10, help="number of hot spots to list")
+    args = parser.parse_args()
+
+    print_report(replay(args.trace, args.step), args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_instance import generate_instance, write_instance
+from last_running_v3 import load_scheduler
+
+
+@pytest.fixture(scope="session")
+def instance_dir(tmp_path_factory):
+    """A small generated college with batches, labs and teacher availability"""
+    directory = str(tmp_path_factory.mktemp("instance"))
+    write_instance(generate_instance(courses=8, seed=1), directory)
+    return directory
+
+
+@pytest.fixture
+def scheduler(instance_dir):
+    return load_scheduler(instance_dir)
@@ -0,0 +1,86 @@
+import pytest
+
+from last_running_v3 import TimetableScheduler
+
+
+def half_hour_scheduler():
+    scheduler = TimetableScheduler()
+    scheduler.apply_calendar(dict(scheduler.calendar, slot_minutes=30, lecture_minutes=90,
+                                  day_hours={'Saturday': '08:00-10:00; 12:00-13:00'}))
+    return scheduler
+
+
+def test_default_calendar():
+    scheduler = TimetableScheduler()
+    assert scheduler.time_slots[0] == '08:00-09:00' and len(scheduler.time_slots) == 10
+    assert scheduler.session_slots == {'lecture': 1, 'lab': 2, 'tutorial': 1}
+    assert scheduler.max_weekly_slots == 20
+    assert all(scheduler.open_slots[day] == (1 << 10) - 1 for day in scheduler.days)
+
+
+def test_slot_length_and_day_hours():
+    scheduler = half_hour_scheduler()
+    assert len(scheduler.time_slots) == 20 and scheduler.time_slots[1] == '08:30-09:00'
+    assert scheduler.session_slots == {'lecture': 3, 'lab': 4, 'tutorial': 2}
+    assert scheduler.max_weekly_slots == 40
+    assert scheduler.open_slots['Saturday'] == 0b1111 | (0b11 << 8)
+    # A 90-minute lecture fits the morning only, not the one-hour noon block
+    assert scheduler.start_slots('Saturday', 3) == [0, 1]
+    assert scheduler.start_slots('Saturday', 2) == [0, 1, 2, 8]
+
+
+def test_time_range_mask():
+    scheduler = half_hour_scheduler()
+    assert scheduler.time_range_mask('09:00-10:00') == 0b1100
+    # Slots only partly inside the range are left out
+    assert scheduler.time_range_mask('08:15-09:45') == 0b0110
+    assert scheduler.expand_time_range('17:00-18:00') == ['17:00-17:30', '17:30-18:00']
+    for text in ['0800-0900', '10:00-09:00', '9:0-10:00', '24:30-25:00']:
+        with pytest.raises(ValueError):
+            scheduler.time_range_mask(text)
+
+
+def test_parse_minutes_rejects_hour_24():
+    scheduler = TimetableScheduler()
+    assert scheduler.parse_minutes('23:59') == 23 * 60 + 59
+    for text in ['24:00', '24:30', '12:60', '7']:
+        with pytest.raises(ValueError):
+            scheduler.parse_minutes(text)
+
+
+def test_calendar_must_divide_into_slots():
+    scheduler = TimetableScheduler()
+    with pytest.raises(ValueError):
+        scheduler.apply_calendar(dict(scheduler.calendar, slot_minutes=45))
+    with pytest.raises(ValueError):
+        scheduler.apply_calendar(dict(scheduler.calendar, slot_minutes=30, lab_minutes=100))
+
+
+def test_availability_masks(tmp_path):
+    scheduler = half_hour_scheduler()
+    path = tmp_path / "availability.csv"
+    path.write_text("teacher_name,type of faculty,Monday,Saturday\n"
+                    "Prof. A,permanent,08:00-09:00;16:00-18:00,08:00-18:00\n"
+                    "Prof. B,visiting,NA,\n")
+    scheduler.read_availability(str(path))
+    masks = scheduler.teacher_availability['Prof. A']['masks']
+    assert masks['Monday'] == 0b11 | (0b1111 << 16)
+    # Closed calendar hours are never available
+    assert masks['Saturday'] == scheduler.open_slots['Saturday']
+    assert scheduler.teacher_availability['Prof. B']['masks']['Monday'] == 0
+    
+    path.write_text("teacher_name,Monday\nProf. A,08:00-09:00;9-10\n")
+    with pytest.raises(ValueError, match="Prof. A, Monday"):
+        scheduler.read_availability(str(path))
+
+
+def test_schedule_grid_masks_cover_whole_sessions(scheduler):
+    success, assignments = scheduler.solve_schedule()
+    assert success
+    grid = scheduler.build_schedule_grid(assignments)
+    lab = next(a for a in assignments if a['type'] == 'lab')
+    time_idx = scheduler.slot_index[lab['time']]
+    
+    assert grid.room_busy[(lab['classroom'], lab['day'])] >> time_idx & 0b11 == 0b11
+    assert grid.teacher_busy[(lab['teacher'], lab['day'])] >> time_idx & 0b11 == 0b11
+    assert not scheduler.can_use_classroom(lab['classroom'], lab['day'], time_idx + 1, 1, grid)
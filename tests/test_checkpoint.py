@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from last_running_v3 import load_scheduler
+
+
+def solve_interrupted(instance_dir, path, node_limit):
+    scheduler = load_scheduler(instance_dir)
+    scheduler.checkpoint_path = path
+    scheduler.checkpoint_interval = 0
+    scheduler.node_limit = node_limit
+    success, _ = scheduler.solve_schedule()
+    assert not success
+    return scheduler
+
+
+def test_checkpoint_round_trip(instance_dir, tmp_path):
+    path = str(tmp_path / "search.ttck")
+    scheduler = solve_interrupted(instance_dir, path, 40)
+    
+    checkpoint = scheduler.read_checkpoint(path)
+    # Saved on entering the last node within the limit, before it chose a candidate
+    assert checkpoint['nodes'] == 40
+    assert len(checkpoint['trail']) == 39
+    requirements = scheduler.build_lecture_requirements()
+    assert checkpoint['requirements'] == scheduler.requirement_signature(requirements)
+    for index, position, teacher, day, time_idx, classroom in checkpoint['trail']:
+        assert day in scheduler.days and 0 <= time_idx < len(scheduler.time_slots)
+
+
+def test_resume_finishes_the_same_search(instance_dir, tmp_path):
+    path = str(tmp_path / "search.ttck")
+    solve_interrupted(instance_dir, path, 40)
+    
+    resumed = load_scheduler(instance_dir)
+    resumed.checkpoint_path = path
+    success, assignments = resumed.solve_schedule(resume_path=path)
+    assert success
+    assert not os.path.exists(path)
+    
+    fresh = load_scheduler(instance_dir)
+    _, expected = fresh.solve_schedule()
+    assert assignments == expected
+    assert resumed.nodes_visited == fresh.nodes_visited
+
+
+def test_resume_rejects_other_data(instance_dir, tmp_path):
+    path = str(tmp_path / "search.ttck")
+    solve_interrupted(instance_dir, path, 40)
+    
+    other = load_scheduler(instance_dir)
+    other.courses = other.courses[1:]
+    with pytest.raises(ValueError, match="different input data"):
+        other.solve_schedule(resume_path=path)
+
+
+def test_binary_file_magic(scheduler, tmp_path):
+    path = str(tmp_path / "search.ttck")
+    scheduler.write_binary_file(path, b'TTCK', {'trail': [[0, 1, 'T', 'Monday', 2, 'R']]})
+    assert scheduler.read_checkpoint(path) == {'trail': [[0, 1, 'T', 'Monday', 2, 'R']]}
+    with pytest.raises(ValueError):
+        scheduler.read_schedule_file(path)
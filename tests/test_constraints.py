@@ -0,0 +1,80 @@
+import pytest
+
+PLUGIN = '''
+def register(scheduler):
+    scheduler.add_constraint(
+        'no_labs_after_16', 'slots',
+        lambda s: [({'type': 'lab'}, {day: s.time_range_mask('00:00-16:00') for day in s.days})])
+    scheduler.add_constraint(
+        'visiting_max_3_days', 'teacher_days',
+        lambda s: {t: 3 for t, data in s.teacher_availability.items()
+                   if data['faculty_type'] == 'visiting'})
+'''
+
+
+@pytest.fixture
+def plugin_path(tmp_path):
+    path = tmp_path / "rules.py"
+    path.write_text(PLUGIN)
+    return str(path)
+
+
+def test_plugin_rules_hold_in_the_solution(scheduler, plugin_path):
+    assert scheduler.read_constraints(plugin_path) == 2
+    scheduler.telemetry_enabled = True
+    success, assignments = scheduler.solve_schedule()
+    assert success
+    
+    last_start = scheduler.slot_index['14:00-15:00']
+    for a in assignments:
+        if a['type'] == 'lab':
+            assert scheduler.slot_index[a['time']] <= last_start
+    visiting = [t for t, data in scheduler.teacher_availability.items() if data['faculty_type'] == 'visiting']
+    assert visiting
+    for teacher in visiting:
+        assert len({a['day'] for a in assignments if a['teacher'] == teacher}) <= 3
+    
+    rejections = scheduler.solver_stats['rejections']
+    assert rejections.get('no_labs_after_16') and rejections.get('visiting_max_3_days')
+    assert scheduler.validate_schedule(assignments)[0] == []
+
+
+def test_assignment_violation_names_the_rule(scheduler, plugin_path):
+    scheduler.read_constraints(plugin_path)
+    scheduler.compile_constraints()
+    lab = next(r for r in scheduler.build_lecture_requirements() if r['type'] == 'lab')
+    room = scheduler.get_suitable_classrooms(lab)[0]
+    teacher = scheduler.build_teacher_subjects()[lab['subject'].replace(' (Lab)', '')][0]
+    day = next(d for d in scheduler.days
+               if scheduler.availability_mask(scheduler.teacher_availability[teacher], d) >> 8 & 0b11 == 0b11)
+    
+    grid = scheduler.create_empty_grid()
+    assert scheduler.assignment_violation(lab, teacher, day, 8, grid, [], room) == 'no_labs_after_16'
+    assert scheduler.assignment_violation(lab, teacher, day, 6, grid, [], room) is None
+
+
+def test_validator_reports_plugin_rules(scheduler, plugin_path):
+    success, assignments = scheduler.solve_schedule()
+    assert success
+    scheduler.read_constraints(plugin_path)
+    late = [a for a in assignments if a['type'] == 'lab' and scheduler.slot_index[a['time']] > 6]
+    violations, _ = scheduler.validate_schedule(assignments)
+    assert sum(v.endswith(': no_labs_after_16') for v in violations) == len(late)
+
+
+@pytest.mark.parametrize("source, message", [
+    ("def register(scheduler)\n    pass\n", "does not compile"),
+    ("RULES = []\n", "has no register"),
+    ("def register(scheduler):\n    scheduler.add_constraint('x', 'rooms', lambda s: [])\n", "unknown state"),
+])
+def test_bad_plugins(scheduler, tmp_path, source, message):
+    path = tmp_path / "rules.py"
+    path.write_text(source)
+    with pytest.raises(ValueError, match=message):
+        scheduler.read_constraints(str(path))
+
+
+def test_rule_that_does_not_compile(scheduler):
+    scheduler.add_constraint('broken', 'slots', lambda s: [({'type': 'lab'}, None)])
+    with pytest.raises(ValueError, match="Invalid constraint 'broken'"):
+        scheduler.solve_schedule()
@@ -0,0 +1,56 @@
+import pytest
+
+
+def feasibility(scheduler):
+    requirements = scheduler.build_lecture_requirements()
+    return scheduler.analyze_feasibility(requirements, scheduler.build_teacher_subjects(),
+                                         scheduler.create_empty_grid(), [])
+
+
+def test_solvable_instance_passes(scheduler):
+    assert feasibility(scheduler) == []
+
+
+def test_subject_without_teacher(scheduler):
+    for teacher in scheduler.teachers:
+        teacher['subjects'] = ','.join(s for s in teacher['subjects'].split(',') if s.strip() != 'CS30000')
+    problems = feasibility(scheduler)
+    assert any(p.startswith("No teacher can teach CS30000") for p in problems)
+    
+    with pytest.raises(ValueError, match="cannot be completed"):
+        scheduler.solve_schedule()
+    assert scheduler.nodes_visited == 0
+
+
+def test_only_teacher_over_availability(scheduler):
+    data = scheduler.teacher_availability['Prof. CS0001']
+    data['availability'] = {day: ['08:00-09:00'] if day == 'Monday' else [] for day in scheduler.days}
+    data.pop('masks', None)
+    problems = feasibility(scheduler)
+    assert any(p.startswith("Prof. CS0001 is the only teacher") and "available for only 1" in p
+               for p in problems)
+
+
+def test_no_room_fits(scheduler):
+    for classroom in scheduler.classrooms:
+        if classroom['room'] == 'Lab AI-1':
+            classroom['capacity'] = 10
+    problems = feasibility(scheduler)
+    assert any(p.startswith("No classroom fits BE AI 5 / AI80044 (Lab)") for p in problems)
+
+
+def test_room_and_course_hours_in_short_days(scheduler):
+    scheduler.apply_calendar(dict(scheduler.calendar, day_hours={day: '08:00-11:00' for day in scheduler.days}))
+    problems = feasibility(scheduler)
+    assert any(p.startswith("Rooms for labs of Data Science") and "free 2-hour windows" in p
+               for p in problems)
+    assert "TE IT 8 (Batch 1) needs 21 hours a week but a week has 18 teaching hours" in problems
+
+
+def test_room_matching_respects_teacher_hours(scheduler):
+    for data in scheduler.teacher_availability.values():
+        data['availability'] = {day: ['08:00-09:00', '09:00-10:00'] if day == 'Monday' else []
+                                for day in scheduler.days}
+        data.pop('masks', None)
+    problems = feasibility(scheduler)
+    assert any(p.startswith("Rooms can take at most 44 of the 215 class hours") for p in problems)
@@ -0,0 +1,65 @@
+import pytest
+
+from last_running_v3 import load_scheduler
+
+
+def entry_key(entry):
+    return (entry['course'], entry['subject'], entry['teacher'], entry['day'], entry['time'], entry['classroom'])
+
+
+def moved_lecture(scheduler, assignments):
+    """A lecture from the solution moved to another day the teacher is available"""
+    lecture = next(a for a in assignments if a['type'] == 'lecture')
+    availability = scheduler.teacher_availability[lecture['teacher']]['availability']
+    day = next(d for d in scheduler.days if d != lecture['day'] and availability[d])
+    return dict(lecture, day=day, time=availability[day][0])
+
+
+def test_pin_replaces_its_requirement(scheduler, instance_dir):
+    _, previous = load_scheduler(instance_dir).solve_schedule()
+    pin = moved_lecture(scheduler, previous)
+    scheduler.add_pin(pin['course'], pin['subject'], pin['teacher'], pin['day'], pin['time'], pin['classroom'])
+    success, assignments = scheduler.solve_schedule()
+    
+    assert success
+    assert entry_key(pin) in [entry_key(a) for a in assignments]
+    # The pin stands in for one of the subject's lectures instead of adding another
+    lectures = lambda entries: [a for a in entries if (a['course'], a['subject'], a['type']) ==
+                                (pin['course'], pin['subject'], 'lecture')]
+    assert len(lectures(assignments)) == len(lectures(previous))
+    assert len(assignments) == len(previous)
+    assert scheduler.validate_schedule(assignments)[0] == []
+
+
+def test_booking_pin_reserves_teacher_and_room(scheduler):
+    for day in scheduler.days:
+        scheduler.add_pin('Staff', 'Meeting', 'Prof. CS0001', day, '10:00-11:00', 'Room CS-1')
+    success, assignments = scheduler.solve_schedule()
+    
+    assert success
+    meetings = [a for a in assignments if a['course'] == 'Staff']
+    assert len(meetings) == len(scheduler.days)
+    for a in assignments:
+        if a['course'] == 'Staff':
+            continue
+        start = scheduler.slot_index[a['time']]
+        if start <= scheduler.slot_index['10:00-11:00'] < start + a['duration']:
+            assert a['teacher'] != 'Prof. CS0001' and a['classroom'] != 'Room CS-1'
+
+
+def test_clashing_pins_are_rejected(scheduler):
+    scheduler.add_pin('Staff', 'Meeting', 'Prof. CS0001', 'Monday', '09:00-10:00', 'Room CS-1')
+    scheduler.add_pin('Staff', 'Review', 'Prof. CS0001', 'Monday', '09:00-10:00', 'Room CS-2')
+    scheduler.add_pin('Exam', 'Exam hall', 'Prof. CS0002', 'Monday', '09:00-10:00', 'Room CS-1')
+    with pytest.raises(ValueError) as error:
+        scheduler.solve_schedule()
+    assert "Monday 09:00-10:00 Staff Review: teacher Prof. CS0001 already pinned" in str(error.value)
+    assert "Monday 09:00-10:00 Exam Exam hall: classroom Room CS-1 already pinned" in str(error.value)
+
+
+def test_pin_outside_the_calendar(scheduler):
+    with pytest.raises(ValueError, match="Unknown time slot '18:00-19:00'"):
+        scheduler.add_pin('Staff', 'Meeting', 'Prof. CS0001', 'Monday', '18:00-19:00', 'Room CS-1')
+    with pytest.raises(ValueError, match="Unknown day 'Sunday'"):
+        scheduler.add_pin('Staff', 'Meeting', 'Prof. CS0001', 'Sunday', '09:00-10:00', 'Room CS-1')
+    assert scheduler.pins == []
@@ -0,0 +1,62 @@
+import copy
+
+import pytest
+
+from last_running_v3 import TimetableScheduler, load_scheduler
+
+
+@pytest.fixture
+def solved(scheduler):
+    scheduler.apply_calendar(dict(scheduler.calendar, day_hours={'Saturday': '08:00-13:00'}))
+    success, assignments = scheduler.solve_schedule()
+    assert success
+    return scheduler, assignments
+
+
+def test_save_open_round_trip(solved, tmp_path):
+    scheduler, assignments = solved
+    path = str(tmp_path / "schedule.ttsc")
+    scheduler.write_schedule_file(path, assignments)
+    
+    opened = TimetableScheduler()
+    opened.room_weights = {'Old Room': 3.0}
+    opened.suitable_rooms_cache = {('lecture', 'Computer', 60): []}
+    assert opened.read_schedule_file(path) == assignments
+    assert opened.schedule == assignments
+    for name in ['calendar', 'courses', 'subject_details', 'teachers', 'classrooms', 'pins', 'score_weights']:
+        assert getattr(opened, name) == getattr(scheduler, name)
+    assert opened.open_slots == scheduler.open_slots
+    assert opened.room_weights == {} and opened.suitable_rooms_cache == {}
+    assert opened.validate_schedule(opened.schedule) == scheduler.validate_schedule(assignments)
+
+
+def test_open_exported_csv(solved, instance_dir, tmp_path):
+    scheduler, assignments = solved
+    path = str(tmp_path / "schedule.csv")
+    scheduler.write_schedule_csv(path, assignments)
+    
+    opened = load_scheduler(instance_dir)
+    opened.apply_calendar(scheduler.calendar)
+    entries = opened.read_schedule_file(path)
+    assert opened.schedule is entries
+    columns = ['day', 'time', 'course', 'subject', 'teacher', 'classroom', 'type', 'duration']
+    assert [[e[c] for c in columns] for e in entries] == [[a[c] for c in columns] for a in assignments]
+
+
+def test_bad_file_changes_nothing(solved, instance_dir, tmp_path):
+    scheduler, assignments = solved
+    broken = copy.deepcopy(assignments)
+    broken[0]['time'] = '18:00-19:00'
+    path = str(tmp_path / "broken.ttsc")
+    scheduler.write_schedule_file(path, broken)
+    
+    other = load_scheduler(instance_dir)
+    courses, calendar = other.courses, other.calendar
+    with pytest.raises(ValueError, match="outside the calendar"):
+        other.read_schedule_file(path)
+    assert other.courses is courses and other.calendar is calendar and other.schedule == []
+    
+    path = str(tmp_path / "search.ttck")
+    other.write_binary_file(path, b'TTCK', {'trail': []})
+    with pytest.raises(ValueError, match="not a TTSC file"):
+        other.read_schedule_file(path)
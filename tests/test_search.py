@@ -0,0 +1,81 @@
+def drop_subject(scheduler, subject):
+    for teacher in scheduler.teachers:
+        teacher['subjects'] = ','.join(s for s in teacher['subjects'].split(',') if s.strip() != subject)
+
+
+def test_lns_keeps_node_limit_and_skipped_requirements(scheduler):
+    drop_subject(scheduler, 'CS30000')
+    scheduler.feasibility_check = False
+    scheduler.solver_mode = 'lns'
+    scheduler.lns_iterations = 30
+    scheduler.node_limit = 1234
+    success, assignments = scheduler.solve_schedule()
+    
+    assert success
+    assert scheduler.node_limit == 1234
+    assert not any(a['subject'].startswith('CS30000') for a in assignments)
+    violations, _ = scheduler.validate_schedule(assignments)
+    assert violations and all(v.startswith('SE CS 1 CS30000') and 'not scheduled' in v for v in violations)
+    
+    requirements = [r for r in scheduler.build_lecture_requirements() if not r['subject'].startswith('CS30000')]
+    assert len(scheduler.match_entries_to_requirements(assignments, requirements)) == len(assignments)
+
+
+def warm_start(scheduler, previous_schedule):
+    requirements = scheduler.build_lecture_requirements()
+    teacher_subjects = scheduler.build_teacher_subjects()
+    grid = scheduler.create_empty_grid()
+    scheduler.compile_scoring()
+    scheduler.compile_constraints()
+    assignments = []
+    requirements = scheduler.apply_pins(requirements, grid, assignments)
+    scheduler.teacher_allocation = scheduler.allocate_teachers(requirements, teacher_subjects,
+                                                               assignments, previous_schedule)
+    try:
+        success, changed = scheduler.warm_start_schedule(previous_schedule, requirements,
+                                                         teacher_subjects, grid, assignments)
+    finally:
+        scheduler.teacher_allocation = {}
+    return success, changed, assignments
+
+
+def placement_keys(entries):
+    return sorted((e['course'], e['subject'], e['teacher'], e['day'], e['time'], e['classroom'])
+                  for e in entries)
+
+
+def test_warm_start_without_changes_keeps_everything(scheduler):
+    _, previous = scheduler.solve_schedule()
+    success, changed, assignments = warm_start(scheduler, previous)
+    assert success and changed == 0
+    assert placement_keys(assignments) == placement_keys(previous)
+
+
+def test_warm_start_moves_only_what_broke(scheduler):
+    _, previous = scheduler.solve_schedule()
+    scheduler.node_limit = 5000
+    # The teacher of one class stops being available on that day
+    moved = previous[0]
+    data = scheduler.teacher_availability[moved['teacher']]
+    data['availability'][moved['day']] = []
+    data['masks'][moved['day']] = 0
+    broken = [e for e in previous if e['teacher'] == moved['teacher'] and e['day'] == moved['day']]
+    
+    success, changed, assignments = warm_start(scheduler, previous)
+    assert success
+    assert scheduler.node_limit == 5000
+    assert len(broken) <= changed <= 3 * len(broken)
+    assert not any(a['teacher'] == moved['teacher'] and a['day'] == moved['day'] for a in assignments)
+    assert scheduler.validate_schedule(assignments)[0] == []
+
+
+def test_telemetry_times_the_placement_hot_path(scheduler):
+    scheduler.telemetry_enabled = True
+    success, _ = scheduler.solve_schedule()
+    assert success
+    helpers = scheduler.solver_stats['helpers']
+    assert set(helpers) == set(scheduler.instrumented_helpers)
+    for name in ['is_valid_assignment_relaxed', 'score_profile', 'score_placement', 'course_day_violation']:
+        assert helpers[name]['calls'] > 0
+    # The wrappers are removed again once the solve finishes
+    assert 'score_placement' not in vars(scheduler)
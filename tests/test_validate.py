@@ -0,0 +1,89 @@
+import pytest
+
+from generate_instance import generate_instance, write_instance
+from last_running_v3 import load_scheduler
+
+MODES = {
+    'backtrack': {},
+    'defer_rooms': {'defer_rooms': True},
+    'lab_rotation': {'lab_rotation': True},
+    'tabu': {'solver_mode': 'tabu', 'tabu_iterations': 40},
+    'lns': {'solver_mode': 'lns', 'lns_iterations': 20},
+    'beam': {'solver_mode': 'beam', 'beam_width': 2},
+    'genetic': {'solver_mode': 'genetic', 'ga_generations': 3, 'ga_population': 6, 'ga_workers': 2},
+}
+
+
+@pytest.fixture(scope="module")
+def lab_heavy_dir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("labs"))
+    write_instance(generate_instance(courses=8, seed=5, lab_ratio=0.8), directory)
+    return directory
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("instance", ["instance_dir", "lab_heavy_dir"])
+def test_solver_output_validates(request, instance, mode):
+    scheduler = load_scheduler(request.getfixturevalue(instance))
+    for name, value in MODES[mode].items():
+        setattr(scheduler, name, value)
+    success, assignments = scheduler.solve_schedule()
+    assert success
+    
+    violations, score = scheduler.validate_schedule(assignments)
+    assert violations == []
+    requirements = scheduler.build_lecture_requirements()
+    matched = scheduler.match_entries_to_requirements(assignments, requirements)
+    assert len(matched) == len(assignments)
+    assert score == scheduler.calculate_schedule_score(
+        [(requirements[r], entry) for r, entry in matched.items()], assignments)
+
+
+def test_exported_csv_validates(scheduler, tmp_path):
+    _, assignments = scheduler.solve_schedule()
+    path = str(tmp_path / "schedule.csv")
+    scheduler.write_schedule_csv(path, assignments)
+    entries = scheduler.read_schedule_csv(path)
+    assert len(entries) == len(assignments)
+    assert scheduler.validate_schedule(entries) == scheduler.validate_schedule(assignments)
+
+
+def test_clashes_are_reported(scheduler):
+    _, assignments = scheduler.solve_schedule()
+    first = next(a for a in assignments if a['type'] == 'lecture')
+    other = next(a for a in assignments if a['type'] == 'lecture' and a['course'] != first['course']
+                 and a['teacher'] != first['teacher'] and a['classroom'] != first['classroom'])
+    other.update(day=first['day'], time=first['time'], teacher=first['teacher'], classroom=first['classroom'])
+    violations, _ = scheduler.validate_schedule(assignments)
+    assert any(v.endswith('teacher_clash') for v in violations)
+    assert any(v.endswith('room_clash') for v in violations)
+
+
+def test_break_gaps_are_reported(scheduler):
+    _, assignments = scheduler.solve_schedule()
+    lecture = next(a for a in assignments if a['type'] == 'lecture' and ' - Batch ' not in a['subject'])
+    day_entries = [a for a in assignments if a['course'] == lecture['course'] and a['day'] == lecture['day']]
+    # Put every session of the course day but one into the morning and the last one at the end
+    for entry in day_entries:
+        entry['time'] = scheduler.time_slots[0]
+    lecture['time'] = scheduler.time_slots[-1]
+    violations, _ = scheduler.validate_schedule(assignments)
+    assert f"{lecture['course']} on {lecture['day']}: break_gap" in violations
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_exam_pin_validates(instance_dir, mode):
+    scheduler = load_scheduler(instance_dir)
+    for name, value in MODES[mode].items():
+        setattr(scheduler, name, value)
+    scheduler.add_pin('Exam', 'Exam hall', 'Prof. CS0001', 'Tuesday', '08:00-09:00', 'Room CS-1')
+    success, assignments = scheduler.solve_schedule()
+    assert success
+    assert any(a['course'] == 'Exam' for a in assignments)
+    assert scheduler.validate_schedule(assignments)[0] == []
+    
+    # A pin still clashes with sessions moved onto its teacher or room
+    clash = next(a for a in assignments if a['course'] != 'Exam')
+    clash.update(day='Tuesday', time='08:00-09:00', classroom='Room CS-1')
+    violations, _ = scheduler.validate_schedule(assignments)
+    assert "Tuesday 08:00-09:00 Exam Exam hall (Prof. CS0001): room_clash" in violations